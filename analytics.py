@@ -0,0 +1,205 @@
+"""
+Vectorized audit analytics
+
+Shrinkage, discrepancy variance, trends, repeat-discrepancy SKUs, outliers and
+auditor accuracy computed with NumPy/pandas over AuditLog history. Logs are fed
+in columnar chunks; each chunk is folded into small grouped partial sums, so
+memory grows with the number of groups and counted (item, session) pairs rather
+than with the number of log rows.
+
+Requires numpy and pandas (optional dependencies of the app).
+"""
+
+import numpy as np
+import pandas as pd
+
+LOG_COLUMNS = ['id', 'session_id', 'user_id', 'item_id', 'timestamp', 'new_quantity', 'discrepancy']
+SUM_COLUMNS = ['scans', 'mismatches', 'units_short', 'units_over', 'net', 'net_squared']
+UNKNOWN = '(none)'
+
+# Robust z-scores above this are reported as outliers (Iglewicz and Hoaglin)
+OUTLIER_Z = 3.5
+
+def summarize(sums):
+    """Rates, mean and sample variance of the discrepancy from grouped partial sums"""
+    n = sums['scans'].astype('float64')
+    result = sums[['scans', 'mismatches', 'units_short', 'units_over', 'net']].copy()
+    result['mismatch_rate'] = sums['mismatches'] / n
+    result['mean_discrepancy'] = sums['net'] / n
+    variance = (sums['net_squared'] - sums['net'] ** 2 / n) / (n - 1)
+    result['variance'] = variance.where(n > 1, 0.0).clip(lower=0.0)
+    result['std'] = np.sqrt(result['variance'])
+    return result
+
+def records(frame, digits=4):
+    return frame.round(digits).replace({np.nan: None}).to_dict('records')
+
+class AuditAnalytics:
+    """Accumulates log chunks and produces the analytics report"""
+    
+    def __init__(self, items, period='W'):
+        """items: DataFrame with id, sku, name, category and location columns"""
+        items = items.set_index('id')
+        self.items = items
+        self.period = period
+        self.categories = items['category'].fillna(UNKNOWN).astype('category')
+        self.locations = items['location'].fillna(UNKNOWN).astype('category')
+        self.partials = {'category': [], 'location': [], 'trend': [], 'user': []}
+        self.counts = []
+        self.rows = 0
+    
+    def add(self, chunk):
+        """Fold a DataFrame with LOG_COLUMNS into the running aggregates"""
+        if chunk.empty:
+            return
+        self.rows += len(chunk)
+        
+        # Vectorized join with the catalog; logs of deleted items fall into UNKNOWN
+        position = self.items.index.get_indexer(chunk['item_id'])
+        known = position >= 0
+        category = np.where(known, np.asarray(self.categories)[position], UNKNOWN)
+        location = np.where(known, np.asarray(self.locations)[position], UNKNOWN)
+        
+        discrepancy = chunk['discrepancy'].fillna(0).to_numpy(dtype='int64')
+        timestamp = pd.to_datetime(chunk['timestamp'], format='ISO8601')
+        frame = pd.DataFrame({
+            'category': category,
+            'location': location,
+            'period': timestamp.dt.to_period(self.period),
+            'user_id': chunk['user_id'].to_numpy(),
+            'scans': 1,
+            'mismatches': (discrepancy != 0).astype('int64'),
+            'units_short': np.maximum(-discrepancy, 0),
+            'units_over': np.maximum(discrepancy, 0),
+            'net': discrepancy,
+            'net_squared': discrepancy * discrepancy
+        })
+        self.partials['category'].append(frame.groupby('category')[SUM_COLUMNS].sum())
+        self.partials['location'].append(frame.groupby('location')[SUM_COLUMNS].sum())
+        self.partials['trend'].append(frame.groupby(['period', 'category'])[SUM_COLUMNS].sum())
+        self.partials['user'].append(frame.groupby('user_id')[SUM_COLUMNS].sum())
+        
+        # The last count of each item in each session is that session's result for the item
+        counts = pd.DataFrame({
+            'id': chunk['id'].to_numpy(),
+            'item_id': chunk['item_id'].to_numpy(),
+            'session_id': chunk['session_id'].to_numpy(),
+            'user_id': chunk['user_id'].to_numpy(),
+            'timestamp': timestamp.to_numpy(),
+            'quantity': chunk['new_quantity'].to_numpy(dtype='float64'),
+            'discrepancy': discrepancy
+        }).sort_values('id')
+        self.counts.append(counts.drop_duplicates(['item_id', 'session_id'], keep='last'))
+    
+    def combined(self, name):
+        partials = self.partials[name]
+        if not partials:
+            return None
+        combined = pd.concat(partials)
+        return combined.groupby(level=list(range(combined.index.nlevels))).sum()
+    
+    def final_counts(self):
+        counts = pd.concat(self.counts).sort_values('id')
+        return counts.drop_duplicates(['item_id', 'session_id'], keep='last')
+    
+    def report(self, window=4, min_sessions=2, top=50):
+        """Grouped statistics, rolling trends, repeat-discrepancy and outlier SKUs, auditor accuracy"""
+        if not self.rows:
+            return {'logs': 0, 'counted_items': 0, 'categories': [], 'locations': [], 'trends': [],
+                    'repeat_skus': [], 'outlier_skus': [], 'auditors': []}
+        
+        counts = self.final_counts()
+        return {
+            'logs': self.rows,
+            'counted_items': int(counts['item_id'].nunique()),
+            'categories': self.dimension('category'),
+            'locations': self.dimension('location'),
+            'trends': self.trends(window),
+            'repeat_skus': self.repeat_skus(counts, min_sessions, top),
+            'outlier_skus': self.outlier_skus(counts, min_sessions, top),
+            'auditors': self.auditors(counts)
+        }
+    
+    def dimension(self, name):
+        stats = summarize(self.combined(name)).sort_values('units_short', ascending=False)
+        return records(stats.rename_axis('name').reset_index())
+    
+    def trends(self, window):
+        """Per-period shrinkage and mismatch rate by category, with rolling means over `window` periods"""
+        sums = self.combined('trend')
+        periods = sums.index.get_level_values('period')
+        full_range = pd.period_range(periods.min(), periods.max(), freq=periods.freq)
+        
+        # Periods without scans count as zero so the rolling window spans calendar time
+        table = sums[['scans', 'mismatches', 'units_short']].unstack('category', fill_value=0)
+        table = table.reindex(full_range, fill_value=0)
+        rolling = table.rolling(window, min_periods=1).sum()
+        
+        result = pd.DataFrame({
+            'units_short': table['units_short'].stack(),
+            'mismatch_rate': (table['mismatches'] / table['scans'].where(table['scans'] > 0)).stack(future_stack=True),
+            'rolling_units_short': (rolling['units_short'] / window).stack(),
+            'rolling_mismatch_rate': (rolling['mismatches'] / rolling['scans'].where(rolling['scans'] > 0)).stack(future_stack=True)
+        })
+        result.index.names = ['period', 'category']
+        result = result.reset_index()
+        result['period'] = result['period'].dt.start_time.dt.strftime('%Y-%m-%d')
+        return records(result)
+    
+    def per_item(self, counts):
+        short = np.maximum(-counts['discrepancy'], 0)
+        per_item = pd.DataFrame({
+            'item_id': counts['item_id'],
+            'sessions': 1,
+            'discrepant_sessions': (counts['discrepancy'] != 0).astype('int64'),
+            'units_short': short,
+            'net': counts['discrepancy']
+        }).groupby('item_id').sum()
+        per_item['mean_discrepancy'] = per_item['net'] / per_item['sessions']
+        return per_item.join(self.items[['sku', 'name', 'category', 'location']])
+    
+    def repeat_skus(self, counts, min_sessions, top):
+        """Items found off-count in at least `min_sessions` sessions"""
+        per_item = self.per_item(counts)
+        repeat = per_item[per_item['discrepant_sessions'] >= min_sessions]
+        repeat = repeat.sort_values(['discrepant_sessions', 'units_short'], ascending=False).head(top)
+        return records(repeat.reset_index())
+    
+    def outlier_skus(self, counts, min_sessions, top):
+        """Items whose mean discrepancy is far from their category's, by robust (median/MAD) z-score"""
+        per_item = self.per_item(counts)
+        per_item = per_item[per_item['sessions'] >= min_sessions].copy()
+        if per_item.empty:
+            return []
+        
+        category = per_item['category'].fillna(UNKNOWN)
+        values = per_item['mean_discrepancy']
+        median = values.groupby(category).transform('median')
+        deviation = (values - median).abs()
+        mad = deviation.groupby(category).transform('median')
+        # With MAD 0 (most items exact) fall back to the mean absolute deviation
+        spread = (mad / 0.6745).where(mad > 0, deviation.groupby(category).transform('mean') * 1.2533)
+        per_item['z_score'] = (values - median) / spread.where(spread > 0)
+        
+        outliers = per_item[per_item['z_score'].abs() > OUTLIER_Z]
+        outliers = outliers.reindex(outliers['z_score'].abs().sort_values(ascending=False).index).head(top)
+        return records(outliers.reset_index())
+    
+    def auditors(self, counts):
+        """Per auditor discrepancy statistics and agreement with the next independent recount"""
+        stats = summarize(self.combined('user'))
+        stats['mean_abs_discrepancy'] = (stats['units_short'] + stats['units_over']) / stats['scans']
+        
+        # Compare each count with the next count of the same item in a later session
+        ordered = counts.sort_values(['item_id', 'timestamp', 'id'])
+        next_quantity = ordered.groupby('item_id')['quantity'].shift(-1)
+        recounted = next_quantity.notna() & ordered['quantity'].notna()
+        agreement = pd.DataFrame({
+            'user_id': ordered['user_id'],
+            'recounts': recounted.astype('int64'),
+            'agreements': (recounted & (ordered['quantity'] == next_quantity)).astype('int64')
+        }).groupby('user_id').sum()
+        
+        stats = stats.join(agreement)
+        stats['recount_agreement'] = stats['agreements'] / stats['recounts'].where(stats['recounts'] > 0)
+        return records(stats.rename_axis('user_id').reset_index())
@@ -3,33 +3,574 @@
 Advanced Inventory Management System with Live Monitoring
 """
 
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, send_file
+from flask import Blueprint, Flask, Response, current_app, g, has_request_context, render_template, request, jsonify, session, redirect, url_for, send_file, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_socketio import SocketIO, emit, join_room, leave_room
+from socketio import KombuManager, RedisManager
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
+from werkzeug.local import LocalProxy
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, timezone
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from datetime import datetime, timedelta, timezone
 import uuid
 import json
+import base64
 import os
+import sys
+import threading
+import time
+import hashlib
+import itertools
+import re
+import gzip
+import zlib
+import shutil
+import glob
+import sqlite3
+import fcntl
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import io
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
 import csv
 import io
+import click
 
-# Initialize Flask app
-app = Flask(__name__)
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
-app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///inventory.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+try:
+    import brotli
+except ImportError:  # optional; compressed responses fall back to gzip
+    brotli = None
 
-# Initialize extensions
-db = SQLAlchemy(app)
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+# Extensions are bound to an application by create_app()
+db = SQLAlchemy()
+socketio = SocketIO()
 login_manager = LoginManager()
-login_manager.init_app(app)
-login_manager.login_view = 'login'
+login_manager.login_view = 'main.login'
+
+# Routes, request hooks and CLI commands; the commands stay top-level (flask db-upgrade)
+bp = Blueprint('main', __name__, cli_group=None)
+
+def app_extension(name):
+    """Proxy to per-application state that create_app() keeps in app.extensions"""
+    return LocalProxy(lambda: current_app.extensions[name])
+
+def load_config(app, overrides=None):
+    """Settings from the environment, then any explicit overrides"""
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///inventory.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SCAN_BATCH_MAX_SIZE'] = int(os.environ.get('SCAN_BATCH_MAX_SIZE', 500))
+    app.config['ITEM_INDEX_CHECK_INTERVAL'] = float(os.environ.get('ITEM_INDEX_CHECK_INTERVAL', 1.0))
+    app.config['ITEM_PAGE_SIZE'] = int(os.environ.get('ITEM_PAGE_SIZE', 50))
+    app.config['ITEM_PAGE_SIZE_MAX'] = int(os.environ.get('ITEM_PAGE_SIZE_MAX', 500))
+    app.config['EXPORT_BATCH_SIZE'] = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+    app.config['IMPORT_CHUNK_SIZE'] = int(os.environ.get('IMPORT_CHUNK_SIZE', 500))
+    app.config['IMPORT_MAX_REPORTED_ERRORS'] = int(os.environ.get('IMPORT_MAX_REPORTED_ERRORS', 1000))
+    app.config['REPORT_CACHE_DIR'] = os.environ.get('REPORT_CACHE_DIR', os.path.join(app.instance_path, 'reports'))
+    app.config['REPORT_WORKERS'] = int(os.environ.get('REPORT_WORKERS', 2))
+    app.config['REPORT_JOB_TTL'] = int(os.environ.get('REPORT_JOB_TTL', 3600))
+    app.config['SOCKET_COALESCE_WINDOW'] = float(os.environ.get('SOCKET_COALESCE_WINDOW', 0.25))
+    app.config['SOCKET_BATCH_MAX_ITEMS'] = int(os.environ.get('SOCKET_BATCH_MAX_ITEMS', 100))
+    app.config['AUDIT_WATCH_ROLES'] = os.environ.get('AUDIT_WATCH_ROLES', 'admin,manager').split(',')
+    app.config['SOCKETIO_ASYNC_MODE'] = os.environ.get('SOCKETIO_ASYNC_MODE', 'threading')
+    # redis://, amqp:// or any kombu URL; required to run more than one worker process
+    app.config['SOCKETIO_MESSAGE_QUEUE'] = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+    app.config['SOCKETIO_MESSAGE_QUEUE_OPTIONS'] = json.loads(os.environ.get('SOCKETIO_MESSAGE_QUEUE_OPTIONS', '{}'))
+    app.config['SOCKETIO_CHANNEL'] = os.environ.get('SOCKETIO_CHANNEL', 'inventory')
+    # websocket alone lets workers run behind a load balancer without sticky sessions
+    app.config['SOCKETIO_CLIENT_TRANSPORTS'] = os.environ.get('SOCKETIO_CLIENT_TRANSPORTS', 'polling,websocket')
+    app.config['IDENTITY_CACHE_ENABLED'] = os.environ.get('IDENTITY_CACHE_ENABLED', 'true').lower() == 'true'
+    app.config['IDENTITY_CACHE_TTL'] = float(os.environ.get('IDENTITY_CACHE_TTL', 30))
+    app.config['IDENTITY_CACHE_SIZE'] = int(os.environ.get('IDENTITY_CACHE_SIZE', 1024))
+    app.config['IDENTITY_CACHE_CHECK_INTERVAL'] = float(os.environ.get('IDENTITY_CACHE_CHECK_INTERVAL', 1.0))
+    app.config['SQLITE_PROFILE'] = os.environ.get('SQLITE_PROFILE', 'production')  # production, default
+    app.config['SQLITE_BUSY_TIMEOUT'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 30000))
+    app.config['SQLITE_MMAP_SIZE'] = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    app.config['SCAN_CONFLICT_RETRIES'] = int(os.environ.get('SCAN_CONFLICT_RETRIES', 3))
+    app.config['SCAN_JOURNAL_ENABLED'] = os.environ.get('SCAN_JOURNAL_ENABLED', 'false').lower() == 'true'
+    app.config['SCAN_JOURNAL_PATH'] = os.environ.get('SCAN_JOURNAL_PATH', os.path.join(app.instance_path, 'scan_journal.log'))
+    app.config['SCAN_JOURNAL_APPLY_INTERVAL'] = float(os.environ.get('SCAN_JOURNAL_APPLY_INTERVAL', 0.2))
+    app.config['SCAN_JOURNAL_APPLY_BATCH'] = int(os.environ.get('SCAN_JOURNAL_APPLY_BATCH', 500))
+    app.config['SCAN_JOURNAL_ROTATE_BYTES'] = int(os.environ.get('SCAN_JOURNAL_ROTATE_BYTES', 16 * 1024 * 1024))
+    # How long ending a session waits for other workers to apply its journaled scans
+    app.config['SCAN_JOURNAL_END_WAIT'] = float(os.environ.get('SCAN_JOURNAL_END_WAIT', 5.0))
+    app.config['AUDIT_ARCHIVE_DIR'] = os.environ.get('AUDIT_ARCHIVE_DIR', os.path.join(app.instance_path, 'audit_archive'))
+    app.config['AUDIT_ARCHIVE_AFTER_DAYS'] = int(os.environ.get('AUDIT_ARCHIVE_AFTER_DAYS', 30))
+    app.config['AUDIT_RETENTION_DAYS'] = int(os.environ.get('AUDIT_RETENTION_DAYS', 0))  # 0 keeps archived logs forever
+    # Queries with more matches than this are ranked by matched field and id instead of bm25()
+    app.config['SEARCH_RANK_MAX_MATCHES'] = int(os.environ.get('SEARCH_RANK_MAX_MATCHES', 20000))
+    app.config['SEARCH_TYPO_CANDIDATES'] = int(os.environ.get('SEARCH_TYPO_CANDIDATES', 5000))
+    app.config['CHANGES_MAX'] = int(os.environ.get('CHANGES_MAX', 1000))
+    # Server databases: delta sync stops waiting for an uncommitted change sequence after this
+    # long (its worker is assumed dead), so no write transaction should run longer
+    app.config['CHANGE_ALLOCATION_TIMEOUT'] = int(os.environ.get('CHANGE_ALLOCATION_TIMEOUT', 300))
+    app.config['ANALYTICS_CHUNK_SIZE'] = int(os.environ.get('ANALYTICS_CHUNK_SIZE', 100000))
+    app.config['ANALYTICS_CACHE_SIZE'] = int(os.environ.get('ANALYTICS_CACHE_SIZE', 8))
+    app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    app.config['COMPRESS_GZIP_LEVEL'] = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    app.config['COMPRESS_BROTLI_QUALITY'] = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))
+    app.config['COMPRESS_MIMETYPES'] = os.environ.get('COMPRESS_MIMETYPES', 'application/json,text/csv,text/html,text/plain').split(',')
+    app.config['STATIC_MAX_AGE'] = int(os.environ.get('STATIC_MAX_AGE', 365 * 24 * 3600))
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+    app.config['METRICS_DEBUG_MAX_QUERIES'] = int(os.environ.get('METRICS_DEBUG_MAX_QUERIES', 50))
+    app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 10))
+    app.config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    app.config['DB_POOL_TIMEOUT'] = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+    app.config['DB_POOL_RECYCLE'] = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    
+    app.config.update(overrides or {})
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app))
+
+def engine_options(app):
+    """Connection pool settings for the configured database"""
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        # In-memory databases live on a single shared connection
+        return {}
+    
+    options = {
+        'pool_size': app.config['DB_POOL_SIZE'],
+        'max_overflow': app.config['DB_MAX_OVERFLOW'],
+        'pool_timeout': app.config['DB_POOL_TIMEOUT']
+    }
+    if url.get_backend_name() != 'sqlite':
+        # Server databases drop idle connections; file databases never do
+        options.update(pool_recycle=app.config['DB_POOL_RECYCLE'], pool_pre_ping=True)
+    return options
+
+def socketio_options(app):
+    """Socket.IO server options, with a message-queue client manager when several workers share clients"""
+    options = {'cors_allowed_origins': '*', 'async_mode': app.config['SOCKETIO_ASYNC_MODE']}
+    url = app.config['SOCKETIO_MESSAGE_QUEUE']
+    if not url:
+        return options
+    
+    # Every worker publishes its emits to the queue and delivers what the others
+    # published to its own connected clients
+    queue_options = app.config['SOCKETIO_MESSAGE_QUEUE_OPTIONS']
+    if url.startswith(('redis://', 'rediss://')):
+        manager = RedisManager(url, channel=app.config['SOCKETIO_CHANNEL'], redis_options=queue_options or None)
+    else:
+        manager = KombuManager(url, channel=app.config['SOCKETIO_CHANNEL'], connection_options=queue_options)
+    options['client_manager'] = manager
+    return options
+
+def sqlite_connection_pragmas(config):
+    """PRAGMAs of the SQLite tuning profile selected by SQLITE_PROFILE.
+    
+    WAL lets readers proceed while a scan is being written and the busy timeout makes
+    concurrent writers queue for the lock instead of failing with "database is locked".
+    synchronous=NORMAL is durable across application crashes in WAL mode; only an OS
+    crash or power loss can roll back the most recent commits.
+    """
+    if config['SQLITE_PROFILE'] != 'production':
+        return []
+    return [
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT'])}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}"
+    ]
+
+def configure_sqlite_connections(engine, pragmas):
+    """Apply PRAGMAs to every new connection of one engine; other engines in the process are untouched"""
+    @db.event.listens_for(engine, 'connect')
+    def configure_sqlite_connection(dbapi_connection, connection_record):
+        if not isinstance(dbapi_connection, sqlite3.Connection):
+            return
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+class Metrics:
+    """Process-local counters and histograms rendered in the Prometheus text format.
+    
+    Values are kept per worker process; scrape every worker (or sum them) when
+    running more than one.
+    """
+    
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = OrderedDict()
+    
+    def counter(self, name, help_text):
+        self._metrics[name] = {'type': 'counter', 'help': help_text, 'values': {}}
+    
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self._metrics[name] = {'type': 'histogram', 'help': help_text, 'buckets': tuple(buckets), 'values': {}}
+    
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted((labels or {}).items()))
+    
+    def inc(self, name, labels=None, value=1):
+        metric = self._metrics[name]
+        key = self._key(labels)
+        with self._lock:
+            metric['values'][key] = metric['values'].get(key, 0) + value
+    
+    def observe(self, name, value, labels=None):
+        metric = self._metrics[name]
+        key = self._key(labels)
+        with self._lock:
+            series = metric['values'].get(key)
+            if series is None:
+                series = metric['values'][key] = {'buckets': [0] * len(metric['buckets']), 'sum': 0, 'count': 0}
+            for index, bound in enumerate(metric['buckets']):
+                if value <= bound:
+                    series['buckets'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+    
+    @staticmethod
+    def _labels(pairs):
+        if not pairs:
+            return ''
+        escaped = (
+            (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for name, value in pairs
+        )
+        return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+    
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, metric in self._metrics.items():
+                lines.append(f"# HELP {name} {metric['help']}")
+                lines.append(f"# TYPE {name} {metric['type']}")
+                for key, value in metric['values'].items():
+                    if metric['type'] == 'counter':
+                        lines.append(f'{name}{self._labels(key)} {value}')
+                        continue
+                    # Bucket counts are stored per bucket and exposed cumulatively
+                    for bound, count in zip(metric['buckets'], value['buckets']):
+                        lines.append(f'{name}_bucket{self._labels(key + (("le", repr(float(bound))),))} {count}')
+                    lines.append(f'{name}_bucket{self._labels(key + (("le", "+Inf"),))} {value["count"]}')
+                    lines.append(f'{name}_sum{self._labels(key)} {value["sum"]}')
+                    lines.append(f'{name}_count{self._labels(key)} {value["count"]}')
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
+metrics.histogram('http_request_duration_seconds', 'Request latency by route, excluding streamed bodies')
+metrics.counter('http_requests_total', 'Requests by route and status')
+metrics.histogram('http_request_db_queries', 'SQL statements executed per request', (0, 1, 2, 5, 10, 20, 50, 100, 500))
+metrics.counter('db_queries_total', 'SQL statements by route; background work is labelled "background"')
+metrics.counter('db_query_seconds_total', 'Time spent executing SQL by route')
+metrics.counter('socketio_emits_total', 'Socket.IO broadcasts by event')
+metrics.histogram('socketio_emit_recipients', 'Connected clients reached per broadcast on this worker', (0, 1, 5, 10, 50, 100, 500, 1000, 5000))
+metrics.histogram('export_generation_seconds', 'Time to generate an export, including streamed bodies', (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120))
+metrics.histogram('analytics_seconds', 'Time to compute an analytics report on a cache miss', (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300))
+
+def metrics_route():
+    """Route label for the current request, or "background" outside one"""
+    if not has_request_context():
+        return 'background'
+    if request.url_rule:
+        return request.url_rule.rule
+    # Socket.IO event handlers run in a request context without a URL rule
+    return 'socketio' if getattr(request, 'sid', None) else 'unmatched'
+
+@db.event.listens_for(Engine, 'before_cursor_execute')
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+@db.event.listens_for(Engine, 'after_cursor_execute')
+def record_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    route = metrics_route()
+    metrics.inc('db_queries_total', {'route': route})
+    metrics.inc('db_query_seconds_total', {'route': route}, elapsed)
+    if has_request_context() and g.get('queries') is not None:
+        g.queries.append((statement, elapsed))
+
+def timed_export(chunks, kind):
+    """Pass a streamed export through, recording how long the whole body took"""
+    started = time.perf_counter()
+    yield from chunks
+    metrics.observe('export_generation_seconds', time.perf_counter() - started, {'kind': kind})
+
+def broadcast(event, data, room):
+    """Emit to a room or list of rooms, recording the event and its local fan-out"""
+    rooms = room if isinstance(room, list) else [room]
+    recipients = set()
+    for name in rooms:
+        recipients.update(sid for sid, _ in socketio.server.manager.get_participants('/', name))
+    metrics.inc('socketio_emits_total', {'event': event})
+    metrics.observe('socketio_emit_recipients', len(recipients), {'event': event})
+    socketio.emit(event, data, room=room)
+
+def run_blocking(func, *args):
+    """Run CPU-bound or blocking work on a real OS thread when the server is cooperative.
+    
+    Under eventlet or gevent a green thread that renders a PDF or waits in fsync holds
+    the hub, stalling every other request and Socket.IO heartbeat until it returns.
+    """
+    # Monkey patching, not the configured mode, decides: it is what turns threads green
+    if 'eventlet' in sys.modules and sys.modules['eventlet'].patcher.is_monkey_patched('thread'):
+        from eventlet import tpool
+        return tpool.execute(func, *args)
+    if 'gevent' in sys.modules and sys.modules['gevent'].monkey.is_module_patched('threading'):
+        return sys.modules['gevent'].get_hub().threadpool.apply(func, args)
+    return func(*args)
+
+@bp.before_app_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.queries = []
+
+@bp.after_app_request
+def record_request_metrics(response):
+    """Record latency and query counts; admins can ask for the query list with X-Debug-Queries"""
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    
+    route = metrics_route()
+    metrics.observe('http_request_duration_seconds', time.perf_counter() - started, {'method': request.method, 'route': route})
+    metrics.inc('http_requests_total', {'method': request.method, 'route': route, 'status': response.status_code})
+    
+    # Statements run while a streamed body is generated still reach db_queries_total
+    queries, g.queries = g.queries, None
+    metrics.observe('http_request_db_queries', len(queries), {'route': route})
+    
+    if request.headers.get('X-Debug-Queries') and (current_app.debug or getattr(current_user, 'role', None) == 'admin'):
+        response.headers['X-Query-Count'] = str(len(queries))
+        response.headers['X-Query-Time-Ms'] = f'{sum(elapsed for _, elapsed in queries) * 1000:.2f}'
+        response.headers['X-Queries'] = json.dumps([
+            {'sql': ' '.join(statement.split())[:300], 'ms': round(elapsed * 1000, 3)}
+            for statement, elapsed in queries[:current_app.config['METRICS_DEBUG_MAX_QUERIES']]
+        ])
+    return response
+
+def not_modified(etag, last_modified=None):
+    """Whether the request's validators match; If-None-Match takes precedence over If-Modified-Since"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified and request.if_modified_since:
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= request.if_modified_since
+    return False
+
+def conditional_json(etag, build, last_modified=None):
+    """JSON response with validators; build() only runs when the client's copy is stale"""
+    if not_modified(etag, last_modified):
+        response = Response(status=304)
+    else:
+        response = jsonify(build())
+    # Weak: the gzip and brotli encodings of a body share its validator
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # Per-user data: browsers may keep it but must revalidate each time
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def response_encoding(response):
+    """Pick br or gzip for a response, or None to send it as is"""
+    if (response.status_code < 200 or response.status_code in (204, 304) or response.direct_passthrough
+            or 'Content-Encoding' in response.headers or response.mimetype not in current_app.config['COMPRESS_MIMETYPES']):
+        return None
+    # Streamed exports have no length up front and are compressed regardless of size
+    if not response.is_streamed and response.calculate_content_length() < current_app.config['COMPRESS_MIN_SIZE']:
+        return None
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+def compressed_chunks(chunks, encoding):
+    """Compress a streamed body chunk by chunk"""
+    # Set up now: the body is iterated after the request context is gone
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=current_app.config['COMPRESS_BROTLI_QUALITY'])
+        compress, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(current_app.config['COMPRESS_GZIP_LEVEL'], zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        compress, finish = compressor.compress, compressor.flush
+    
+    def generate():
+        for chunk in chunks:
+            data = compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            if data:
+                yield data
+        yield finish()
+    return generate()
+
+@bp.after_app_request
+def compress_response(response):
+    """gzip/brotli for JSON, HTML and exports above COMPRESS_MIN_SIZE"""
+    encoding = response_encoding(response)
+    if encoding is None:
+        if response.mimetype in current_app.config['COMPRESS_MIMETYPES']:
+            response.vary.add('Accept-Encoding')
+        return response
+    
+    if response.is_streamed:
+        response.response = compressed_chunks(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    elif encoding == 'br':
+        response.set_data(brotli.compress(response.get_data(), quality=current_app.config['COMPRESS_BROTLI_QUALITY']))
+    else:
+        response.set_data(gzip.compress(response.get_data(), compresslevel=current_app.config['COMPRESS_GZIP_LEVEL']))
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+def static_version(filename):
+    """Version token for a static file, from its modification time"""
+    versions = current_app.extensions['static_versions']
+    if filename not in versions:
+        try:
+            versions[filename] = format(int(os.stat(os.path.join(current_app.static_folder, filename)).st_mtime), 'x')
+        except OSError:
+            return None
+    return versions[filename]
+
+@bp.app_url_defaults
+def version_static_urls(endpoint, values):
+    # Versioned URLs change whenever the file does, so they can be cached for good
+    if endpoint == 'static' and 'filename' in values and 'v' not in values:
+        version = static_version(values['filename'])
+        if version:
+            values['v'] = version
+
+@bp.after_app_request
+def cache_static_assets(response):
+    if request.endpoint == 'static' and response.status_code == 200:
+        if request.args.get('v'):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = current_app.config['STATIC_MAX_AGE']
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+    return response
+
+class EventBus:
+    """Outbound Socket.IO layer that coalesces high-frequency audit events.
+    
+    Within each SOCKET_COALESCE_WINDOW, audit_updated keeps only the latest payload
+    per session and scans/discrepancies are batched into one array per room, so a
+    client receives at most one message per event type and subscribed room per
+    window. Batch endpoints hand their scans to publish_batch, which sends one
+    message per room straight away. Other events are sent immediately, after
+    flushing anything pending so ordering is preserved.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._audit_updates = {}
+        self._scans = {}
+        self._discrepancies = {}
+        self._flusher = None
+    
+    def publish(self, event, data, rooms):
+        """Send an event immediately"""
+        self.flush()
+        broadcast(event, data, list(rooms))
+    
+    def publish_audit_update(self, data, rooms):
+        """Queue session counters, replacing any pending update for the same session"""
+        with self._lock:
+            for room in rooms:
+                self._audit_updates.setdefault(room, {})[data['session_id']] = data
+        self._schedule()
+    
+    def publish_item_scanned(self, data, rooms):
+        # A client in several of the rooms receives the entry once per room; the id lets it skip repeats
+        data = dict(data, event_id=uuid.uuid4().hex)
+        with self._lock:
+            for room in rooms:
+                self._scans.setdefault(room, []).append(data)
+        self._schedule()
+    
+    def publish_discrepancy(self, data, rooms):
+        data = dict(data, event_id=uuid.uuid4().hex)
+        with self._lock:
+            for room in rooms:
+                self._discrepancies.setdefault(room, []).append(data)
+        self._schedule()
+    
+    def publish_batch(self, event, key, entries, rooms_for):
+        """Send a batch of scans as one message per room now, whatever the coalescing window"""
+        by_room = {}
+        for target, data in entries:
+            data = dict(data, event_id=uuid.uuid4().hex)
+            for room in rooms_for(target):
+                by_room.setdefault(room, []).append(data)
+        self.flush()
+        for room, batch in by_room.items():
+            items, dropped = self._capped(batch)
+            broadcast(event, {key: items, 'dropped': dropped}, room)
+    
+    def _schedule(self):
+        if current_app.config['SOCKET_COALESCE_WINDOW'] <= 0:
+            self.flush()
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = socketio.start_background_task(self._run, current_app._get_current_object())
+    
+    def _run(self, app):
+        while True:
+            socketio.sleep(app.config['SOCKET_COALESCE_WINDOW'])
+            with app.app_context():
+                self.flush()
+    
+    @staticmethod
+    def _capped(entries):
+        # Keep the most recent entries so a burst cannot produce unbounded messages
+        limit = current_app.config['SOCKET_BATCH_MAX_ITEMS']
+        return entries[-limit:], max(0, len(entries) - limit)
+    
+    def flush(self):
+        """Emit everything queued since the last flush"""
+        with self._lock:
+            audit_updates, self._audit_updates = self._audit_updates, {}
+            scans, self._scans = self._scans, {}
+            discrepancies, self._discrepancies = self._discrepancies, {}
+        
+        for room, entries in scans.items():
+            items, dropped = self._capped(entries)
+            broadcast('items_scanned', {'items': items, 'dropped': dropped}, room)
+        
+        for room, updates in audit_updates.items():
+            for data in updates.values():
+                broadcast('audit_updated', data, room)
+        
+        for room, entries in discrepancies.items():
+            items, dropped = self._capped(entries)
+            broadcast('discrepancies_found', {'discrepancies': items, 'dropped': dropped}, room)
+
+def session_room(session_id):
+    return f'session:{session_id}'
+
+def location_room(location):
+    return f'location:{location}'
+
+def role_room(role):
+    return f'role:{role}'
+
+def user_room(user_id):
+    return f'user:{user_id}'
+
+def audit_watch_rooms(session_id):
+    """Rooms that follow an audit session's lifecycle"""
+    return [session_room(session_id)] + [role_room(role) for role in current_app.config['AUDIT_WATCH_ROLES']]
+
+def scan_rooms(session_id, location):
+    """Rooms interested in a single scan"""
+    rooms = [session_room(session_id)]
+    if location:
+        rooms.append(location_room(location))
+    return rooms
+
+event_bus = app_extension('event_bus')
 
 # Database Models
 class User(UserMixin, db.Model):
@@ -54,9 +595,24 @@ class InventoryItem(db.Model):
     category = db.Column(db.String(50))
     location = db.Column(db.String(100))
     last_updated = db.Column(db.DateTime, default=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default=db.text('1'))
+    change_seq = db.Column(db.Integer, nullable=False, default=0, server_default=db.text('0'))
     
     # Relationships
     audit_logs = db.relationship('AuditLog', backref='item', lazy=True)
+    
+    # Every ORM update/delete checks and bumps the version (compare-and-swap);
+    # a concurrent change surfaces as StaleDataError instead of a lost update
+    __mapper_args__ = {'version_id_col': version}
+    
+    # Indexes backing the keyset-paginated listing filters
+    __table_args__ = (
+        db.Index('ix_inventory_item_category_id', 'category', 'id'),
+        db.Index('ix_inventory_item_location_id', 'location', 'id'),
+        db.Index('ix_inventory_item_last_updated_id', 'last_updated', 'id'),
+        db.Index('ix_inventory_item_discrepancy', actual_quantity - expected_quantity),
+        db.Index('ix_inventory_item_change_seq', 'change_seq'),
+    )
 
 class AuditSession(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -68,9 +624,17 @@ class AuditSession(db.Model):
     items_scanned = db.Column(db.Integer, default=0)
     discrepancies_found = db.Column(db.Integer, default=0)
     notes = db.Column(db.Text)
+    change_seq = db.Column(db.Integer, nullable=False, default=0, server_default=db.text('0'))
+    log_storage = db.Column(db.String(20), nullable=False, default='hot', server_default='hot')  # hot, archive, purged
     
     # Relationships
     audit_logs = db.relationship('AuditLog', backref='session', lazy=True)
+    
+    # Active-session lookups filter on status, usually together with the owner
+    __table_args__ = (
+        db.Index('ix_audit_session_status_user_id', 'status', 'user_id'),
+        db.Index('ix_audit_session_change_seq', 'change_seq'),
+    )
 
 class AuditLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -83,6 +647,14 @@ class AuditLog(db.Model):
     discrepancy = db.Column(db.Integer, default=0)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     notes = db.Column(db.Text)
+    idempotency_key = db.Column(db.String(64))  # client-generated; replays of a queued scan share it
+    
+    # Exports and session summaries read a session's logs in id order
+    __table_args__ = (
+        db.Index('ix_audit_log_session_id_id', 'session_id', 'id'),
+        db.Index('ix_audit_log_item_id', 'item_id'),
+        db.Index('ux_audit_log_session_idempotency', 'session_id', 'idempotency_key', unique=True),
+    )
 
 class Settings(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -95,28 +667,486 @@ class Settings(db.Model):
     # Relationships
     user = db.relationship('User', backref='settings', lazy=True)
 
+class InventoryAggregate(db.Model):
+    """Maintained inventory totals overall, per category and per location"""
+    dimension = db.Column(db.String(20), primary_key=True)  # total, category, location
+    name = db.Column(db.String(100), primary_key=True)
+    item_count = db.Column(db.Integer, nullable=False, default=0)
+    expected_quantity = db.Column(db.Integer, nullable=False, default=0)
+    actual_quantity = db.Column(db.Integer, nullable=False, default=0)
+    open_discrepancies = db.Column(db.Integer, nullable=False, default=0)
+
+def item_snapshot(item):
+    """Fields of an item that contribute to the inventory aggregates"""
+    return (item.category, item.location, item.expected_quantity or 0, item.actual_quantity or 0)
+
+class AggregateDelta:
+    """Accumulates changes to InventoryAggregate rows and applies them in the current transaction"""
+    
+    FIELDS = ('item_count', 'expected_quantity', 'actual_quantity', 'open_discrepancies')
+    
+    def __init__(self):
+        self._deltas = {}
+    
+    def _add(self, snapshot, sign):
+        category, location, expected, actual = snapshot
+        contribution = (1, expected, actual, 1 if expected != actual else 0)
+        for key in (('total', ''), ('category', category or ''), ('location', location or '')):
+            totals = self._deltas.setdefault(key, [0] * len(self.FIELDS))
+            for index, value in enumerate(contribution):
+                totals[index] += sign * value
+    
+    def change(self, before=None, after=None):
+        """Record an item moving from one snapshot to another (None for insert/delete)"""
+        if before:
+            self._add(before, -1)
+        if after:
+            self._add(after, 1)
+        return self
+    
+    def apply(self):
+        for (dimension, name), totals in self._deltas.items():
+            if not any(totals):
+                continue
+            updated = InventoryAggregate.query.filter_by(dimension=dimension, name=name).update({
+                getattr(InventoryAggregate, field): getattr(InventoryAggregate, field) + delta
+                for field, delta in zip(self.FIELDS, totals)
+            }, synchronize_session=False)
+            if not updated:
+                db.session.add(InventoryAggregate(dimension=dimension, name=name, **dict(zip(self.FIELDS, totals))))
+        self._deltas = {}
+
+def rebuild_aggregates():
+    """Recompute every InventoryAggregate row from the inventory table"""
+    InventoryAggregate.query.delete()
+    
+    discrepancy = db.case((InventoryItem.actual_quantity != InventoryItem.expected_quantity, 1), else_=0)
+    columns = (
+        db.func.count(InventoryItem.id),
+        db.func.coalesce(db.func.sum(InventoryItem.expected_quantity), 0),
+        db.func.coalesce(db.func.sum(InventoryItem.actual_quantity), 0),
+        db.func.coalesce(db.func.sum(discrepancy), 0)
+    )
+    
+    for dimension, column in (('total', None), ('category', InventoryItem.category), ('location', InventoryItem.location)):
+        if column is None:
+            rows = [('',) + tuple(db.session.query(*columns).one())]
+        else:
+            group = db.func.coalesce(column, '')
+            rows = db.session.query(group, *columns).group_by(group).all()
+        for name, *totals in rows:
+            if totals[0]:
+                db.session.add(InventoryAggregate(dimension=dimension, name=name, **dict(zip(AggregateDelta.FIELDS, totals))))
+    
+    db.session.commit()
+
+def dashboard_summary():
+    """Inventory totals and discrepancy counts read from the aggregate store"""
+    summary = {
+        'totals': dict.fromkeys(AggregateDelta.FIELDS, 0),
+        'categories': [],
+        'locations': []
+    }
+    for row in InventoryAggregate.query.order_by(InventoryAggregate.dimension, InventoryAggregate.name):
+        values = {field: getattr(row, field) for field in AggregateDelta.FIELDS}
+        if row.dimension == 'total':
+            summary['totals'] = values
+        elif row.item_count:
+            group = 'categories' if row.dimension == 'category' else 'locations'
+            summary[group].append(dict(name=row.name, **values))
+    return summary
+
+class CacheVersion(db.Model):
+    """Version counters that keep process-local caches coherent across workers"""
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+def get_cache_version(name):
+    """Read the shared version counter for a cache"""
+    return db.session.query(CacheVersion.version).filter_by(name=name).scalar() or 0
+
+def bump_cache_version(name):
+    """Increment a cache version inside the current transaction and return it"""
+    updated = CacheVersion.query.filter_by(name=name).update(
+        {CacheVersion.version: CacheVersion.version + 1}
+    )
+    if not updated:
+        db.session.add(CacheVersion(name=name, version=1))
+        db.session.flush()
+    return get_cache_version(name)
+
+CHANGE_SEQUENCE = 'changes'
+
+class DeletedItem(db.Model):
+    """Tombstones that let delta sync report items deleted since a client's cursor"""
+    item_id = db.Column(db.Integer, primary_key=True)
+    change_seq = db.Column(db.Integer, nullable=False, index=True)
+
+class ChangeAllocation(db.Model):
+    """Change sequences taken by transactions that have not committed yet (server databases)"""
+    change_seq = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    allocated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+def serializes_writers(connection):
+    """Whether the database runs one write transaction at a time anyway"""
+    return connection.dialect.name == 'sqlite'
+
+def next_change_seq(connection):
+    """Increment the shared change counter on a connection and return the new value"""
+    updated = connection.execute(
+        db.update(CacheVersion).where(CacheVersion.name == CHANGE_SEQUENCE).values(version=CacheVersion.version + 1)
+    ).rowcount
+    if not updated:
+        connection.execute(db.insert(CacheVersion).values(name=CHANGE_SEQUENCE, version=1))
+    return connection.execute(
+        db.select(CacheVersion.version).where(CacheVersion.name == CHANGE_SEQUENCE)
+    ).scalar_one()
+
+def transaction_change_seq(session=None):
+    """Allocate the change sequence shared by every row written in the current transaction"""
+    session = session or db.session()
+    if 'change_seq' not in session.info:
+        # Core statements so this also works while the session is flushing
+        connection = session.connection()
+        if serializes_writers(connection):
+            # SQLite already admits one writer at a time, so holding the counter row until
+            # commit costs nothing and makes sequences visible in commit order
+            session.info['change_seq'] = next_change_seq(connection)
+        else:
+            session.info['change_seq'] = allocate_change_seq(session, connection)
+    return session.info['change_seq']
+
+def allocate_change_seq(session, connection):
+    """Take a change sequence in a short transaction of its own and record it as in flight"""
+    # Holding the counter row until commit would serialize every writer on a server
+    # database. Writers only queue for this allocation instead; delta sync stays below
+    # sequences whose allocation row is still visible (see change_cursor)
+    with db.engine.begin() as allocation:
+        change_seq = next_change_seq(allocation)
+        allocation.execute(db.insert(ChangeAllocation).values(change_seq=change_seq, allocated_at=datetime.utcnow()))
+    # Deleted together with this transaction's writes, so the row disappears as they become visible
+    connection.execute(db.delete(ChangeAllocation).where(ChangeAllocation.change_seq == change_seq))
+    session.info.setdefault('change_allocations', []).append(change_seq)
+    return change_seq
+
+def release_change_allocations(change_seqs):
+    """Drop allocations whose transaction (or savepoint) rolled back, and any left by dead workers"""
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config['CHANGE_ALLOCATION_TIMEOUT'])
+    with db.engine.begin() as connection:
+        connection.execute(db.delete(ChangeAllocation).where(
+            db.or_(ChangeAllocation.change_seq.in_(change_seqs), ChangeAllocation.allocated_at < cutoff)
+        ))
+
+def change_cursor():
+    """Highest change sequence at or below which every write transaction has finished"""
+    cursor = get_cache_version(CHANGE_SEQUENCE)
+    if not serializes_writers(db.session.connection()):
+        # Read after the counter: each sequence it covers is either still recorded as
+        # in flight or was released by its transaction's commit
+        cutoff = datetime.utcnow() - timedelta(seconds=current_app.config['CHANGE_ALLOCATION_TIMEOUT'])
+        in_flight = db.session.query(db.func.min(ChangeAllocation.change_seq)).filter(
+            ChangeAllocation.allocated_at >= cutoff
+        ).scalar()
+        if in_flight is not None:
+            cursor = min(cursor, in_flight - 1)
+    return cursor
+
+@db.event.listens_for(db.session, 'after_rollback')
+def flag_change_allocations(session):
+    # Fires for savepoints too; their allocation rows came back with the rollback
+    if session.info.get('change_allocations'):
+        session.info['release_allocations'] = True
+
+@db.event.listens_for(db.session, 'after_transaction_end')
+def reset_change_seq(session, transaction):
+    # A rolled-back savepoint also rolls back its allocation, so never reuse one
+    session.info.pop('change_seq', None)
+    session.info.pop('identity_bumped', None)
+    if transaction.parent is None:
+        change_seqs = session.info.pop('change_allocations', None)
+        if session.info.pop('release_allocations', False):
+            release_change_allocations(change_seqs)
+
+@db.event.listens_for(db.session, 'before_flush')
+def stamp_change_seq(session, flush_context, instances):
+    """Stamp items and audit sessions written through the ORM; bulk writers set change_seq themselves"""
+    changed = [
+        obj for obj in session.new | session.dirty
+        if isinstance(obj, (InventoryItem, AuditSession)) and (obj in session.new or session.is_modified(obj))
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, InventoryItem)]
+    if not changed and not deleted:
+        return
+    
+    change_seq = transaction_change_seq(session)
+    for obj in changed:
+        obj.change_seq = change_seq
+    for item in deleted:
+        session.merge(DeletedItem(item_id=item.id, change_seq=change_seq))
+
+class ItemLookupIndex:
+    """Process-local barcode/SKU index used to resolve scans without a database query.
+    
+    Entries hold the item id and its identifying fields. The index is loaded lazily
+    on first use and reloaded whenever another worker bumps the shared version.
+    """
+    
+    VERSION_KEY = 'item_index'
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = None
+        self._version = None
+        self._checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+    
+    @staticmethod
+    def _entry(item_id, name, sku, barcode):
+        return {'id': item_id, 'name': name, 'sku': sku, 'barcode': barcode}
+    
+    def _store(self, entry):
+        self._entries[entry['sku']] = entry
+        if entry['barcode']:
+            self._entries[entry['barcode']] = entry
+    
+    def _sync(self):
+        now = time.monotonic()
+        if self._entries is not None and now - self._checked_at < current_app.config['ITEM_INDEX_CHECK_INTERVAL']:
+            return
+        
+        version = get_cache_version(self.VERSION_KEY)
+        if self._entries is None or version != self._version:
+            rows = db.session.query(
+                InventoryItem.id, InventoryItem.name, InventoryItem.sku, InventoryItem.barcode
+            ).all()
+            self._entries = {}
+            # SKUs first so barcode matches take precedence
+            for row in rows:
+                self._entries[row.sku] = self._entry(*row)
+            for row in rows:
+                if row.barcode:
+                    self._entries[row.barcode] = self._entry(*row)
+            self._version = version
+            self.reloads += 1
+        self._checked_at = now
+    
+    def lookup(self, code):
+        """Return the cached entry for a barcode or SKU, or None"""
+        with self._lock:
+            self._sync()
+            entry = self._entries.get(code)
+            if entry:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+    
+    def put(self, item, version=None):
+        """Write an item through to the index after a local change"""
+        with self._lock:
+            if self._entries is None:
+                return
+            self._store(self._entry(item.id, item.name, item.sku, item.barcode))
+            self._adopt(version)
+    
+    def remove(self, *codes, version=None):
+        """Drop index entries for the given barcodes/SKUs"""
+        with self._lock:
+            if self._entries is None:
+                return
+            for code in codes:
+                if code:
+                    self._entries.pop(code, None)
+            self._adopt(version)
+    
+    def _adopt(self, version):
+        # Our own write bumped the version; skip the reload unless another worker wrote too
+        if version is not None and self._version == version - 1:
+            self._version = version
+    
+    def invalidate(self):
+        """Force a full reload on next lookup"""
+        with self._lock:
+            self._entries = None
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries) if self._entries is not None else 0,
+                'version': self._version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'reloads': self.reloads,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+item_index = app_extension('item_index')
+
+def resolve_item(code):
+    """Resolve a scanned barcode or SKU to an InventoryItem, preferring the index"""
+    entry = item_index.lookup(code)
+    if entry:
+        item = InventoryItem.query.get(entry['id'])
+        if item and code in (item.barcode, item.sku):
+            return item
+        # Stale entry (item changed or deleted by another worker)
+        item_index.invalidate()
+    
+    item = InventoryItem.query.filter(
+        (InventoryItem.barcode == code) | (InventoryItem.sku == code)
+    ).first()
+    if item:
+        item_index.put(item)
+    return item
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after IDENTITY_CACHE_TTL seconds.
+    
+    Disabled entirely (every get calls the loader) when IDENTITY_CACHE_ENABLED is false.
+    With a version_key, everything is dropped once another worker bumps that shared
+    version; it is checked at most every IDENTITY_CACHE_CHECK_INTERVAL seconds.
+    """
+    
+    _MISSING = object()
+    
+    def __init__(self, version_key=None):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version_key = version_key
+        self._version = None
+        self._checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+    
+    def _sync(self, now):
+        if self._version_key is None or now - self._checked_at < current_app.config['IDENTITY_CACHE_CHECK_INTERVAL']:
+            return
+        version = get_cache_version(self._version_key)
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._checked_at = now
+    
+    def get(self, key, loader):
+        """Return the cached value for key, calling loader() on a miss"""
+        if not current_app.config['IDENTITY_CACHE_ENABLED']:
+            return loader()
+        
+        now = time.monotonic()
+        self._sync(now)
+        with self._lock:
+            value, expires = self._entries.get(key, (self._MISSING, 0))
+            if value is not self._MISSING and expires > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        
+        value = loader()
+        with self._lock:
+            self._entries[key] = (value, now + current_app.config['IDENTITY_CACHE_TTL'])
+            self._entries.move_to_end(key)
+            while len(self._entries) > current_app.config['IDENTITY_CACHE_SIZE']:
+                self._entries.popitem(last=False)
+        return value
+    
+    def invalidate(self, key=None):
+        """Drop one key, or everything when key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+class CachedUser(UserMixin):
+    """Detached snapshot of a User row, safe to share across requests"""
+    
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+        self.role = user.role
+
+IDENTITY_CACHE_VERSION = 'identity'
+
+user_cache = app_extension('user_cache')
+settings_cache = app_extension('settings_cache')
+
+def load_cached_user(user_id):
+    user = User.query.get(user_id)
+    return CachedUser(user) if user else None
+
+def load_cached_settings(user_id):
+    user_settings = Settings.query.filter_by(user_id=user_id).first()
+    if not user_settings:
+        return None
+    return {'theme': user_settings.theme, 'icon_set': user_settings.icon_set}
+
+# Writes through any code path (settings form, role changes) drop stale entries
+@db.event.listens_for(User, 'after_update')
+@db.event.listens_for(User, 'after_delete')
+def invalidate_cached_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
+
+@db.event.listens_for(Settings, 'after_insert')
+@db.event.listens_for(Settings, 'after_update')
+@db.event.listens_for(Settings, 'after_delete')
+def invalidate_cached_settings(mapper, connection, target):
+    settings_cache.invalidate(target.user_id)
+
+@db.event.listens_for(db.session, 'before_flush')
+def bump_identity_version(session, flush_context, instances):
+    """Make other workers drop cached users and settings when either changes"""
+    changed = itertools.chain(session.new, session.dirty, session.deleted)
+    if session.info.get('identity_bumped') or not any(isinstance(obj, (User, Settings)) for obj in changed):
+        return
+    # Core statements, as in transaction_change_seq, because the session is flushing
+    connection = session.connection()
+    updated = connection.execute(
+        db.update(CacheVersion).where(CacheVersion.name == IDENTITY_CACHE_VERSION).values(version=CacheVersion.version + 1)
+    ).rowcount
+    if not updated:
+        connection.execute(db.insert(CacheVersion).values(name=IDENTITY_CACHE_VERSION, version=1))
+    session.info['identity_bumped'] = True
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    user_id = int(user_id)
+    return user_cache.get(user_id, lambda: load_cached_user(user_id))
 
 # Routes
-@app.route('/')
+@bp.route('/')
 def index():
     """Main dashboard"""
     if not current_user.is_authenticated:
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
     
     # Get active audit sessions
-    active_sessions = AuditSession.query.filter_by(status='active').all()
+    active_sessions = AuditSession.query.options(db.joinedload(AuditSession.user)).filter_by(status='active').all()
     
     # Get recent inventory updates
     recent_items = InventoryItem.query.order_by(InventoryItem.last_updated.desc()).limit(10).all()
     
     return render_template('dashboard.html', 
                          active_sessions=active_sessions, 
-                         recent_items=recent_items)
+                         recent_items=recent_items,
+                         summary=dashboard_summary())
 
-@app.route('/login', methods=['GET', 'POST'])
+@bp.route('/login', methods=['GET', 'POST'])
 def login():
     """User login"""
     if request.method == 'POST':
@@ -126,27 +1156,29 @@ def login():
         
         if user and check_password_hash(user.password_hash, password):
             login_user(user)
-            return redirect(url_for('index'))
+            return redirect(url_for('main.index'))
         else:
             return render_template('login.html', error='Invalid credentials')
     
     return render_template('login.html')
 
-@app.route('/logout')
+@bp.route('/logout')
 @login_required
 def logout():
     """User logout"""
     logout_user()
-    return redirect(url_for('login'))
+    return redirect(url_for('main.login'))
 
-@app.route('/inventory')
+@bp.route('/inventory')
 @login_required
 def inventory():
     """Inventory management page"""
-    items = InventoryItem.query.all()
-    return render_template('inventory.html', items=items)
+    # Rows are fetched page by page from /api/items
+    categories = [row[0] for row in db.session.query(InventoryItem.category).distinct().order_by(InventoryItem.category) if row[0]]
+    locations = [row[0] for row in db.session.query(InventoryItem.location).distinct().order_by(InventoryItem.location) if row[0]]
+    return render_template('inventory.html', categories=categories, locations=locations)
 
-@app.route('/settings', methods=['GET', 'POST'])
+@bp.route('/settings', methods=['GET', 'POST'])
 @login_required
 def settings():
     """Admin settings page for theme and icon customization"""
@@ -181,17 +1213,17 @@ def settings():
         
         db.session.commit()
         
-        # Emit real-time update to all users (optional)
-        socketio.emit('theme_updated', {
+        # Sync the user's other open tabs
+        event_bus.publish('theme_updated', {
             'theme': theme,
             'icon_set': icon_set
-        }, room='all_users')
+        }, [user_room(current_user.id)])
         
-        return redirect(url_for('settings'))
+        return redirect(url_for('main.settings'))
     
     return render_template('settings.html', settings=user_settings)
 
-@app.route('/start_audit', methods=['POST'])
+@bp.route('/start_audit', methods=['POST'])
 @login_required
 def start_audit():
     """Start a new inventory audit session"""
@@ -212,14 +1244,14 @@ def start_audit():
     db.session.add(session)
     db.session.commit()
     
-    # Notify all users about new session
-    socketio.emit('audit_started', {
+    # Notify the session room and the watch-role rooms (AUDIT_WATCH_ROLES)
+    event_bus.publish('audit_started', {
         'session_id': session.session_id,
         'user': current_user.username,
         'start_time': session.start_time.isoformat(),
         'items_scanned': 0,
         'discrepancies_found': 0
-    }, room='all_users')
+    }, audit_watch_rooms(session.session_id))
     
     return jsonify({
         'success': True, 
@@ -227,7 +1259,7 @@ def start_audit():
         'message': 'Audit session started successfully'
     })
 
-@app.route('/audit/<session_id>')
+@bp.route('/audit/<session_id>')
 @login_required
 def audit_interface(session_id):
     """Audit interface for scanning items"""
@@ -238,19 +1270,20 @@ def audit_interface(session_id):
     
     # Check if user owns this session
     if session.user_id != current_user.id:
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
     
-    items = InventoryItem.query.all()
-    return render_template('audit.html', session=session, items=items)
+    # Quick reference items are fetched page by page from /api/items
+    total_items = InventoryItem.query.count()
+    return render_template('audit.html', session=session, total_items=total_items)
 
 # API Routes
-@app.route('/api/active_session')
+@bp.route('/api/active_session')
 @login_required
 def get_active_session():
     """Get currently active audit session"""
     session = AuditSession.query.filter_by(status='active').first()
     if session:
-        return jsonify({
+        return conditional_json(f'active-{session.session_id}-{session.change_seq}', lambda: {
             'session': {
                 'session_id': session.session_id,
                 'user': session.user.username,
@@ -259,43 +1292,33 @@ def get_active_session():
                 'discrepancies_found': session.discrepancies_found
             }
         })
-    return jsonify({'session': None})
+    return conditional_json('active-none', lambda: {'session': None})
 
-@app.route('/api/session/<session_id>')
+@bp.route('/api/session/<session_id>')
 @login_required
 def get_session_details(session_id):
     """Get session details"""
     session = AuditSession.query.filter_by(session_id=session_id).first_or_404()
     
-    return jsonify({
-        'session_id': session.session_id,
-        'user': session.user.username,
-        'start_time': session.start_time.isoformat(),
-        'end_time': session.end_time.isoformat() if session.end_time else None,
-        'status': session.status,
-        'items_scanned': session.items_scanned,
-        'discrepancies_found': session.discrepancies_found,
-        'notes': session.notes
-    })
+    # change_seq moves on every write to the session, counters included
+    return conditional_json(f'session-{session.id}-{session.change_seq}', lambda: serialize_session(session))
 
-@app.route('/api/settings')
+@bp.route('/api/settings')
 @login_required
 def get_current_settings():
     """Get current user settings for theme and icons"""
-    user_settings = Settings.query.filter_by(user_id=current_user.id).first()
+    user_settings = settings_cache.get(current_user.id, lambda: load_cached_settings(current_user.id))
     if not user_settings:
         # Return defaults if no settings exist
-        return jsonify({
+        user_settings = {
             'theme': 'light',
             'icon_set': 'fontawesome'
-        })
+        }
     
-    return jsonify({
-        'theme': user_settings.theme,
-        'icon_set': user_settings.icon_set
-    })
+    # Two short fields: the validator is the content itself, served from the settings cache
+    return conditional_json(f"settings-{user_settings['theme']}-{user_settings['icon_set']}", lambda: user_settings)
 
-@app.route('/api/session/<session_id>/end', methods=['POST'])
+@bp.route('/api/session/<session_id>/end', methods=['POST'])
 @login_required
 def end_audit_session(session_id):
     """End an audit session"""
@@ -305,27 +1328,438 @@ def end_audit_session(session_id):
         status='active'
     ).first_or_404()
     
+    # Journaled scans must be in the database first so the final counters include them;
+    # this worker applies its own slot, other workers' appliers apply theirs
+    scan_journal = current_scan_journal()
+    if scan_journal is not None:
+        deadline = time.monotonic() + current_app.config['SCAN_JOURNAL_END_WAIT']
+        while True:
+            scan_journal.drain()
+            if not scan_journal.unapplied(session.id):
+                break
+            if time.monotonic() >= deadline:
+                return jsonify({'success': False, 'message': 'Scans are still being applied; try again'}), 409
+            socketio.sleep(current_app.config['SCAN_JOURNAL_APPLY_INTERVAL'])
+        db.session.refresh(session)
+    
     session.end_time = datetime.utcnow()
     session.status = 'completed'
     session.notes = request.json.get('notes', '')
     
     db.session.commit()
     
-    # Notify all users
-    socketio.emit('audit_completed', {
+    # Notify the session room and the watch-role rooms (AUDIT_WATCH_ROLES)
+    event_bus.publish('audit_completed', {
         'session_id': session.session_id,
         'user': current_user.username,
         'end_time': session.end_time.isoformat(),
         'items_scanned': session.items_scanned,
         'discrepancies_found': session.discrepancies_found
-    }, room='all_users')
+    }, audit_watch_rooms(session.session_id))
     
     return jsonify({
         'success': True,
         'message': 'Audit session completed successfully'
     })
 
-@app.route('/api/scan', methods=['POST'])
+class JournalCheckpoint(db.Model):
+    """Last scan journal sequence applied to the database, per journal file"""
+    name = db.Column(db.String(255), primary_key=True)
+    sequence = db.Column(db.Integer, nullable=False, default=0)
+
+def apply_journal_records(records, journal_name):
+    """Fold journaled scans into the database and advance the checkpoint in one transaction"""
+    # Records at or below the checkpoint were committed by an earlier run
+    checkpoint = db.session.query(JournalCheckpoint.sequence).filter_by(name=journal_name).scalar() or 0
+    records = [record for record in records if record['seq'] > checkpoint]
+    if not records:
+        return
+    
+    sessions = {
+        session.id: session
+        for session in AuditSession.query.filter(AuditSession.id.in_({record['session'] for record in records}))
+    }
+    items = {
+        item.id: item
+        for item in InventoryItem.query.filter(InventoryItem.id.in_({record['item'] for record in records}))
+    }
+    
+    # A replayed client scan can be journaled more than once; only the first copy applies
+    keys = {record['key'] for record in records if record.get('key')}
+    seen_keys = set()
+    if keys:
+        seen_keys = {
+            tuple(row) for row in db.session.query(AuditLog.session_id, AuditLog.idempotency_key).filter(
+                AuditLog.idempotency_key.in_(keys)
+            )
+        }
+    
+    aggregates = AggregateDelta()
+    audit_logs = []
+    scanned_items = []
+    discrepancies = []
+    touched_sessions = {}
+    
+    for record in records:
+        session = sessions.get(record['session'])
+        item = items.get(record['item'])
+        if not session or not item:
+            current_app.logger.warning('Skipping journaled scan %s: session or item no longer exists', record['seq'])
+            continue
+        
+        key = record.get('key')
+        if key:
+            if (session.id, key) in seen_keys:
+                continue
+            seen_keys.add((session.id, key))
+        
+        timestamp = datetime.fromisoformat(record['ts'])
+        actual_quantity = record['quantity']
+        discrepancy = actual_quantity - item.expected_quantity
+        
+        # Acknowledged while the session was being closed: keep the count, but flag it
+        action = 'scan'
+        if session.status != 'active':
+            action = 'late_scan'
+            current_app.logger.warning('Journaled scan %s arrived after session %s ended', record['seq'], session.session_id)
+        
+        audit_logs.append({
+            'session_id': session.id,
+            'user_id': record['user'],
+            'item_id': item.id,
+            'action': action,
+            'old_quantity': item.actual_quantity,
+            'new_quantity': actual_quantity,
+            'discrepancy': discrepancy,
+            'timestamp': timestamp,
+            'notes': record.get('notes', ''),
+            'idempotency_key': key
+        })
+        
+        before = item_snapshot(item)
+        item.actual_quantity = actual_quantity
+        item.last_updated = timestamp
+        aggregates.change(before, item_snapshot(item))
+        
+        session.items_scanned += 1
+        if discrepancy != 0:
+            session.discrepancies_found += 1
+        touched_sessions[session.id] = session
+        
+        rooms = scan_rooms(session.session_id, item.location)
+        scanned_items.append((rooms, {
+            'item_id': item.id,
+            'item_name': item.name,
+            'actual_quantity': actual_quantity,
+            'expected_quantity': item.expected_quantity,
+            'discrepancy': discrepancy,
+            'change_seq': transaction_change_seq()
+        }))
+        if discrepancy != 0:
+            discrepancies.append((rooms, {
+                'item_name': item.name,
+                'discrepancy': discrepancy,
+                'expected': item.expected_quantity,
+                'actual': actual_quantity
+            }))
+    
+    if audit_logs:
+        db.session.bulk_insert_mappings(AuditLog, audit_logs)
+        aggregates.apply()
+    
+    updated = JournalCheckpoint.query.filter_by(name=journal_name).update({JournalCheckpoint.sequence: records[-1]['seq']})
+    if not updated:
+        db.session.add(JournalCheckpoint(name=journal_name, sequence=records[-1]['seq']))
+    db.session.commit()
+    
+    event_bus.publish_batch('items_scanned', 'items', scanned_items, list)
+    event_bus.publish_batch('discrepancies_found', 'discrepancies', discrepancies, list)
+    for session in touched_sessions.values():
+        event_bus.publish_audit_update({
+            'session_id': session.session_id,
+            'items_scanned': session.items_scanned,
+            'discrepancies_found': session.discrepancies_found
+        }, [session_room(session.session_id)])
+
+def journal_paths(template):
+    """Every journal file a SCAN_JOURNAL_PATH template can refer to"""
+    if '{worker}' not in template:
+        return [template]
+    return sorted(glob.glob(template.replace('{worker}', '*')))
+
+class ScanJournal:
+    """Append-only, fsynced log of acknowledged scans that are applied to the database later.
+    
+    Appends use group commit: the first writer to need a sync becomes the leader and
+    fsyncs once for every record written so far, while later writers wait for it or
+    for the next leader. A background applier folds durable records into the database
+    in batches and stores the last applied sequence in JournalCheckpoint in the same
+    transaction, so each scan is applied exactly once and anything past the checkpoint
+    is replayed from the file when the journal is opened again.
+    
+    A journal file belongs to one process, enforced with a lock file. With several
+    workers put {worker} in SCAN_JOURNAL_PATH: each worker claims the lowest free
+    slot, so a restarted worker picks up (and replays) a journal its predecessor left.
+    """
+    
+    def __init__(self, path):
+        self.template = os.path.abspath(path)
+        self.path = self.template
+        self._lock_file = None
+        self._lock = threading.Lock()
+        self._synced = threading.Condition(self._lock)
+        self._apply_lock = threading.Lock()
+        self._file = None
+        self._sequence = 0
+        self._synced_sequence = 0
+        self._applied_sequence = 0
+        self._syncing = False
+        self._unsynced = []
+        self._pending = []
+        self._applier = None
+    
+    def _recover(self):
+        # Drop a torn final line left by a crash mid-write; it was never acknowledged
+        records = []
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, 'rb+') as journal:
+            content = journal.read()
+            end = content.rfind(b'\n') + 1
+            if end < len(content):
+                journal.truncate(end)
+        for line in content[:end].splitlines():
+            records.append(json.loads(line))
+        return records
+    
+    def _claim(self):
+        """Lock a journal file for this process and return its path"""
+        slots = itertools.count() if '{worker}' in self.template else [None]
+        for slot in slots:
+            path = self.template if slot is None else self.template.replace('{worker}', str(slot))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            lock_file = open(f'{path}.lock', 'a')
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                if slot is None:
+                    raise RuntimeError(f'Scan journal {path} is used by another process; put {{worker}} in SCAN_JOURNAL_PATH')
+                continue
+            self._lock_file = lock_file
+            return path
+    
+    def open(self):
+        """Open the journal and queue every record past the database checkpoint"""
+        with self._lock:
+            if self._file is not None:
+                return
+            self.path = self._claim()
+            checkpoint = db.session.query(JournalCheckpoint.sequence).filter_by(name=self.path).scalar() or 0
+            records = self._recover()
+            self._pending = [record for record in records if record['seq'] > checkpoint]
+            self._sequence = self._synced_sequence = max([checkpoint] + [record['seq'] for record in records])
+            self._applied_sequence = checkpoint
+            self._file = open(self.path, 'a', encoding='utf-8')
+    
+    def start(self):
+        """Open the journal and start the background applier"""
+        if self._applier is not None:
+            return
+        self.open()
+        with self._lock:
+            if self._applier is None:
+                self._applier = socketio.start_background_task(self._run, current_app._get_current_object())
+    
+    def append(self, record):
+        """Write a scan and return its sequence once it is durable on disk"""
+        return self.append_many([record])
+    
+    def append_many(self, records):
+        """Write scans in order and return the last sequence once all of them are durable"""
+        with self._lock:
+            for record in records:
+                self._sequence += 1
+                record = dict(record, seq=self._sequence)
+                self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+                self._unsynced.append(record)
+            sequence = self._sequence
+            
+            while self._synced_sequence < sequence:
+                if self._syncing:
+                    self._synced.wait()
+                    continue
+                
+                # Lead a sync covering everything written so far
+                self._syncing = True
+                self._file.flush()
+                target, batch, self._unsynced = self._sequence, self._unsynced, []
+                self._lock.release()
+                try:
+                    # Off the hub, so other requests keep appending and share the next sync
+                    run_blocking(os.fsync, self._file.fileno())
+                except OSError:
+                    self._lock.acquire()
+                    self._unsynced = batch + self._unsynced
+                    self._syncing = False
+                    self._synced.notify_all()
+                    raise
+                self._lock.acquire()
+                self._synced_sequence = target
+                self._pending.extend(batch)
+                self._syncing = False
+                self._synced.notify_all()
+        return sequence
+    
+    def apply_pending(self):
+        """Apply one batch of durable records; returns how many were applied"""
+        with self._apply_lock:
+            with self._lock:
+                batch = self._pending[:current_app.config['SCAN_JOURNAL_APPLY_BATCH']]
+            if not batch:
+                return 0
+            
+            # A concurrent item edit rolls the batch back; it is re-read and applied again
+            attempts = current_app.config['SCAN_CONFLICT_RETRIES'] + 1
+            for attempt in range(attempts):
+                try:
+                    apply_journal_records(batch, self.path)
+                    break
+                except Exception as e:
+                    db.session.rollback()
+                    if not isinstance(e, StaleDataError) or attempt + 1 == attempts:
+                        raise
+            
+            with self._lock:
+                del self._pending[:len(batch)]
+                self._applied_sequence = batch[-1]['seq']
+                self._compact()
+            return len(batch)
+    
+    def pending_scans(self, session):
+        """Refresh the session and return its journaled scans not yet in the database.
+        
+        Holding the apply lock means no batch is between its commit and its removal
+        from the pending list, so the session's counters and the returned records never
+        count a scan twice or miss it.
+        """
+        with self._apply_lock:
+            db.session.refresh(session)
+            with self._lock:
+                return [record for record in self._pending + self._unsynced if record['session'] == session.id]
+    
+    def unapplied(self, session_pk):
+        """Count a session's scans not yet applied by any worker, reading every journal slot"""
+        count = 0
+        for path in journal_paths(self.template):
+            checkpoint = db.session.query(JournalCheckpoint.sequence).filter_by(name=path).scalar() or 0
+            try:
+                with open(path, 'rb') as journal:
+                    for line in journal:
+                        # A line without its newline is still being written by its worker
+                        if not line.endswith(b'\n'):
+                            break
+                        record = json.loads(line)
+                        if record['session'] == session_pk and record['seq'] > checkpoint:
+                            count += 1
+            except FileNotFoundError:
+                continue
+        return count
+    
+    def drain(self):
+        """Apply every record that is durable so far"""
+        while self.apply_pending():
+            pass
+    
+    def _compact(self):
+        # Once everything written has been applied the file can start over; sequences
+        # keep counting from the checkpoint
+        if (self._applied_sequence == self._sequence and not self._syncing
+                and self._file.tell() >= current_app.config['SCAN_JOURNAL_ROTATE_BYTES']):
+            self._file.seek(0)
+            self._file.truncate()
+    
+    def _run(self, app):
+        while True:
+            socketio.sleep(app.config['SCAN_JOURNAL_APPLY_INTERVAL'])
+            try:
+                with app.app_context():
+                    self.drain()
+            except Exception:
+                app.logger.exception('Applying the scan journal failed; retrying')
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'path': self.path,
+                'last_sequence': self._sequence,
+                'synced_sequence': self._synced_sequence,
+                'applied_sequence': self._applied_sequence,
+                'pending': len(self._pending)
+            }
+
+def current_scan_journal():
+    """The app's scan journal, or None when SCAN_JOURNAL_ENABLED is off"""
+    return current_app.extensions.get('scan_journal')
+
+@bp.before_app_request
+def start_scan_journal():
+    # Replays unapplied scans from a previous run before the first request is served
+    scan_journal = current_scan_journal()
+    if scan_journal is not None:
+        scan_journal.start()
+
+def valid_idempotency_key(key):
+    return key is None or (isinstance(key, str) and 0 < len(key) <= 64)
+
+def applied_idempotency_keys(session_pk, keys):
+    """The subset of keys already recorded for an audit session"""
+    keys = {key for key in keys if key}
+    if not keys:
+        return set()
+    return {
+        key for (key,) in db.session.query(AuditLog.idempotency_key).filter(
+            AuditLog.session_id == session_pk, AuditLog.idempotency_key.in_(keys)
+        )
+    }
+
+def scanned_item_state(item):
+    """Current quantities of an item, returned when a replayed scan is acknowledged again"""
+    return {
+        'id': item.id,
+        'name': item.name,
+        'expected_quantity': item.expected_quantity,
+        'actual_quantity': item.actual_quantity,
+        'discrepancy': (item.actual_quantity or 0) - (item.expected_quantity or 0)
+    }
+
+def record_scan(session, item, actual_quantity, notes, idempotency_key=None):
+    """Log a scan and apply it to the item, session counters and aggregates; returns the discrepancy"""
+    before = item_snapshot(item)
+    discrepancy = actual_quantity - item.expected_quantity
+    
+    db.session.add(AuditLog(
+        session_id=session.id,
+        user_id=current_user.id,
+        item_id=item.id,
+        action='scan',
+        old_quantity=item.actual_quantity,
+        new_quantity=actual_quantity,
+        discrepancy=discrepancy,
+        notes=notes,
+        idempotency_key=idempotency_key
+    ))
+    
+    item.actual_quantity = actual_quantity
+    item.last_updated = datetime.utcnow()
+    AggregateDelta().change(before, item_snapshot(item)).apply()
+    
+    session.items_scanned += 1
+    if discrepancy != 0:
+        session.discrepancies_found += 1
+    return discrepancy
+
+@bp.route('/api/scan', methods=['POST'])
 @login_required
 def scan_item():
     """Scan an item during audit"""
@@ -345,62 +1779,101 @@ def scan_item():
         return jsonify({'success': False, 'message': 'Invalid session'}), 400
     
     # Find item by barcode or SKU
-    item = InventoryItem.query.filter(
-        (InventoryItem.barcode == barcode) | (InventoryItem.sku == barcode)
-    ).first()
+    item = resolve_item(barcode)
     
     if not item:
-        return jsonify({'success': False, 'message': 'Item not found'}), 404
+        # Partial or mistyped codes get the closest catalog matches to pick from
+        suggestions = search_items(barcode, 5)[0] if isinstance(barcode, str) else []
+        return jsonify({
+            'success': False,
+            'message': 'Item not found',
+            'suggestions': [serialize_item(suggestion) for suggestion, _ in suggestions]
+        }), 404
     
-    # Record audit log
-    old_quantity = item.actual_quantity
-    discrepancy = actual_quantity - item.expected_quantity
+    if not isinstance(actual_quantity, int) or isinstance(actual_quantity, bool) or actual_quantity < 0:
+        return jsonify({'success': False, 'message': 'Invalid quantity'}), 400
     
-    audit_log = AuditLog(
-        session_id=session.id,
-        user_id=current_user.id,
-        item_id=item.id,
-        action='scan',
-        old_quantity=old_quantity,
-        new_quantity=actual_quantity,
-        discrepancy=discrepancy,
-        notes=data.get('notes', '')
-    )
+    idempotency_key = data.get('idempotency_key')
+    if not valid_idempotency_key(idempotency_key):
+        return jsonify({'success': False, 'message': 'Invalid idempotency key'}), 400
     
-    # Update item quantity
-    item.actual_quantity = actual_quantity
-    item.last_updated = datetime.utcnow()
+    # A replayed scan is acknowledged again without being applied twice
+    if idempotency_key and applied_idempotency_keys(session.id, [idempotency_key]):
+        return jsonify({'success': True, 'duplicate': True, 'item': scanned_item_state(item)})
     
-    # Update session stats
-    session.items_scanned += 1
-    if discrepancy != 0:
-        session.discrepancies_found += 1
+    scan_journal = current_scan_journal()
+    if scan_journal is not None:
+        # Acknowledge once the scan is durable in the journal; the applier writes it to the database
+        sequence = scan_journal.append({
+            'session': session.id,
+            'user': current_user.id,
+            'item': item.id,
+            'quantity': actual_quantity,
+            'expected': item.expected_quantity,
+            'notes': data.get('notes', ''),
+            'key': idempotency_key,
+            'ts': datetime.utcnow().isoformat()
+        })
+        return jsonify({
+            'success': True,
+            'journaled': True,
+            'sequence': sequence,
+            'item': {
+                'id': item.id,
+                'name': item.name,
+                'expected_quantity': item.expected_quantity,
+                'actual_quantity': actual_quantity,
+                'discrepancy': actual_quantity - item.expected_quantity
+            }
+        })
     
-    db.session.add(audit_log)
-    db.session.commit()
+    # A concurrent write bumps the item version; re-read the item and apply the scan again
+    item_id = item.id
+    for attempt in range(current_app.config['SCAN_CONFLICT_RETRIES'] + 1):
+        if attempt:
+            item = db.session.get(InventoryItem, item_id)
+            if not item:
+                return jsonify({'success': False, 'message': 'Item not found'}), 404
+        try:
+            discrepancy = record_scan(session, item, actual_quantity, data.get('notes', ''), idempotency_key)
+            db.session.commit()
+            break
+        except StaleDataError:
+            db.session.rollback()
+        except IntegrityError:
+            db.session.rollback()
+            # Only a concurrent replay of the same scan committing first counts as a duplicate
+            if idempotency_key and applied_idempotency_keys(session.id, [idempotency_key]):
+                return jsonify({'success': True, 'duplicate': True, 'item': scanned_item_state(item)})
+            current_app.logger.warning('Scan of item %s in session %s violated a constraint', item_id, session.session_id, exc_info=True)
+            return item_conflict(item_id)
+    else:
+        return item_conflict(item_id)
     
-    # Emit real-time updates
-    socketio.emit('item_scanned', {
+    # Queue real-time updates; the event bus coalesces them per window
+    rooms = scan_rooms(session.session_id, item.location)
+    event_bus.publish_item_scanned({
         'item_id': item.id,
         'item_name': item.name,
         'actual_quantity': actual_quantity,
         'expected_quantity': item.expected_quantity,
-        'discrepancy': discrepancy
-    }, room='all_users')
+        'discrepancy': discrepancy,
+        'change_seq': item.change_seq
+    }, rooms)
     
-    socketio.emit('audit_updated', {
+    event_bus.publish_audit_update({
         'session_id': session.session_id,
         'items_scanned': session.items_scanned,
         'discrepancies_found': session.discrepancies_found
-    }, room='all_users')
+    }, [session_room(session.session_id)])
     
     if discrepancy != 0:
-        socketio.emit('discrepancy_found', {
+        event_bus.publish_discrepancy({
             'item_name': item.name,
             'discrepancy': discrepancy,
             'expected': item.expected_quantity,
             'actual': actual_quantity
-        }, room='all_users')
+        }, rooms)
     
     return jsonify({
         'success': True,
@@ -413,7 +1886,260 @@ def scan_item():
         }
     })
 
-@app.route('/api/item', methods=['POST'])
+def batch_scan_error(scan, items_by_code):
+    """Why a batch entry cannot be applied, or None"""
+    if not isinstance(scan, dict):
+        return 'Invalid scan'
+    actual_quantity = scan.get('actual_quantity')
+    if not isinstance(actual_quantity, int) or isinstance(actual_quantity, bool) or actual_quantity < 0:
+        return 'Invalid quantity'
+    if not items_by_code.get(scan.get('barcode')):
+        return 'Item not found'
+    if not valid_idempotency_key(scan.get('idempotency_key')):
+        return 'Invalid idempotency key'
+    return None
+
+def journal_scan_batch(scan_journal, session, scans, items_by_code):
+    """Acknowledge a batch once it is durable in the scan journal.
+    
+    Batches share the journal with /api/scan, so the applier writes every scan of a
+    session in the order it was acknowledged. The returned counters include scans
+    still waiting in the journal.
+    """
+    keys = [scan.get('idempotency_key') for scan in scans if isinstance(scan, dict) and isinstance(scan.get('idempotency_key'), str)]
+    pending = scan_journal.pending_scans(session)
+    seen_keys = applied_idempotency_keys(session.id, keys) | {record['key'] for record in pending if record.get('key')}
+    
+    now = datetime.utcnow().isoformat()
+    results = []
+    records = []
+    for index, scan in enumerate(scans):
+        error = batch_scan_error(scan, items_by_code)
+        if error:
+            results.append({'index': index, 'success': False, 'message': error})
+            continue
+        item = items_by_code[scan['barcode']]
+        idempotency_key = scan.get('idempotency_key')
+        if idempotency_key in seen_keys:
+            results.append({'index': index, 'success': True, 'duplicate': True, 'item': scanned_item_state(item)})
+            continue
+        if idempotency_key:
+            seen_keys.add(idempotency_key)
+        
+        actual_quantity = scan['actual_quantity']
+        records.append({
+            'session': session.id,
+            'user': current_user.id,
+            'item': item.id,
+            'quantity': actual_quantity,
+            'expected': item.expected_quantity,
+            'notes': scan.get('notes', ''),
+            'key': idempotency_key,
+            'ts': now
+        })
+        results.append({'index': index, 'success': True, 'item': {
+            'id': item.id,
+            'name': item.name,
+            'expected_quantity': item.expected_quantity,
+            'actual_quantity': actual_quantity,
+            'discrepancy': actual_quantity - item.expected_quantity
+        }})
+    
+    sequence = scan_journal.append_many(records) if records else None
+    
+    # Discrepancies of unapplied scans are projected from the expected quantity when journaled
+    queued = pending + records
+    return jsonify({
+        'success': True,
+        'journaled': True,
+        'sequence': sequence,
+        'accepted': len(records),
+        'duplicates': sum(1 for result in results if result.get('duplicate')),
+        'rejected': sum(1 for result in results if not result['success']),
+        'items_scanned': session.items_scanned + len(queued),
+        'discrepancies_found': session.discrepancies_found + sum(
+            1 for record in queued if record['quantity'] != record.get('expected', record['quantity'])
+        ),
+        'results': results
+    })
+
+@bp.route('/api/scan/batch', methods=['POST'])
+@login_required
+def scan_batch():
+    """Ingest an ordered batch of buffered scans for one audit session"""
+    data = request.json or {}
+    session_id = data.get('session_id')
+    scans = data.get('scans')
+    
+    if not isinstance(scans, list) or not scans:
+        return jsonify({'success': False, 'message': 'No scans provided'}), 400
+    
+    if len(scans) > current_app.config['SCAN_BATCH_MAX_SIZE']:
+        return jsonify({
+            'success': False,
+            'message': f"Batch exceeds {current_app.config['SCAN_BATCH_MAX_SIZE']} scans"
+        }), 413
+    
+    # Get active session
+    session = AuditSession.query.filter_by(
+        session_id=session_id,
+        user_id=current_user.id,
+        status='active'
+    ).first()
+    
+    if not session:
+        return jsonify({'success': False, 'message': 'Invalid session'}), 400
+    
+    # Resolve codes through the index, then load every item with a single query
+    codes = {scan.get('barcode') for scan in scans if isinstance(scan, dict) and scan.get('barcode')}
+    entries = {code: item_index.lookup(code) for code in codes}
+    items_by_code = {}
+    
+    indexed_ids = {entry['id'] for entry in entries.values() if entry}
+    if indexed_ids:
+        items_by_id = {item.id: item for item in InventoryItem.query.filter(InventoryItem.id.in_(indexed_ids))}
+        for code, entry in entries.items():
+            item = items_by_id.get(entry['id']) if entry else None
+            if item and code in (item.barcode, item.sku):
+                items_by_code[code] = item
+    
+    unresolved = codes - set(items_by_code)
+    if unresolved:
+        matches = InventoryItem.query.filter(
+            InventoryItem.barcode.in_(unresolved) | InventoryItem.sku.in_(unresolved)
+        ).all()
+        for item in matches:
+            if item.sku in unresolved:
+                items_by_code.setdefault(item.sku, item)
+        # Barcode matches take precedence over SKU matches
+        for item in matches:
+            if item.barcode in unresolved:
+                items_by_code[item.barcode] = item
+            item_index.put(item)
+    
+    scan_journal = current_scan_journal()
+    if scan_journal is not None:
+        return journal_scan_batch(scan_journal, session, scans, items_by_code)
+    
+    def apply_scans():
+        now = datetime.utcnow()
+        aggregates = AggregateDelta()
+        results = []
+        audit_logs = []
+        scanned_items = []
+        discrepancies = []
+        
+        # Scans replayed from a client queue carry the key they were first sent with
+        seen_keys = applied_idempotency_keys(session.id, [
+            scan.get('idempotency_key') for scan in scans
+            if isinstance(scan, dict) and isinstance(scan.get('idempotency_key'), str)
+        ])
+        
+        # Apply scans in order so repeated reads of one item chain their quantities
+        for index, scan in enumerate(scans):
+            error = batch_scan_error(scan, items_by_code)
+            if error:
+                results.append({'index': index, 'success': False, 'message': error})
+                continue
+            
+            actual_quantity = scan['actual_quantity']
+            item = items_by_code[scan['barcode']]
+            idempotency_key = scan.get('idempotency_key')
+            if idempotency_key in seen_keys:
+                results.append({'index': index, 'success': True, 'duplicate': True, 'item': scanned_item_state(item)})
+                continue
+            if idempotency_key:
+                seen_keys.add(idempotency_key)
+            
+            old_quantity = item.actual_quantity
+            discrepancy = actual_quantity - item.expected_quantity
+            
+            audit_logs.append({
+                'session_id': session.id,
+                'user_id': current_user.id,
+                'item_id': item.id,
+                'action': 'scan',
+                'old_quantity': old_quantity,
+                'new_quantity': actual_quantity,
+                'discrepancy': discrepancy,
+                'timestamp': now,
+                'notes': scan.get('notes', ''),
+                'idempotency_key': idempotency_key
+            })
+            
+            before = item_snapshot(item)
+            item.actual_quantity = actual_quantity
+            item.last_updated = now
+            aggregates.change(before, item_snapshot(item))
+            
+            session.items_scanned += 1
+            if discrepancy != 0:
+                session.discrepancies_found += 1
+            
+            item_data = {
+                'id': item.id,
+                'name': item.name,
+                'expected_quantity': item.expected_quantity,
+                'actual_quantity': actual_quantity,
+                'discrepancy': discrepancy
+            }
+            results.append({'index': index, 'success': True, 'item': item_data})
+            
+            scanned_items.append((item.location, {
+                'item_id': item.id,
+                'item_name': item.name,
+                'actual_quantity': actual_quantity,
+                'expected_quantity': item.expected_quantity,
+                'discrepancy': discrepancy,
+                'change_seq': transaction_change_seq()
+            }))
+            if discrepancy != 0:
+                discrepancies.append((item.location, {
+                    'item_name': item.name,
+                    'discrepancy': discrepancy,
+                    'expected': item.expected_quantity,
+                    'actual': actual_quantity
+                }))
+        
+        if audit_logs:
+            db.session.bulk_insert_mappings(AuditLog, audit_logs)
+            aggregates.apply()
+        db.session.commit()
+        return results, audit_logs, scanned_items, discrepancies
+    
+    # A concurrent write to any scanned item bumps its version, and a concurrent replay
+    # of the same queue commits its keys first; either way re-read and retry the batch
+    for attempt in range(current_app.config['SCAN_CONFLICT_RETRIES'] + 1):
+        try:
+            results, audit_logs, scanned_items, discrepancies = apply_scans()
+            break
+        except (StaleDataError, IntegrityError):
+            db.session.rollback()
+    else:
+        return jsonify({'success': False, 'message': 'Items were changed concurrently; retry the batch'}), 409
+    
+    # The whole batch goes out as one message per event type and room
+    if audit_logs:
+        rooms_for = lambda location: scan_rooms(session.session_id, location)
+        event_bus.publish_batch('items_scanned', 'items', scanned_items, rooms_for)
+        event_bus.publish_batch('discrepancies_found', 'discrepancies', discrepancies, rooms_for)
+        event_bus.publish_audit_update({
+            'session_id': session.session_id,
+            'items_scanned': session.items_scanned,
+            'discrepancies_found': session.discrepancies_found
+        }, [session_room(session.session_id)])
+    
+    return jsonify({
+        'success': True,
+        'accepted': len(audit_logs),
+        'duplicates': sum(1 for result in results if result.get('duplicate')),
+        'rejected': sum(1 for result in results if not result['success']),
+        'items_scanned': session.items_scanned,
+        'discrepancies_found': session.discrepancies_found,
+        'results': results
+    })
+
+@bp.route('/api/item', methods=['POST'])
 @login_required
 def add_item():
     """Add new inventory item"""
@@ -438,17 +2164,19 @@ def add_item():
     )
     
     db.session.add(item)
+    db.session.flush()
+    AggregateDelta().change(after=item_snapshot(item)).apply()
+    index_version = bump_cache_version(ItemLookupIndex.VERSION_KEY)
+    bump_cache_version(ANALYTICS_CATALOG_VERSION)
     db.session.commit()
     
+    item_index.put(item, version=index_version)
+    
     return jsonify({'success': True, 'message': 'Item added successfully'})
 
-@app.route('/api/item/<int:item_id>', methods=['GET'])
-@login_required
-def get_item(item_id):
-    """Get item details"""
-    item = InventoryItem.query.get_or_404(item_id)
-    
-    return jsonify({
+def serialize_item(item):
+    """JSON representation of an inventory item"""
+    return {
         'id': item.id,
         'name': item.name,
         'sku': item.sku,
@@ -457,10 +2185,407 @@ def get_item(item_id):
         'location': item.location,
         'expected_quantity': item.expected_quantity,
         'actual_quantity': item.actual_quantity,
-        'last_updated': item.last_updated.isoformat()
+        'last_updated': item.last_updated.isoformat(),
+        'version': item.version
+    }
+
+def item_conflict(item_id):
+    """409 response carrying the current state of an item changed by someone else"""
+    item = db.session.get(InventoryItem, item_id)
+    return jsonify({
+        'success': False,
+        'message': 'Item was changed by another user' if item else 'Item was deleted by another user',
+        'item': serialize_item(item) if item else None
+    }), 409
+
+def encode_cursor(values):
+    """Encode keyset values as an opaque pagination cursor"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """Decode a pagination cursor, raising ValueError if it is malformed"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(values, dict) or not isinstance(values.get('id'), int):
+        raise ValueError('Invalid cursor')
+    return values
+
+@bp.route('/api/items')
+@login_required
+def list_items():
+    """List inventory items with filters and keyset (cursor) pagination"""
+    sort = request.args.get('sort', 'id')
+    if sort not in ('id', 'last_updated'):
+        return jsonify({'error': 'Invalid sort'}), 400
+    
+    try:
+        limit = int(request.args.get('limit', current_app.config['ITEM_PAGE_SIZE']))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+    limit = max(1, min(limit, current_app.config['ITEM_PAGE_SIZE_MAX']))
+    
+    query = InventoryItem.query
+    
+    category = request.args.get('category')
+    if category:
+        query = query.filter(InventoryItem.category == category)
+    
+    location = request.args.get('location')
+    if location:
+        query = query.filter(InventoryItem.location == location)
+    
+    discrepancy = request.args.get('discrepancy')
+    if discrepancy:
+        difference = InventoryItem.actual_quantity - InventoryItem.expected_quantity
+        if discrepancy == 'match':
+            query = query.filter(difference == 0)
+        elif discrepancy == 'over':
+            query = query.filter(difference > 0)
+        elif discrepancy == 'under':
+            query = query.filter(difference < 0)
+        else:
+            return jsonify({'error': 'Invalid discrepancy filter'}), 400
+    
+    search = request.args.get('q', '').strip()
+    phrases = search_phrases(search)
+    if phrases and search_index_available():
+        # Token-prefix match through the FTS index instead of a LIKE scan of the whole catalog
+        query = query.filter(InventoryItem.id.in_(
+            db.text('SELECT rowid FROM inventory_item_fts WHERE inventory_item_fts MATCH :match').bindparams(
+                match=search_match(phrases)
+            ).columns(db.column('rowid'))
+        ))
+    elif search:
+        pattern = f'%{search}%'
+        query = query.filter(
+            InventoryItem.name.ilike(pattern) | InventoryItem.sku.ilike(pattern) | InventoryItem.barcode.ilike(pattern)
+        )
+    
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            if sort == 'last_updated':
+                position_updated = datetime.fromisoformat(position['last_updated'])
+        except (ValueError, KeyError, TypeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        if sort == 'id':
+            query = query.filter(InventoryItem.id > position['id'])
+        else:
+            query = query.filter(
+                (InventoryItem.last_updated < position_updated) |
+                ((InventoryItem.last_updated == position_updated) & (InventoryItem.id < position['id']))
+            )
+    
+    if sort == 'id':
+        query = query.order_by(InventoryItem.id.asc())
+    else:
+        query = query.order_by(InventoryItem.last_updated.desc(), InventoryItem.id.desc())
+    
+    # Fetch one extra row to know whether another page exists
+    items = query.limit(limit + 1).all()
+    has_more = len(items) > limit
+    items = items[:limit]
+    
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        position = {'id': last.id}
+        if sort == 'last_updated':
+            position['last_updated'] = last.last_updated.isoformat()
+        next_cursor = encode_cursor(position)
+    
+    return jsonify({
+        'items': [serialize_item(item) for item in items],
+        'next_cursor': next_cursor
+    })
+
+# Full-text search over the catalog: an external-content FTS5 table kept in sync by triggers,
+# so every write path (ORM, bulk import, raw SQL) updates it in the same transaction
+SEARCH_INDEX_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS inventory_item_fts USING fts5(
+        name, sku, barcode, category, location,
+        content='inventory_item', content_rowid='id', prefix='2 3 4'
+    )""",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS inventory_item_fts_vocab USING fts5vocab(inventory_item_fts, 'row')",
+    """CREATE TRIGGER IF NOT EXISTS inventory_item_fts_insert AFTER INSERT ON inventory_item BEGIN
+        INSERT INTO inventory_item_fts(rowid, name, sku, barcode, category, location)
+        VALUES (new.id, new.name, new.sku, new.barcode, new.category, new.location);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS inventory_item_fts_delete AFTER DELETE ON inventory_item BEGIN
+        INSERT INTO inventory_item_fts(inventory_item_fts, rowid, name, sku, barcode, category, location)
+        VALUES ('delete', old.id, old.name, old.sku, old.barcode, old.category, old.location);
+    END""",
+    # Scans only touch quantities, so they never rewrite the index
+    """CREATE TRIGGER IF NOT EXISTS inventory_item_fts_update
+    AFTER UPDATE OF name, sku, barcode, category, location ON inventory_item BEGIN
+        INSERT INTO inventory_item_fts(inventory_item_fts, rowid, name, sku, barcode, category, location)
+        VALUES ('delete', old.id, old.name, old.sku, old.barcode, old.category, old.location);
+        INSERT INTO inventory_item_fts(rowid, name, sku, barcode, category, location)
+        VALUES (new.id, new.name, new.sku, new.barcode, new.category, new.location);
+    END"""
+]
+
+# bm25() column weights in FTS column order: codes and names outrank category and location matches
+SEARCH_WEIGHTS = (8.0, 10.0, 10.0, 1.0, 1.0)
+SEARCH_EXACT_CODE_SCORE = 1000.0
+SEARCH_WORD = re.compile(r'\w+')
+
+def create_search_index(connection):
+    """Create the FTS5 table and its sync triggers (SQLite only)"""
+    for statement in SEARCH_INDEX_DDL:
+        connection.exec_driver_sql(statement)
+
+@db.event.listens_for(InventoryItem.__table__, 'after_create')
+def create_search_index_with_table(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        create_search_index(connection)
+
+@db.event.listens_for(InventoryItem.__table__, 'before_drop')
+def drop_search_index(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql('DROP TABLE IF EXISTS inventory_item_fts_vocab')
+        connection.exec_driver_sql('DROP TABLE IF EXISTS inventory_item_fts')
+
+def search_index_available():
+    return db.engine.dialect.name == 'sqlite'
+
+def search_phrases(text):
+    """Split a query into word-token phrases; 'ABC-12 widg' becomes [['abc', '12'], ['widg']]"""
+    return [tokens for tokens in (SEARCH_WORD.findall(word.lower()) for word in text.split()) if tokens]
+
+def search_match(phrases):
+    """FTS5 MATCH expression requiring every phrase, each as a prefix"""
+    return ' '.join('"{}"*'.format(' '.join(tokens)) for tokens in phrases)
+
+def within_edit_distance(a, b, max_distance):
+    """Whether a and b are within max_distance edits (insert, delete, substitute, transpose)"""
+    if abs(len(a) - len(b)) > max_distance:
+        return False
+    before, previous = None, list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            distance = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            if before and i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                distance = min(distance, before[j - 2] + 1)
+            current.append(distance)
+        if min(current) > max_distance and min(previous) > max_distance:
+            return False
+        before, previous = previous, current
+    return previous[-1] <= max_distance
+
+def correct_phrases(phrases):
+    """Replace unknown tokens with the most common indexed term within a small edit distance"""
+    connection = db.session.connection()
+    corrected = []
+    changed = False
+    for tokens in phrases:
+        fixed = []
+        for token in tokens:
+            known = connection.exec_driver_sql(
+                'SELECT 1 FROM inventory_item_fts_vocab WHERE term = ?', (token,)
+            ).first()
+            if known or len(token) < 4 or token.isdigit():
+                fixed.append(token)
+                continue
+            # Typos are assumed to leave the first two characters intact, which keeps the scan short
+            max_distance = 1 if len(token) < 8 else 2
+            candidates = connection.exec_driver_sql(
+                'SELECT term, doc FROM inventory_item_fts_vocab WHERE term >= ? AND term < ? LIMIT ?',
+                (token[:2], token[:2] + '\uffff', current_app.config['SEARCH_TYPO_CANDIDATES'])
+            )
+            matches = [(doc, term) for term, doc in candidates if within_edit_distance(token, term, max_distance)]
+            if matches:
+                fixed.append(max(matches)[1])
+                changed = True
+            else:
+                fixed.append(token)
+        corrected.append(fixed)
+    return corrected if changed else None
+
+def search_has_match(phrases):
+    """Whether any item matches every phrase"""
+    return db.session.connection().exec_driver_sql(
+        'SELECT 1 FROM inventory_item_fts WHERE inventory_item_fts MATCH ? LIMIT 1', (search_match(phrases),)
+    ).first() is not None
+
+def ranked_matches(phrases, text, limit, after=None, exclude=None):
+    """Up to limit + 1 (score, id) pairs of matching items, best first, past an (score, id) keyset position"""
+    if search_index_available():
+        max_ranked = current_app.config['SEARCH_RANK_MAX_MATCHES']
+        matches = db.session.connection().exec_driver_sql(
+            'SELECT count(*) FROM (SELECT 1 FROM inventory_item_fts WHERE inventory_item_fts MATCH ? LIMIT ?)',
+            (search_match(phrases), max_ranked + 1)
+        ).scalar()
+        if matches > max_ranked:
+            return tiered_matches(phrases, limit, after, exclude)
+        return scored_matches(phrases, limit, after, exclude)
+    
+    # Without the index: the same field weights over substring matches of name, SKU and barcode
+    pattern = f'%{text}%'
+    fields = (InventoryItem.name, InventoryItem.sku, InventoryItem.barcode)
+    score = sum(db.case((field.ilike(pattern), weight), else_=0.0) for weight, field in zip(SEARCH_WEIGHTS, fields))
+    query = db.session.query(score.label('score'), InventoryItem.id).filter(
+        db.or_(*(field.ilike(pattern) for field in fields)), InventoryItem.id != (exclude or 0)
+    )
+    if after:
+        query = query.filter((score < after['score']) | ((score == after['score']) & (InventoryItem.id > after['id'])))
+    return [tuple(row) for row in query.order_by(score.desc(), InventoryItem.id).limit(limit + 1)]
+
+def scored_matches(phrases, limit, after, exclude):
+    """Every match scored by column-weighted bm25(), so strong name or code matches are never crowded out"""
+    weights = ', '.join(str(weight) for weight in SEARCH_WEIGHTS)
+    sql = f"""SELECT score, id FROM (
+        SELECT -bm25(inventory_item_fts, {weights}) AS score, rowid AS id
+        FROM inventory_item_fts WHERE inventory_item_fts MATCH ?
+    ) WHERE id != ?"""
+    params = [search_match(phrases), exclude or 0]
+    if after:
+        sql += ' AND (score < ? OR (score = ? AND id > ?))'
+        params += [after['score'], after['score'], after['id']]
+    sql += ' ORDER BY score DESC, id LIMIT ?'
+    return [tuple(row) for row in db.session.connection().exec_driver_sql(sql, (*params, limit + 1))]
+
+def tiered_matches(phrases, limit, after, exclude):
+    """Matches in name, SKU or barcode, then matches in category or location only, each tier in id order"""
+    # bm25() costs about a microsecond per match (a third of a second for a two-letter prefix
+    # at 300k items); reading a tier in rowid order stops as soon as the page is full
+    match = search_match(phrases)
+    primary = f'{{name sku barcode}} : ({match})'
+    tiers = [(max(SEARCH_WEIGHTS[:3]), primary), (max(SEARCH_WEIGHTS[3:]), f'({match}) NOT ({primary})')]
+    ranked = []
+    for score, tier_match in tiers:
+        if len(ranked) > limit or (after and score > after['score']):
+            continue
+        after_id = after['id'] if after and score == after['score'] else 0
+        ranked += [(score, item_id) for (item_id,) in db.session.connection().exec_driver_sql(
+            'SELECT rowid FROM inventory_item_fts WHERE inventory_item_fts MATCH ? AND rowid > ? AND rowid != ? '
+            'ORDER BY rowid LIMIT ?',
+            (tier_match, after_id, exclude or 0, limit + 1 - len(ranked))
+        )]
+    return ranked
+
+def search_items(text, limit, after=None):
+    """Ranked catalog search; returns (items with scores, next cursor position, corrected query)"""
+    phrases = search_phrases(text)
+    if not phrases:
+        return [], None, None
+    
+    corrected = None
+    if search_index_available() and not search_has_match(phrases):
+        corrected = correct_phrases(phrases)
+        if corrected:
+            phrases = corrected
+    
+    # An exact SKU or barcode always comes first
+    exact = db.session.query(InventoryItem.id).filter(
+        (InventoryItem.sku == text) | (InventoryItem.barcode == text)
+    ).first()
+    ranked = []
+    if exact and (not after or (-SEARCH_EXACT_CODE_SCORE, exact.id) > (-after['score'], after['id'])):
+        ranked.append((SEARCH_EXACT_CODE_SCORE, exact.id))
+    ranked += ranked_matches(phrases, text, limit - len(ranked), after, exact.id if exact else None)
+    page = ranked[:limit]
+    
+    items = {item.id: item for item in InventoryItem.query.filter(InventoryItem.id.in_([item_id for _, item_id in page]))}
+    results = [(items[item_id], score) for score, item_id in page if item_id in items]
+    next_position = {'id': page[-1][1], 'score': page[-1][0]} if len(ranked) > limit else None
+    return results, next_position, corrected
+
+@bp.route('/api/search')
+@login_required
+def search_catalog():
+    """Ranked prefix and typo-tolerant search over item names, codes, categories and locations"""
+    text = request.args.get('q', '').strip()
+    if not text:
+        return jsonify({'error': 'Missing query'}), 400
+    
+    try:
+        limit = int(request.args.get('limit', current_app.config['ITEM_PAGE_SIZE']))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+    limit = max(1, min(limit, current_app.config['ITEM_PAGE_SIZE_MAX']))
+    
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+            after['score'] = float(after['score'])
+        except (ValueError, KeyError, TypeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+    
+    results, next_position, corrected = search_items(text, limit, after)
+    return jsonify({
+        'items': [dict(serialize_item(item), score=score) for item, score in results],
+        'next_cursor': encode_cursor(next_position) if next_position else None,
+        'corrected_query': ' '.join(' '.join(tokens) for tokens in corrected) if corrected else None
+    })
+
+def serialize_session(session):
+    """JSON representation of an audit session"""
+    return {
+        'session_id': session.session_id,
+        'user': session.user.username,
+        'start_time': session.start_time.isoformat(),
+        'end_time': session.end_time.isoformat() if session.end_time else None,
+        'status': session.status,
+        'items_scanned': session.items_scanned,
+        'discrepancies_found': session.discrepancies_found,
+        'notes': session.notes,
+        'log_storage': session.log_storage
+    }
+
+@bp.route('/api/changes')
+@login_required
+def get_changes():
+    """Items and audit sessions changed since a client's cursor (delta sync after a reconnect)"""
+    # Read the cursor first: everything at or below it has committed, later writes wait for the next sync
+    cursor = change_cursor()
+    
+    since = request.args.get('since')
+    if since is None:
+        return jsonify({'cursor': cursor, 'reset': False, 'items': [], 'deleted_items': [], 'sessions': []})
+    try:
+        since = int(since)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    def window(model):
+        return model.query.filter(model.change_seq > since, model.change_seq <= cursor)
+    
+    # A cursor from another database or too far behind means a full reload is cheaper
+    limit = current_app.config['CHANGES_MAX']
+    items = window(InventoryItem).order_by(InventoryItem.change_seq, InventoryItem.id).limit(limit + 1).all()
+    if since > cursor or len(items) > limit:
+        return jsonify({'cursor': cursor, 'reset': True})
+    
+    deleted = [item_id for (item_id,) in window(DeletedItem).with_entities(DeletedItem.item_id)]
+    sessions = window(AuditSession).options(db.joinedload(AuditSession.user)).order_by(AuditSession.change_seq).all()
+    
+    return jsonify({
+        'cursor': cursor,
+        'reset': False,
+        'items': [serialize_item(item) for item in items],
+        'deleted_items': deleted,
+        'sessions': [serialize_session(session) for session in sessions]
     })
 
-@app.route('/api/item/<int:item_id>', methods=['PUT'])
+@bp.route('/api/item/<int:item_id>', methods=['GET'])
+@login_required
+def get_item(item_id):
+    """Get item details"""
+    item = InventoryItem.query.get_or_404(item_id)
+    
+    return conditional_json(
+        f'item-{item.id}-{item.version}-{item.change_seq}', lambda: serialize_item(item), item.last_updated
+    )
+
+@bp.route('/api/item/<int:item_id>', methods=['PUT'])
 @login_required
 def update_item(item_id):
     """Update inventory item"""
@@ -470,6 +2595,14 @@ def update_item(item_id):
     item = InventoryItem.query.get_or_404(item_id)
     data = request.json
     
+    # Clients send the version they edited; a newer row means someone else saved first
+    if 'version' in data and data['version'] != item.version:
+        return item_conflict(item_id)
+    
+    old_codes = (item.sku, item.barcode)
+    old_labels = (item.name, item.sku, item.category, item.location)
+    before = item_snapshot(item)
+    
     item.name = data['name']
     item.sku = data['sku']
     item.barcode = data.get('barcode')
@@ -479,11 +2612,22 @@ def update_item(item_id):
     item.actual_quantity = data.get('actual_quantity', 0)
     item.last_updated = datetime.utcnow()
     
-    db.session.commit()
+    try:
+        AggregateDelta().change(before, item_snapshot(item)).apply()
+        index_version = bump_cache_version(ItemLookupIndex.VERSION_KEY)
+        if (item.name, item.sku, item.category, item.location) != old_labels:
+            bump_cache_version(ANALYTICS_CATALOG_VERSION)
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        return item_conflict(item_id)
+    
+    item_index.remove(*old_codes)
+    item_index.put(item, version=index_version)
     
-    return jsonify({'success': True, 'message': 'Item updated successfully'})
+    return jsonify({'success': True, 'message': 'Item updated successfully', 'version': item.version})
 
-@app.route('/api/item/<int:item_id>', methods=['DELETE'])
+@bp.route('/api/item/<int:item_id>', methods=['DELETE'])
 @login_required
 def delete_item(item_id):
     """Delete inventory item"""
@@ -491,32 +2635,695 @@ def delete_item(item_id):
         return jsonify({'success': False, 'message': 'Insufficient permissions'}), 403
     
     item = InventoryItem.query.get_or_404(item_id)
-    db.session.delete(item)
-    db.session.commit()
+    codes = (item.sku, item.barcode)
+    
+    try:
+        AggregateDelta().change(before=item_snapshot(item)).apply()
+        db.session.delete(item)
+        index_version = bump_cache_version(ItemLookupIndex.VERSION_KEY)
+        bump_cache_version(ANALYTICS_CATALOG_VERSION)
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        return item_conflict(item_id)
+    
+    item_index.remove(*codes, version=index_version)
     
     return jsonify({'success': True, 'message': 'Item deleted successfully'})
 
-@app.route('/api/session/<session_id>/export')
+CATALOG_FIELDS = ['name', 'sku', 'barcode', 'category', 'location', 'expected_quantity', 'actual_quantity']
+
+def parse_catalog_rows(stream, format_type):
+    """Yield (line number, raw row or None, error or None) from a CSV or JSONL text stream"""
+    if format_type == 'csv':
+        # Short rows read as blank cells; None is left to mean an explicit JSON null
+        reader = csv.DictReader(stream, restval='')
+        for row in reader:
+            yield reader.line_num, row, None
+    else:
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_number, None, 'Invalid JSON'
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, 'Row must be a JSON object'
+                continue
+            yield line_number, row, None
+
+# Values a new item gets for fields its imported row does not set
+CATALOG_DEFAULTS = {'barcode': None, 'category': None, 'location': None, 'expected_quantity': 0, 'actual_quantity': 0}
+
+def validate_catalog_row(row):
+    """Normalize an imported row, returning (values, error).
+    
+    values only holds the fields the row sets. A missing column or blank cell leaves an
+    existing item's value alone; a JSON null clears barcode, category or location.
+    """
+    values = {}
+    for field in ('name', 'sku', 'barcode', 'category', 'location'):
+        if field not in row:
+            continue
+        if row[field] is None:
+            values[field] = None
+            continue
+        value = str(row[field]).strip()
+        if value:
+            values[field] = value
+    
+    if not values.get('name'):
+        return None, 'Missing name'
+    if not values.get('sku'):
+        return None, 'Missing SKU'
+    
+    for field in ('expected_quantity', 'actual_quantity'):
+        value = row.get(field)
+        if value is None or value == '':
+            continue
+        try:
+            values[field] = int(value)
+        except (TypeError, ValueError):
+            return None, f'Invalid {field}'
+        if values[field] < 0:
+            return None, f'Invalid {field}'
+    
+    return values, None
+
+class CatalogImport:
+    """Chunked upsert of catalog rows keyed by SKU.
+    
+    Each chunk is written in its own transaction with one lookup query, one bulk
+    insert and one bulk update. Updates compare-and-swap on the item version, so a
+    chunk that races a scan or edit is re-read and retried. If a chunk hits a
+    constraint violation it is retried row by row under savepoints so only the
+    offending rows fail.
+    """
+    
+    def __init__(self, chunk_size=None):
+        self.chunk_size = chunk_size or current_app.config['IMPORT_CHUNK_SIZE']
+        self.processed = 0
+        self.created = 0
+        self.updated = 0
+        self.superseded = 0
+        self.failed = 0
+        self.errors = []
+    
+    def error(self, line_number, sku, message):
+        self.failed += 1
+        if len(self.errors) < current_app.config['IMPORT_MAX_REPORTED_ERRORS']:
+            self.errors.append({'line': line_number, 'sku': sku, 'message': message})
+    
+    def run(self, rows):
+        chunk = []
+        for line_number, row, error in rows:
+            self.processed += 1
+            if error:
+                self.error(line_number, None, error)
+                continue
+            values, error = validate_catalog_row(row)
+            if error:
+                self.error(line_number, row.get('sku'), error)
+                continue
+            chunk.append((line_number, values))
+            if len(chunk) >= self.chunk_size:
+                self._write_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._write_chunk(chunk)
+        return self.report()
+    
+    @staticmethod
+    def _commit():
+        # Codes may have changed; every worker reloads its lookup index as each chunk lands
+        bump_cache_version(ItemLookupIndex.VERSION_KEY)
+        db.session.commit()
+        item_index.invalidate()
+    
+    def _write_chunk(self, chunk):
+        # Later rows for the same SKU win within a chunk, field by field
+        by_sku = {}
+        for line_number, values in chunk:
+            earlier = by_sku.get(values['sku'], (None, {}))[1]
+            by_sku[values['sku']] = (line_number, dict(earlier, **values))
+        self.superseded += len(chunk) - len(by_sku)
+        
+        rows = list(by_sku.values())
+        for attempt in range(current_app.config['SCAN_CONFLICT_RETRIES'] + 1):
+            try:
+                self._upsert(rows)
+                self._commit()
+                return
+            except StaleDataError:
+                db.session.rollback()
+            except IntegrityError:
+                db.session.rollback()
+                break
+        self._write_rows(rows)
+    
+    def _upsert(self, rows):
+        skus = [values['sku'] for _, values in rows]
+        existing = {
+            item.sku: item for item in db.session.query(
+                InventoryItem.id, InventoryItem.sku, InventoryItem.name, InventoryItem.category, InventoryItem.location,
+                InventoryItem.expected_quantity, InventoryItem.actual_quantity, InventoryItem.version
+            ).filter(InventoryItem.sku.in_(skus))
+        }
+        
+        now = datetime.utcnow()
+        change_seq = transaction_change_seq()
+        aggregates = AggregateDelta()
+        inserts = []
+        updates = []
+        relabeled = False
+        for _, values in rows:
+            current = existing.get(values['sku'])
+            if current:
+                # Only the fields the row sets are written; the rest keep their current values
+                merged = dict(current._asdict(), **values)
+                before = (current.category, current.location, current.expected_quantity or 0, current.actual_quantity or 0)
+                after = (merged['category'], merged['location'], merged['expected_quantity'] or 0, merged['actual_quantity'] or 0)
+                aggregates.change(before, after)
+                relabeled = relabeled or (current.name, current.category, current.location) != (
+                    merged['name'], merged['category'], merged['location']
+                )
+                updates.append(dict(values, id=current.id, version=current.version, last_updated=now, change_seq=change_seq))
+            else:
+                values = dict(CATALOG_DEFAULTS, **values)
+                aggregates.change(after=(values['category'], values['location'], values['expected_quantity'], values['actual_quantity']))
+                inserts.append(dict(values, last_updated=now, change_seq=change_seq))
+        
+        if inserts:
+            db.session.bulk_insert_mappings(InventoryItem, inserts)
+        if updates:
+            db.session.bulk_update_mappings(InventoryItem, updates)
+        aggregates.apply()
+        if inserts or relabeled:
+            bump_cache_version(ANALYTICS_CATALOG_VERSION)
+        db.session.flush()
+        
+        self.created += len(inserts)
+        self.updated += len(updates)
+    
+    def _write_rows(self, rows):
+        for line_number, values in rows:
+            savepoint = db.session.begin_nested()
+            try:
+                self._upsert([(line_number, values)])
+                savepoint.commit()
+            except IntegrityError:
+                savepoint.rollback()
+                self.error(line_number, values['sku'], 'Conflicts with an existing barcode')
+            except StaleDataError:
+                savepoint.rollback()
+                self.error(line_number, values['sku'], 'Item was changed concurrently; import the row again')
+        self._commit()
+    
+    def report(self):
+        return {
+            'processed': self.processed,
+            'created': self.created,
+            'updated': self.updated,
+            'superseded': self.superseded,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors)
+        }
+
+def catalog_format(format_type, filename=None):
+    """Resolve the import/export format from an explicit value or file extension"""
+    if not format_type and filename:
+        format_type = os.path.splitext(filename)[1].lstrip('.').lower()
+    format_type = format_type or 'csv'
+    return format_type if format_type in ('csv', 'jsonl') else None
+
+def export_catalog_rows(format_type):
+    """Generate the catalog as CSV or JSONL text chunks"""
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+    rows = db.session.query(
+        *(getattr(InventoryItem, field) for field in CATALOG_FIELDS)
+    ).order_by(InventoryItem.id).yield_per(batch_size)
+    
+    output = io.StringIO()
+    writer = csv.writer(output)
+    if format_type == 'csv':
+        writer.writerow(CATALOG_FIELDS)
+    
+    for count, row in enumerate(rows, 1):
+        if format_type == 'csv':
+            writer.writerow(row)
+        else:
+            output.write(json.dumps(dict(zip(CATALOG_FIELDS, row))) + '\n')
+        if count % batch_size == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+    
+    yield output.getvalue()
+
+@bp.route('/api/items/import', methods=['POST'])
+@login_required
+def import_items():
+    """Stream a CSV or JSONL catalog into chunked upserts"""
+    if current_user.role not in ['admin', 'manager']:
+        return jsonify({'success': False, 'message': 'Insufficient permissions'}), 403
+    
+    upload = request.files.get('file')
+    format_type = catalog_format(request.args.get('format'), upload.filename if upload else None)
+    if not format_type:
+        return jsonify({'success': False, 'message': 'Invalid format'}), 400
+    
+    try:
+        chunk_size = int(request.args.get('chunk_size', current_app.config['IMPORT_CHUNK_SIZE']))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid chunk size'}), 400
+    if chunk_size < 1:
+        return jsonify({'success': False, 'message': 'Invalid chunk size'}), 400
+    
+    stream = io.TextIOWrapper(upload.stream if upload else request.stream, encoding='utf-8', newline='')
+    report = CatalogImport(chunk_size).run(parse_catalog_rows(stream, format_type))
+    
+    return jsonify(dict(report, success=True))
+
+@bp.route('/api/items/export')
+@login_required
+def export_items():
+    """Stream the whole catalog as CSV or JSONL"""
+    format_type = catalog_format(request.args.get('format'))
+    if not format_type:
+        return jsonify({'error': 'Invalid format'}), 400
+    
+    mimetype = 'text/csv' if format_type == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(timed_export(export_catalog_rows(format_type), f'catalog_{format_type}')), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=inventory.{format_type}'
+    return response
+
+@bp.route('/api/dashboard/summary')
+@login_required
+def get_dashboard_summary():
+    """Inventory totals and open discrepancies per category and location"""
+    summary = dashboard_summary()
+    summary['active_sessions'] = AuditSession.query.filter_by(status='active').count()
+    return jsonify(summary)
+
+@bp.route('/api/item_index/stats')
+@login_required
+def item_index_stats():
+    """Hit/miss counters for the barcode/SKU lookup index"""
+    return jsonify(item_index.stats())
+
+@bp.route('/api/cache/stats')
+@login_required
+def cache_stats():
+    """Hit/miss counters for the process-local caches"""
+    return jsonify({
+        'users': user_cache.stats(),
+        'settings': settings_cache.stats(),
+        'item_index': item_index.stats(),
+        'analytics': analytics_cache.stats()
+    })
+
+@bp.route('/metrics')
+def prometheus_metrics():
+    """Prometheus scrape endpoint; protected by a bearer token when METRICS_TOKEN is set"""
+    token = current_app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@bp.route('/api/scan_journal/stats')
+@login_required
+def scan_journal_stats():
+    """Written, durable and applied positions of the scan journal"""
+    scan_journal = current_scan_journal()
+    if scan_journal is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(scan_journal.stats(), enabled=True))
+
+LogRow = namedtuple('LogRow', [
+    'id', 'item_id', 'timestamp', 'name', 'sku', 'action', 'old_quantity', 'new_quantity', 'discrepancy', 'notes'
+])
+
+class AuditLogArchive:
+    """Gzipped JSONL segments holding the logs of completed sessions, one directory per month"""
+    
+    def __init__(self, root=None):
+        self._root = root
+    
+    @property
+    def root(self):
+        # Without an explicit root the archive follows the current app's AUDIT_ARCHIVE_DIR
+        return self._root or current_app.config['AUDIT_ARCHIVE_DIR']
+    
+    def segment_path(self, session):
+        return os.path.join(self.root, session.start_time.strftime('%Y-%m'), f'{session.session_id}.jsonl.gz')
+    
+    def write(self, session, rows):
+        """Write a session's segment atomically and durably; returns the number of rows written"""
+        path = self.segment_path(session)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        count = 0
+        try:
+            with open(tmp_path, 'wb') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='wb') as segment:
+                    for row in rows:
+                        record = row._asdict()
+                        record['timestamp'] = row.timestamp.isoformat() if row.timestamp else None
+                        segment.write(json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n')
+                        count += 1
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return count
+    
+    def read(self, session):
+        """Yield a session's archived log rows in id order"""
+        with gzip.open(self.segment_path(session), 'rt', encoding='utf-8') as segment:
+            for line in segment:
+                record = json.loads(line)
+                if record['timestamp']:
+                    record['timestamp'] = datetime.fromisoformat(record['timestamp'])
+                yield LogRow(**record)
+    
+    def remove(self, session):
+        path = self.segment_path(session)
+        if os.path.exists(path):
+            os.remove(path)
+        # Drop the month directory once its last segment is gone
+        month = os.path.dirname(path)
+        if os.path.isdir(month) and not os.listdir(month):
+            shutil.rmtree(month, ignore_errors=True)
+
+audit_archive = AuditLogArchive()
+
+def hot_log_rows(session, after_id=0):
+    """Query a session's log rows from the AuditLog table in id order"""
+    # Join items up front instead of lazily loading log.item per row
+    return db.session.query(
+        AuditLog.id,
+        AuditLog.item_id,
+        AuditLog.timestamp,
+        InventoryItem.name,
+        InventoryItem.sku,
+        AuditLog.action,
+        AuditLog.old_quantity,
+        AuditLog.new_quantity,
+        AuditLog.discrepancy,
+        AuditLog.notes
+    ).join(InventoryItem, AuditLog.item_id == InventoryItem.id).filter(
+        AuditLog.session_id == session.id, AuditLog.id > after_id
+    ).order_by(AuditLog.id).yield_per(current_app.config['EXPORT_BATCH_SIZE'])
+
+def session_log_rows(session, after_id=0):
+    """Yield a session's log rows in id order from the hot table or its archive segment"""
+    if session.log_storage == 'purged':
+        return
+    if session.log_storage == 'archive':
+        for row in audit_archive.read(session):
+            if row.id > after_id:
+                yield row
+        return
+    for row in hot_log_rows(session, after_id):
+        yield LogRow(*row)
+
+def archive_session_logs(session):
+    """Move a completed session's logs into its archive segment; returns the number of rows moved"""
+    # The segment is durable before the rows are deleted, and a rerun after a crash rewrites it
+    count = audit_archive.write(session, (LogRow(*row) for row in hot_log_rows(session)))
+    AuditLog.query.filter_by(session_id=session.id).delete(synchronize_session=False)
+    session.log_storage = 'archive'
+    db.session.commit()
+    return count
+
+def archive_audit_logs(now=None):
+    """Archive logs of sessions completed before the archive cutoff and purge archives past retention"""
+    now = now or datetime.utcnow()
+    archived = moved = purged = 0
+    
+    cutoff = now - timedelta(days=current_app.config['AUDIT_ARCHIVE_AFTER_DAYS'])
+    sessions = AuditSession.query.filter(
+        AuditSession.status != 'active', AuditSession.log_storage == 'hot', AuditSession.end_time < cutoff
+    ).order_by(AuditSession.id).all()
+    for session in sessions:
+        moved += archive_session_logs(session)
+        archived += 1
+    
+    if current_app.config['AUDIT_RETENTION_DAYS'] > 0:
+        cutoff = now - timedelta(days=current_app.config['AUDIT_RETENTION_DAYS'])
+        sessions = AuditSession.query.filter(
+            AuditSession.log_storage == 'archive', AuditSession.end_time < cutoff
+        ).order_by(AuditSession.id).all()
+        for session in sessions:
+            session.log_storage = 'purged'
+            db.session.commit()
+            audit_archive.remove(session)
+            purged += 1
+    
+    return {'sessions_archived': archived, 'logs_archived': moved, 'sessions_purged': purged}
+
+@bp.route('/api/session/<session_id>/logs')
+@login_required
+def get_session_logs(session_id):
+    """Page through a session's audit log, wherever it is stored"""
+    session = AuditSession.query.filter_by(session_id=session_id).first_or_404()
+    
+    try:
+        after_id = int(request.args.get('cursor', 0))
+        limit = int(request.args.get('limit', current_app.config['ITEM_PAGE_SIZE']))
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor or limit'}), 400
+    limit = max(1, min(limit, current_app.config['ITEM_PAGE_SIZE_MAX']))
+    
+    rows = list(itertools.islice(session_log_rows(session, after_id), limit + 1))
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    return jsonify({
+        'log_storage': session.log_storage,
+        'logs': [
+            dict(row._asdict(), timestamp=row.timestamp.isoformat() if row.timestamp else None)
+            for row in rows
+        ],
+        'next_cursor': rows[-1].id if has_more else None
+    })
+
+ANALYTICS_PERIODS = ('D', 'W', 'M')
+# Bumped only when an item is added or deleted or its name, SKU, category or location
+# changes; scans and quantity edits leave it alone so audits do not invalidate reports
+ANALYTICS_CATALOG_VERSION = 'analytics_catalog'
+
+def analytics_fingerprint():
+    """Identify the set of completed sessions (and catalog state) an analytics result covers"""
+    completed = db.session.query(
+        db.func.count(AuditSession.id),
+        db.func.max(AuditSession.id),
+        db.func.max(AuditSession.end_time),
+        db.func.sum(db.case((AuditSession.log_storage == 'purged', 1), else_=0))
+    ).filter(AuditSession.status == 'completed').one()
+    # Category/location edits move logs between groups
+    catalog = get_cache_version(ANALYTICS_CATALOG_VERSION)
+    return json.dumps([str(value) for value in completed] + [catalog])
+
+def analytics_log_chunks():
+    """Yield AuditLog history of completed sessions as DataFrames of at most ANALYTICS_CHUNK_SIZE rows"""
+    import pandas as pd
+    
+    chunk_size = current_app.config['ANALYTICS_CHUNK_SIZE']
+    # Timestamps come back as text and are parsed per column by pandas, not per row by SQLAlchemy
+    hot_logs = db.select(
+        AuditLog.id, AuditLog.session_id, AuditLog.user_id, AuditLog.item_id,
+        db.cast(AuditLog.timestamp, db.String).label('timestamp'), AuditLog.new_quantity, AuditLog.discrepancy
+    ).join(AuditSession, AuditLog.session_id == AuditSession.id).filter(
+        AuditSession.status == 'completed', AuditSession.log_storage == 'hot'
+    )
+    
+    # Keyset ranges on the primary key keep each chunk a bounded index range scan
+    after_id = 0
+    while True:
+        chunk = pd.read_sql(
+            hot_logs.filter(AuditLog.id > after_id).order_by(AuditLog.id).limit(chunk_size),
+            db.session.connection()
+        )
+        if chunk.empty:
+            break
+        yield chunk
+        after_id = int(chunk['id'].iloc[-1])
+    
+    archived = AuditSession.query.filter_by(status='completed', log_storage='archive').order_by(AuditSession.id)
+    for session in archived:
+        rows = audit_archive.read(session)
+        while True:
+            batch = list(itertools.islice(rows, chunk_size))
+            if not batch:
+                break
+            chunk = pd.DataFrame.from_records(batch, columns=LogRow._fields)
+            chunk['session_id'] = session.id
+            chunk['user_id'] = session.user_id
+            yield chunk
+
+def compute_audit_analytics(period, window, min_sessions, top):
+    """Stream completed sessions' logs through the vectorized analytics and build the report"""
+    import analytics
+    import pandas as pd
+    
+    started = time.perf_counter()
+    items = pd.read_sql(
+        db.select(InventoryItem.id, InventoryItem.sku, InventoryItem.name, InventoryItem.category, InventoryItem.location),
+        db.session.connection()
+    )
+    result = analytics.AuditAnalytics(items, period)
+    for chunk in analytics_log_chunks():
+        result.add(chunk[analytics.LOG_COLUMNS])
+    report = result.report(window=window, min_sessions=min_sessions, top=top)
+    report['period'] = period
+    report['window'] = window
+    metrics.observe('analytics_seconds', time.perf_counter() - started)
+    return report
+
+class AnalyticsCache:
+    """Analytics reports keyed by the completed-session fingerprint and request parameters.
+    
+    A new completed session, archival, purge or catalog relabel changes the
+    fingerprint, so stale reports are never served and simply age out of the LRU.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._compute_lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key, loader):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        
+        # One computation at a time; concurrent requests for the same key wait and reuse it
+        with self._compute_lock:
+            with self._lock:
+                if key in self._entries:
+                    self.hits += 1
+                    return self._entries[key]
+                self.misses += 1
+            value = loader()
+            with self._lock:
+                self._entries[key] = value
+                while len(self._entries) > current_app.config['ANALYTICS_CACHE_SIZE']:
+                    self._entries.popitem(last=False)
+        return value
+    
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+analytics_cache = app_extension('analytics_cache')
+
+@bp.route('/api/analytics')
+@login_required
+def audit_analytics():
+    """Shrinkage, discrepancy variance, trends, outlier SKUs and auditor accuracy over completed audits"""
+    if current_user.role not in ['admin', 'manager']:
+        return jsonify({'success': False, 'message': 'Insufficient permissions'}), 403
+    
+    try:
+        import analytics  # noqa: F401  (optional numpy/pandas dependency)
+    except ImportError:
+        return jsonify({'success': False, 'message': 'Analytics requires numpy and pandas'}), 503
+    
+    period = request.args.get('period', 'W').upper()
+    try:
+        window = int(request.args.get('window', 4))
+        min_sessions = int(request.args.get('min_sessions', 2))
+        top = int(request.args.get('top', 50))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid window, min_sessions or top'}), 400
+    if period not in ANALYTICS_PERIODS:
+        return jsonify({'success': False, 'message': f"period must be one of {', '.join(ANALYTICS_PERIODS)}"}), 400
+    window = max(1, min(window, 104))
+    min_sessions = max(1, min_sessions)
+    top = max(1, min(top, current_app.config['ITEM_PAGE_SIZE_MAX']))
+    
+    fingerprint = analytics_fingerprint()
+    report = analytics_cache.get(
+        (fingerprint, period, window, min_sessions, top),
+        lambda: compute_audit_analytics(period, window, min_sessions, top)
+    )
+    return jsonify(report)
+
+@bp.route('/api/session/<session_id>/export')
 @login_required
 def export_session_report(session_id):
     """Export session report as PDF or CSV"""
     session = AuditSession.query.filter_by(session_id=session_id).first_or_404()
     format_type = request.args.get('format', 'pdf')
     
-    # Get audit logs for this session
-    logs = AuditLog.query.filter_by(session_id=session.id).all()
-    
     if format_type == 'pdf':
-        return generate_pdf_report(session, logs)
+        # Serve the cached artifact if it exists, otherwise render in the background
+        job = report_jobs.submit(session)
+        if job['status'] == 'done':
+            return send_pdf_report(job)
+        return jsonify(report_job_status(job)), 202
     elif format_type == 'csv':
-        return generate_csv_report(session, logs)
+        return generate_csv_report(session)
     else:
         return jsonify({'error': 'Invalid format'}), 400
 
-def generate_pdf_report(session, logs):
-    """Generate PDF report"""
-    buffer = io.BytesIO()
-    p = canvas.Canvas(buffer, pagesize=letter)
+def report_artifact_path(session):
+    """Cache path for a session's PDF, keyed by session id and a content hash"""
+    log_count, last_log_id = db.session.query(
+        db.func.count(AuditLog.id), db.func.max(AuditLog.id)
+    ).filter(AuditLog.session_id == session.id).one()
+    
+    fingerprint = json.dumps([
+        session.session_id,
+        session.status,
+        str(session.end_time),
+        session.items_scanned,
+        session.discrepancies_found,
+        session.notes,
+        session.log_storage,
+        log_count,
+        last_log_id
+    ])
+    content_hash = hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(current_app.config['REPORT_CACHE_DIR'], f'audit_report_{session.session_id}_{content_hash}.pdf')
+
+PDF_ROWS_PER_CHUNK = 1000
+
+def draw_log_rows(p, rows, y):
+    """Draw audit log rows from height y, starting new pages as needed; returns the next y"""
+    p.setFont("Helvetica", 10)
+    for log in rows:
+        if y < 50:  # New page
+            p.showPage()
+            p.setFont("Helvetica", 10)
+            y = 750
+        
+        p.drawString(50, y, f"{log.timestamp} - {log.name} ({log.sku})")
+        y -= 15
+        p.drawString(70, y, f"Action: {log.action}, Old: {log.old_quantity}, New: {log.new_quantity}, Discrepancy: {log.discrepancy}")
+        y -= 20
+    return y
+
+def generate_pdf_report(session, path):
+    """Render a PDF report to path"""
+    # Only report workers need ReportLab; importing it here keeps it off worker startup
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    
+    started = time.perf_counter()
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    p = canvas.Canvas(tmp_path, pagesize=letter)
     
     # Title
     p.setFont("Helvetica-Bold", 16)
@@ -542,109 +3349,576 @@ def generate_pdf_report(session, logs):
     p.drawString(50, y, "Audit Log:")
     y -= 30
     
-    p.setFont("Helvetica", 10)
-    for log in logs:
-        if y < 50:  # New page
-            p.showPage()
-            y = 750
+    # Rows are read here and drawn on a real thread a chunk at a time (see run_blocking)
+    rows = session_log_rows(session)
+    while True:
+        chunk = list(itertools.islice(rows, PDF_ROWS_PER_CHUNK))
+        if not chunk:
+            break
+        y = run_blocking(draw_log_rows, p, chunk, y)
+    
+    run_blocking(p.save)
+    os.replace(tmp_path, path)
+    metrics.observe('export_generation_seconds', time.perf_counter() - started, {'kind': 'session_pdf'})
+
+def send_pdf_report(job):
+    """Send a rendered PDF artifact"""
+    return send_file(job['path'], as_attachment=True, download_name=f"audit_report_{job['session_id']}.pdf", mimetype='application/pdf')
+
+class ReportJob(db.Model):
+    """PDF rendering jobs, kept in the database so any worker can answer a poll"""
+    job_id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    session_id = db.Column(db.String(36), nullable=False)
+    path = db.Column(db.String(500), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+class ReportJobQueue:
+    """Local worker pool that renders PDF reports off the request thread.
+    
+    Finished PDFs are cached on disk, so completed sessions are rendered once and
+    concurrent requests for the same artifact share a single job. Job state lives in
+    the ReportJob table; the worker that accepted a job renders it, and a job left
+    queued or running by a worker that died is given up after REPORT_JOB_TTL.
+    """
+    
+    def __init__(self):
+        self._executor = None
+        self._executor_lock = threading.Lock()
+    
+    def _pool(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=current_app.config['REPORT_WORKERS'],
+                    thread_name_prefix='report'
+                )
+            return self._executor
+    
+    @staticmethod
+    def _as_dict(job):
+        return {
+            'job_id': job.job_id,
+            'session_id': job.session_id,
+            'status': job.status,
+            'path': job.path,
+            'error': job.error
+        }
+    
+    @staticmethod
+    def _prune():
+        expires = datetime.utcnow() - timedelta(seconds=current_app.config['REPORT_JOB_TTL'])
+        ReportJob.query.filter(
+            ReportJob.status.in_(['done', 'failed']), ReportJob.created_at < expires
+        ).delete(synchronize_session=False)
+        ReportJob.query.filter(
+            ReportJob.status.in_(['queued', 'running']), ReportJob.created_at < expires
+        ).update({'status': 'failed', 'error': 'Abandoned by its worker'}, synchronize_session=False)
+    
+    def submit(self, session):
+        """Queue a render for the session, reusing a cached artifact or in-flight job"""
+        path = report_artifact_path(session)
+        self._prune()
         
-        p.drawString(50, y, f"{log.timestamp} - {log.item.name} ({log.item.sku})")
-        y -= 15
-        p.drawString(70, y, f"Action: {log.action}, Old: {log.old_quantity}, New: {log.new_quantity}, Discrepancy: {log.discrepancy}")
-        y -= 20
+        pending = ReportJob.query.filter(ReportJob.path == path, ReportJob.status.in_(['queued', 'running'])).first()
+        if pending:
+            db.session.commit()
+            return self._as_dict(pending)
+        
+        job = ReportJob(session_id=session.session_id, path=path, status='done' if os.path.exists(path) else 'queued')
+        db.session.add(job)
+        db.session.commit()
+        if job.status == 'queued':
+            self._pool().submit(self._run, current_app._get_current_object(), job.job_id, session.id)
+        return self._as_dict(job)
     
-    p.save()
-    buffer.seek(0)
+    @staticmethod
+    def _set_status(job_id, status, error=None):
+        ReportJob.query.filter_by(job_id=job_id).update({'status': status, 'error': error})
+        db.session.commit()
     
-    return send_file(buffer, as_attachment=True, download_name=f'audit_report_{session.session_id}.pdf', mimetype='application/pdf')
-
-def generate_csv_report(session, logs):
-    """Generate CSV report"""
-    output = io.StringIO()
-    writer = csv.writer(output)
+    def _run(self, app, job_id, session_pk):
+        with app.app_context():
+            self._set_status(job_id, 'running')
+            job = db.session.get(ReportJob, job_id)
+            try:
+                session = db.session.get(AuditSession, session_pk)
+                os.makedirs(os.path.dirname(job.path), exist_ok=True)
+                generate_pdf_report(session, job.path)
+                self._remove_stale(session.session_id, job.path)
+                self._set_status(job_id, 'done')
+            except Exception as e:
+                app.logger.exception('PDF report rendering failed for session %s', job.session_id)
+                db.session.rollback()
+                self._set_status(job_id, 'failed', str(e))
     
-    # Header
-    writer.writerow(['Session Info'])
-    writer.writerow(['Session ID', session.session_id])
-    writer.writerow(['User', session.user.username])
-    writer.writerow(['Start Time', session.start_time])
-    writer.writerow(['End Time', session.end_time or 'Active'])
-    writer.writerow(['Items Scanned', session.items_scanned])
-    writer.writerow(['Discrepancies Found', session.discrepancies_found])
-    writer.writerow([])
+    @staticmethod
+    def _remove_stale(session_id, current_path):
+        # Older artifacts of a session that was still active when rendered
+        directory = os.path.dirname(current_path)
+        prefix = f'audit_report_{session_id}_'
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.startswith(prefix) and name.endswith('.pdf') and path != current_path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
     
-    # Audit logs
-    writer.writerow(['Audit Logs'])
-    writer.writerow(['Timestamp', 'Item Name', 'SKU', 'Action', 'Old Quantity', 'New Quantity', 'Discrepancy', 'Notes'])
-    
-    for log in logs:
-        writer.writerow([
-            log.timestamp,
-            log.item.name,
-            log.item.sku,
-            log.action,
-            log.old_quantity,
-            log.new_quantity,
-            log.discrepancy,
-            log.notes or ''
-        ])
+    def get(self, job_id):
+        job = db.session.get(ReportJob, job_id)
+        return self._as_dict(job) if job else None
+
+report_jobs = ReportJobQueue()
+
+def report_job_status(job):
+    """Public view of a report job"""
+    status = {
+        'job_id': job['job_id'],
+        'session_id': job['session_id'],
+        'status': job['status'],
+        'error': job['error']
+    }
+    if job['status'] == 'done':
+        status['download_url'] = url_for('main.download_report_job', job_id=job['job_id'])
+    return status
+
+@bp.route('/api/session/<session_id>/report', methods=['POST'])
+@login_required
+def submit_report_job(session_id):
+    """Queue PDF rendering for a session"""
+    session = AuditSession.query.filter_by(session_id=session_id).first_or_404()
+    job = report_jobs.submit(session)
+    return jsonify(report_job_status(job)), 200 if job['status'] == 'done' else 202
+
+@bp.route('/api/report_jobs/<job_id>')
+@login_required
+def get_report_job(job_id):
+    """Poll a PDF rendering job"""
+    job = report_jobs.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(report_job_status(job))
+
+@bp.route('/api/report_jobs/<job_id>/download')
+@login_required
+def download_report_job(job_id):
+    """Download the PDF produced by a finished job"""
+    job = report_jobs.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] != 'done':
+        return jsonify(report_job_status(job)), 409
+    return send_pdf_report(job)
+
+def generate_csv_report(session):
+    """Stream CSV report in batches so memory stays flat for large sessions"""
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+    session_rows = [
+        ['Session Info'],
+        ['Session ID', session.session_id],
+        ['User', session.user.username],
+        ['Start Time', session.start_time],
+        ['End Time', session.end_time or 'Active'],
+        ['Items Scanned', session.items_scanned],
+        ['Discrepancies Found', session.discrepancies_found],
+        []
+    ]
+    
+    log_rows = session_log_rows(session)
     
-    buffer = io.BytesIO()
-    buffer.write(output.getvalue().encode('utf-8'))
-    buffer.seek(0)
+    def generate():
+        output = io.StringIO()
+        writer = csv.writer(output)
+        
+        # Header
+        writer.writerows(session_rows)
+        
+        # Audit logs
+        writer.writerow(['Audit Logs'])
+        writer.writerow(['Timestamp', 'Item Name', 'SKU', 'Action', 'Old Quantity', 'New Quantity', 'Discrepancy', 'Notes'])
+        
+        for count, row in enumerate(log_rows, 1):
+            writer.writerow([
+                row.timestamp, row.name, row.sku, row.action,
+                row.old_quantity, row.new_quantity, row.discrepancy, row.notes or ''
+            ])
+            if count % batch_size == 0:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+        
+        yield output.getvalue()
     
-    return send_file(buffer, as_attachment=True, download_name=f'audit_report_{session.session_id}.csv', mimetype='text/csv')
+    response = Response(stream_with_context(timed_export(generate(), 'session_csv')), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename=audit_report_{session.session_id}.csv'
+    return response
 
 # WebSocket Events
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
     if current_user.is_authenticated:
-        join_room('all_users')
+        join_room(role_room(current_user.role))
+        join_room(user_room(current_user.id))
         emit('connected', {'message': 'Connected to inventory system'})
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
-    if current_user.is_authenticated:
-        leave_room('all_users')
+    # Socket.IO removes the client from all of its rooms automatically
+
+def can_join_room(room):
+    """Check whether the current user may subscribe to a room"""
+    kind, _, key = room.partition(':') if isinstance(room, str) else ('', '', '')
+    if not key:
+        return False
+    
+    if kind == 'session':
+        session = AuditSession.query.filter_by(session_id=key).first()
+        return bool(session) and (
+            session.user_id == current_user.id or current_user.role in current_app.config['AUDIT_WATCH_ROLES']
+        )
+    if kind == 'location':
+        return db.session.query(InventoryItem.id).filter_by(location=key).first() is not None
+    if kind == 'role':
+        return key == current_user.role
+    if kind == 'user':
+        return key == str(current_user.id)
+    return False
 
 @socketio.on('join_room')
 def handle_join_room(room):
-    """Handle joining a room"""
-    if current_user.is_authenticated:
-        join_room(room)
-        emit('joined_room', {'room': room})
+    """Handle joining a session, location, role or user room"""
+    if not current_user.is_authenticated:
+        return
+    
+    if not can_join_room(room):
+        emit('join_room_error', {'room': room, 'message': 'Not allowed to join room'})
+        return
+    
+    join_room(room)
+    emit('joined_room', {'room': room})
 
-if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
-        
-        # Create default admin user if none exists
-        admin = User.query.filter_by(username='admin').first()
-        if not admin:
-            admin = User(
-                username='admin',
-                email='admin@inventory.com',
-                password_hash=generate_password_hash('admin123'),
-                role='admin'
-            )
-            db.session.add(admin)
-            
-            # Add sample inventory items
-            sample_items = [
-                InventoryItem(name='Laptop Dell XPS 13', sku='LAPTOP-001', barcode='123456789', expected_quantity=10, actual_quantity=10, category='Electronics', location='Shelf A1'),
-                InventoryItem(name='Wireless Mouse', sku='MOUSE-001', barcode='123456790', expected_quantity=25, actual_quantity=23, category='Accessories', location='Shelf B2'),
-                InventoryItem(name='USB Cable Type-C', sku='CABLE-001', barcode='123456791', expected_quantity=50, actual_quantity=48, category='Cables', location='Drawer C1'),
-                InventoryItem(name='Monitor 24 inch', sku='MONITOR-001', barcode='123456792', expected_quantity=8, actual_quantity=8, category='Electronics', location='Shelf A2'),
-                InventoryItem(name='Keyboard Mechanical', sku='KEYBOARD-001', barcode='123456793', expected_quantity=15, actual_quantity=14, category='Accessories', location='Shelf B1'),
-            ]
-            
-            for item in sample_items:
-                db.session.add(item)
-            
+@socketio.on('leave_room')
+def handle_leave_room(room):
+    """Handle leaving a room"""
+    if current_user.is_authenticated and isinstance(room, str):
+        leave_room(room)
+        emit('left_room', {'room': room})
+
+# Schema migrations
+class SchemaMigration(db.Model):
+    """Versioned schema changes that have been applied to this database"""
+    version = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    applied_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+MIGRATIONS = []
+
+def migration(version, name):
+    """Register a schema migration; pending versions are applied in ascending order"""
+    def register(func):
+        MIGRATIONS.append((version, name, func))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return func
+    return register
+
+def create_indexes(*names):
+    """Create model-declared indexes that are missing from existing tables"""
+    indexes = {index.name: index for table in db.metadata.sorted_tables for index in table.indexes}
+    for name in names:
+        # IF NOT EXISTS: reflection-based checkfirst misses expression indexes on SQLite
+        db.session.connection().execute(db.schema.CreateIndex(indexes[name], if_not_exists=True))
+
+@migration(1, 'inventory listing indexes')
+def migrate_inventory_listing_indexes():
+    create_indexes(
+        'ix_inventory_item_category_id',
+        'ix_inventory_item_location_id',
+        'ix_inventory_item_last_updated_id',
+        'ix_inventory_item_discrepancy'
+    )
+
+@migration(2, 'audit session and log indexes')
+def migrate_audit_indexes():
+    create_indexes('ix_audit_session_status_user_id', 'ix_audit_log_session_id_id', 'ix_audit_log_item_id')
+
+def add_column(model, name):
+    """Add a model-declared column that is missing from an existing table"""
+    table = model.__table__
+    connection = db.session.connection()
+    if name in {column['name'] for column in db.inspect(connection).get_columns(table.name)}:
+        return
+    column = db.schema.CreateColumn(table.c[name]).compile(dialect=connection.dialect)
+    connection.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column}')
+
+@migration(3, 'inventory item version column')
+def migrate_item_version():
+    add_column(InventoryItem, 'version')
+
+@migration(4, 'audit log idempotency keys')
+def migrate_audit_log_idempotency():
+    add_column(AuditLog, 'idempotency_key')
+    create_indexes('ux_audit_log_session_idempotency')
+
+@migration(5, 'change sequence for delta sync')
+def migrate_change_seq():
+    add_column(InventoryItem, 'change_seq')
+    add_column(AuditSession, 'change_seq')
+    create_indexes('ix_inventory_item_change_seq', 'ix_audit_session_change_seq')
+
+@migration(6, 'audit session log storage')
+def migrate_session_log_storage():
+    add_column(AuditSession, 'log_storage')
+
+@migration(7, 'catalog full-text search index')
+def migrate_search_index():
+    connection = db.session.connection()
+    if connection.dialect.name == 'sqlite':
+        create_search_index(connection)
+        connection.exec_driver_sql("INSERT INTO inventory_item_fts(inventory_item_fts) VALUES ('rebuild')")
+
+def upgrade_database():
+    """Create missing tables and apply pending migrations; returns the versions applied"""
+    # A fresh database gets the current schema from create_all(), so migrations are only recorded
+    fresh = not db.inspect(db.engine).has_table(InventoryItem.__tablename__)
+    db.create_all()
+    
+    applied = {version for (version,) in db.session.query(SchemaMigration.version)}
+    pending = [entry for entry in MIGRATIONS if entry[0] not in applied]
+    for version, name, func in pending:
+        try:
+            if not fresh:
+                func()
+            db.session.add(SchemaMigration(version=version, name=name))
             db.session.commit()
-            print("Default admin user created (username: admin, password: admin123)")
-            print("Sample inventory items added")
+        except Exception:
+            db.session.rollback()
+            raise
+    return [version for version, _, _ in pending]
+
+def pending_migrations():
+    """Registered migrations the database has not recorded yet"""
+    applied = set()
+    if db.inspect(db.engine).has_table(SchemaMigration.__tablename__):
+        applied = {version for (version,) in db.session.query(SchemaMigration.version)}
+    return [entry for entry in MIGRATIONS if entry[0] not in applied]
+
+def hot_queries():
+    """Representative statements for the request hot paths, keyed by description"""
+    return {
+        'active session for user': AuditSession.query.filter_by(user_id=1, status='active'),
+        'active sessions': AuditSession.query.filter_by(status='active'),
+        'session by public id': AuditSession.query.filter_by(session_id='00000000-0000-0000-0000-000000000000'),
+        'session export': db.session.query(AuditLog.id, InventoryItem.name).join(
+            InventoryItem, AuditLog.item_id == InventoryItem.id
+        ).filter(AuditLog.session_id == 1).order_by(AuditLog.id),
+        'item lookup by code': InventoryItem.query.filter(
+            db.or_(InventoryItem.barcode == '0', InventoryItem.sku == '0')
+        ),
+        'recently updated items': InventoryItem.query.order_by(InventoryItem.last_updated.desc()).limit(10),
+        'items by category': InventoryItem.query.filter(InventoryItem.category == 'x').order_by(InventoryItem.id).limit(50),
+        'items by location': InventoryItem.query.filter(InventoryItem.location == 'x').order_by(InventoryItem.id).limit(50),
+        'item categories': db.session.query(InventoryItem.category).distinct().order_by(InventoryItem.category)
+    }
+
+def full_table_scans(query):
+    """Tables SQLite's EXPLAIN QUERY PLAN reads without an index"""
+    statement = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True})
+    plan = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}').all()
+    scans = []
+    for row in plan:
+        detail = row[-1]
+        # Index scans read "SCAN <table> USING [COVERING] INDEX ..."
+        if detail.startswith('SCAN ') and 'USING' not in detail:
+            scans.append(detail[5:].replace('TABLE ', '', 1))
+    return scans
+
+@bp.cli.command('db-upgrade')
+def db_upgrade_command():
+    """Create missing tables and apply pending schema migrations"""
+    applied = upgrade_database()
+    if applied:
+        click.echo(f"Applied migrations: {', '.join(str(version) for version in applied)}")
+    else:
+        click.echo('Database schema is up to date')
+
+@bp.cli.command('db-status')
+def db_status_command():
+    """List schema migrations and whether they have been applied"""
+    applied = {}
+    if db.inspect(db.engine).has_table(SchemaMigration.__tablename__):
+        applied = {row.version: row.applied_at for row in SchemaMigration.query}
+    for version, name, _ in MIGRATIONS:
+        state = applied[version].strftime('%Y-%m-%d %H:%M') if version in applied else 'pending'
+        click.echo(f'{version:>4}  {name:<40} {state}')
+
+@bp.cli.command('check-query-plans')
+def check_query_plans_command():
+    """Fail if a hot query regresses to a full table scan"""
+    if db.engine.dialect.name != 'sqlite':
+        click.echo(f'Query plan check supports SQLite only (database is {db.engine.dialect.name})')
+        return
+    
+    # The hot queries select columns that older schemas do not have yet
+    pending = pending_migrations()
+    if pending:
+        click.echo(f"Pending schema migrations: {', '.join(str(version) for version, _, _ in pending)}; run `flask db-upgrade` first", err=True)
+        raise SystemExit(1)
+    
+    failures = 0
+    for name, query in hot_queries().items():
+        scans = full_table_scans(query)
+        if scans:
+            failures += 1
+            click.echo(f"FAIL  {name}: full scan of {', '.join(scans)}")
+        else:
+            click.echo(f'ok    {name}')
+    if failures:
+        raise SystemExit(1)
+
+@bp.cli.command('rebuild-aggregates')
+def rebuild_aggregates_command():
+    """Recompute the dashboard aggregates from the inventory table"""
+    rebuild_aggregates()
+    click.echo('Inventory aggregates rebuilt')
+
+@bp.cli.command('archive-audit-logs')
+def archive_audit_logs_command():
+    """Move logs of old completed sessions to the archive and apply the retention policy"""
+    result = archive_audit_logs()
+    click.echo(
+        f"Archived {result['logs_archived']} logs from {result['sessions_archived']} sessions; "
+        f"purged {result['sessions_purged']} archived sessions"
+    )
+
+@bp.cli.command('replay-scan-journal')
+def replay_scan_journal_command():
+    """Apply journaled scans that have not reached the database yet"""
+    scan_journal = current_scan_journal()
+    if scan_journal is None:
+        click.echo('Scan journal is disabled (set SCAN_JOURNAL_ENABLED=true)')
+        return
+    applied = 0
+    for path in journal_paths(scan_journal.template):
+        journal = ScanJournal(path)
+        try:
+            journal.open()
+        except RuntimeError:
+            click.echo(f'Skipping {path}: in use by a running worker')
+            continue
+        applied += journal.stats()['pending']
+        journal.drain()
+    click.echo(f'Applied {applied} journaled scans')
+
+@bp.cli.command('import-catalog')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'format_type', type=click.Choice(['csv', 'jsonl']), help='Defaults to the file extension')
+@click.option('--chunk-size', type=int, default=None, help='Rows per transaction')
+def import_catalog_command(path, format_type, chunk_size):
+    """Upsert inventory items from a CSV or JSONL file"""
+    format_type = catalog_format(format_type, path)
+    if not format_type:
+        raise click.BadParameter('Use a .csv or .jsonl file or pass --format')
+    
+    with open(path, encoding='utf-8', newline='') as stream:
+        report = CatalogImport(chunk_size).run(parse_catalog_rows(stream, format_type))
+    
+    for error in report['errors']:
+        click.echo(f"line {error['line']} ({error['sku'] or '-'}): {error['message']}", err=True)
+    click.echo(f"Processed {report['processed']}: {report['created']} created, {report['updated']} updated, {report['failed']} failed")
+
+@bp.cli.command('export-catalog')
+@click.argument('path', type=click.Path(dir_okay=False, writable=True))
+@click.option('--format', 'format_type', type=click.Choice(['csv', 'jsonl']), help='Defaults to the file extension')
+def export_catalog_command(path, format_type):
+    """Write every inventory item to a CSV or JSONL file"""
+    format_type = catalog_format(format_type, path)
+    if not format_type:
+        raise click.BadParameter('Use a .csv or .jsonl file or pass --format')
+    
+    with open(path, 'w', encoding='utf-8', newline='') as output:
+        for chunk in export_catalog_rows(format_type):
+            output.write(chunk)
+    click.echo(f'Catalog written to {path}')
+
+def seed_sample_data():
+    """Add the default admin user and sample inventory items to an empty database; False if already seeded"""
+    if User.query.filter_by(username='admin').first():
+        return False
+    
+    db.session.add(User(
+        username='admin',
+        email='admin@inventory.com',
+        password_hash=generate_password_hash('admin123'),
+        role='admin'
+    ))
+    db.session.add_all([
+        InventoryItem(name='Laptop Dell XPS 13', sku='LAPTOP-001', barcode='123456789', expected_quantity=10, actual_quantity=10, category='Electronics', location='Shelf A1'),
+        InventoryItem(name='Wireless Mouse', sku='MOUSE-001', barcode='123456790', expected_quantity=25, actual_quantity=23, category='Accessories', location='Shelf B2'),
+        InventoryItem(name='USB Cable Type-C', sku='CABLE-001', barcode='123456791', expected_quantity=50, actual_quantity=48, category='Cables', location='Drawer C1'),
+        InventoryItem(name='Monitor 24 inch', sku='MONITOR-001', barcode='123456792', expected_quantity=8, actual_quantity=8, category='Electronics', location='Shelf A2'),
+        InventoryItem(name='Keyboard Mechanical', sku='KEYBOARD-001', barcode='123456793', expected_quantity=15, actual_quantity=14, category='Accessories', location='Shelf B1'),
+    ])
+    db.session.commit()
+    return True
+
+@bp.cli.command('init-db')
+@click.option('--seed', is_flag=True, help='Also add the default admin user and sample items')
+def init_db_command(seed):
+    """Create or upgrade the schema and build the dashboard aggregates"""
+    applied = upgrade_database()
+    if applied:
+        click.echo(f"Applied migrations: {', '.join(str(version) for version in applied)}")
+    
+    if seed:
+        if seed_sample_data():
+            click.echo('Default admin user created (username: admin, password: admin123)')
+            click.echo('Sample inventory items added')
+        else:
+            click.echo('Admin user already exists; sample data not added')
+    
+    # Databases created before the aggregate store need an initial build
+    if not InventoryAggregate.query.first():
+        rebuild_aggregates()
+    click.echo('Database initialized')
+
+def create_app(config=None):
+    """Application factory; config overrides the settings read from the environment.
+    
+    Nothing touches the database here: schema setup and seeding are the init-db
+    command's job, and heavy export dependencies are imported on first use.
+    """
+    app = Flask(__name__)
+    load_config(app, config)
     
-    socketio.run(app, debug=True, host='0.0.0.0', port=5000, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    db.init_app(app)
+    # eventlet/gevent modes require monkey patching first; see wsgi.py
+    socketio.init_app(app, **socketio_options(app))
+    login_manager.init_app(app)
+    app.register_blueprint(bp)
+    
+    # Caches and the event bus hold state for one app and its database
+    app.extensions['static_versions'] = {}
+    app.extensions['event_bus'] = EventBus()
+    app.extensions['item_index'] = ItemLookupIndex()
+    app.extensions['user_cache'] = TTLCache(IDENTITY_CACHE_VERSION)
+    app.extensions['settings_cache'] = TTLCache(IDENTITY_CACHE_VERSION)
+    app.extensions['analytics_cache'] = AnalyticsCache()
+    
+    with app.app_context():
+        engine = db.engine
+    pragmas = sqlite_connection_pragmas(app.config)
+    if engine.dialect.name == 'sqlite' and pragmas:
+        configure_sqlite_connections(engine, pragmas)
+    
+    if app.config['SCAN_JOURNAL_ENABLED']:
+        app.extensions['scan_journal'] = ScanJournal(app.config['SCAN_JOURNAL_PATH'])
+    return app
+
+if __name__ == '__main__':
+    # Development server; create the database first with `flask --app app init-db --seed`
+    app = create_app()
+    socketio.run(app, debug=True, host='0.0.0.0', port=5000, allow_unsafe_werkzeug=True)
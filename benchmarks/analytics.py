@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Audit analytics benchmark
+
+Seeds a synthetic catalog and a multi-million-row AuditLog history spread over
+many completed sessions into a temporary SQLite database, then times a cold
+/api/analytics request (chunked columnar load plus vectorized aggregation), a
+cached request, and, for scale, a row-by-row ORM loop computing only the
+per-category statistics over a sample of the logs.
+
+    python benchmarks/analytics.py --items 50000 --sessions 200 --logs 5000000
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix='analytics-bench-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(WORKDIR, 'inventory.db')}"
+os.environ['AUDIT_ARCHIVE_DIR'] = os.path.join(WORKDIR, 'archive')
+sys.path.insert(0, ROOT)
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+from app import create_app, db, User, InventoryItem, AuditSession, AuditLog, upgrade_database  # noqa: E402
+
+app = create_app()
+
+SEED_CHUNK = 50000
+AUDITORS = 8
+
+def seed(items, sessions, logs):
+    """A catalog, AUDITORS users and `sessions` completed sessions, one every three days, sharing `logs` rows"""
+    upgrade_database()
+    for n in range(AUDITORS):
+        db.session.add(User(username=f'bench{n}', email=f'bench{n}@example.com',
+                            password_hash=generate_password_hash('bench'), role='admin'))
+    db.session.commit()
+
+    for start in range(0, items, SEED_CHUNK):
+        db.session.bulk_insert_mappings(InventoryItem, [
+            dict(name=f'Item {i}', sku=f'SKU-{i}', barcode=f'BC-{i}', expected_quantity=10, actual_quantity=10,
+                 category=f'Category {i % 20}', location=f'Aisle {i % 50}')
+            for i in range(start, min(start + SEED_CHUNK, items))
+        ])
+        db.session.commit()
+
+    rng = random.Random(7)
+    # A few items shrink in most sessions; everything else is usually counted right
+    shrinking = set(rng.sample(range(1, items + 1), max(1, items // 1000)))
+    first = datetime(2024, 1, 1)
+    per_session = logs // sessions
+    for s in range(sessions):
+        started = first + timedelta(days=3 * s)
+        session = AuditSession(user_id=s % AUDITORS + 1, status='completed', start_time=started,
+                               end_time=started + timedelta(hours=8), items_scanned=per_session)
+        db.session.add(session)
+        db.session.flush()
+        for start in range(0, per_session, SEED_CHUNK):
+            rows = []
+            for n in range(start, min(start + SEED_CHUNK, per_session)):
+                item_id = (n * 7919 + s) % items + 1
+                roll = rng.random()
+                if item_id in shrinking and roll < 0.8:
+                    discrepancy = -rng.randint(1, 5)
+                elif roll < 0.05:
+                    discrepancy = rng.choice((-2, -1, 1, 2))
+                else:
+                    discrepancy = 0
+                rows.append(dict(session_id=session.id, user_id=session.user_id, item_id=item_id, action='scan',
+                                 old_quantity=10, new_quantity=10 + discrepancy, discrepancy=discrepancy,
+                                 timestamp=started + timedelta(milliseconds=n * 50), notes=''))
+            db.session.execute(AuditLog.__table__.insert(), rows)
+        db.session.commit()
+    return per_session * sessions
+
+def orm_baseline(sample):
+    """Per-category counts, shrinkage and variance with one ORM object per log row"""
+    stats = {}
+    query = AuditLog.query.options(db.joinedload(AuditLog.item)).order_by(AuditLog.id).limit(sample)
+    for log in query.yield_per(1000):
+        entry = stats.setdefault(log.item.category, [0, 0, 0, 0])
+        entry[0] += 1
+        entry[1] += log.discrepancy != 0
+        entry[2] += max(-log.discrepancy, 0)
+        entry[3] += log.discrepancy * log.discrepancy
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=50000)
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--logs', type=int, default=2000000, help='AuditLog rows across all sessions')
+    parser.add_argument('--baseline-sample', type=int, default=200000, help='rows read by the ORM loop')
+    args = parser.parse_args()
+
+    results = {'items': args.items, 'sessions': args.sessions, 'chunk_size': app.config['ANALYTICS_CHUNK_SIZE']}
+    with app.app_context():
+        started = time.perf_counter()
+        results['logs'] = seed(args.items, args.sessions, args.logs)
+        results['seed_seconds'] = round(time.perf_counter() - started, 1)
+
+        client = app.test_client()
+        client.post('/login', data={'username': 'bench0', 'password': 'bench'})
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        started = time.perf_counter()
+        response = client.get('/api/analytics?period=W')
+        cold = time.perf_counter() - started
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        assert response.status_code == 200, response.get_data(as_text=True)
+        report = response.get_json()
+
+        started = time.perf_counter()
+        client.get('/api/analytics?period=W')
+        cached = time.perf_counter() - started
+
+        results['analytics'] = {
+            'cold_seconds': round(cold, 2),
+            'logs_per_second': round(results['logs'] / cold),
+            'peak_rss_growth_mb': round((rss_after - rss_before) / 1024, 1),
+            'cached_ms': round(cached * 1000, 2),
+            'repeat_skus': len(report['repeat_skus']),
+            'outlier_skus': len(report['outlier_skus'])
+        }
+
+        sample = min(args.baseline_sample, results['logs'])
+        started = time.perf_counter()
+        orm_baseline(sample)
+        elapsed = time.perf_counter() - started
+        results['orm_baseline'] = {
+            'sample_logs': sample,
+            'seconds': round(elapsed, 2),
+            'logs_per_second': round(sample / elapsed),
+            'projected_full_seconds': round(elapsed * results['logs'] / sample, 1)
+        }
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
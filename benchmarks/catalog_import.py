@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Catalog import/export throughput benchmark
+
+Generates a synthetic catalog, then measures against a temporary SQLite database:
+one POST /api/item per SKU (the old onboarding path), chunked CSV and JSONL imports,
+a re-import that updates every row, and the streaming CSV export.
+
+    python benchmarks/catalog_import.py --items 100000 --chunk-size 500
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix='catalog-bench-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(WORKDIR, 'inventory.db')}"
+os.environ.setdefault('IDENTITY_CACHE_ENABLED', 'false')
+sys.path.insert(0, ROOT)
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+from app import (  # noqa: E402
+    create_app, db, User, InventoryItem, CatalogImport, CATALOG_FIELDS, export_catalog_rows, parse_catalog_rows
+)
+
+app = create_app()
+
+def catalog_row(i, quantity):
+    return {
+        'name': f'Item {i}',
+        'sku': f'SKU-{i}',
+        'barcode': f'BC-{i}',
+        'category': f'Category {i % 20}',
+        'location': f'Aisle {i % 50}',
+        'expected_quantity': quantity,
+        'actual_quantity': quantity
+    }
+
+def write_catalog(path, format_type, items, quantity):
+    with open(path, 'w', encoding='utf-8', newline='') as output:
+        if format_type == 'csv':
+            writer = csv.DictWriter(output, fieldnames=CATALOG_FIELDS)
+            writer.writeheader()
+            for i in range(items):
+                writer.writerow(catalog_row(i, quantity))
+        else:
+            for i in range(items):
+                output.write(json.dumps(catalog_row(i, quantity)) + '\n')
+
+def reset_catalog():
+    InventoryItem.query.delete()
+    db.session.commit()
+
+def timed_import(path, format_type, chunk_size):
+    started = time.perf_counter()
+    with open(path, encoding='utf-8', newline='') as stream:
+        report = CatalogImport(chunk_size).run(parse_catalog_rows(stream, format_type))
+    elapsed = time.perf_counter() - started
+    return {
+        'rows': report['processed'],
+        'created': report['created'],
+        'updated': report['updated'],
+        'failed': report['failed'],
+        'seconds': round(elapsed, 3),
+        'rows_per_s': round(report['processed'] / elapsed, 1)
+    }
+
+def per_item_baseline(rows):
+    """Onboard SKUs one request at a time through POST /api/item"""
+    client = app.test_client()
+    client.post('/login', data={'username': 'bench', 'password': 'bench'})
+    started = time.perf_counter()
+    for i in range(rows):
+        response = client.post('/api/item', json=catalog_row(i, 5))
+        assert response.status_code == 200, response.get_data(as_text=True)
+    elapsed = time.perf_counter() - started
+    return {'rows': rows, 'seconds': round(elapsed, 3), 'rows_per_s': round(rows / elapsed, 1)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=100000)
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--baseline-items', type=int, default=1000, help='rows sent through POST /api/item')
+    args = parser.parse_args()
+
+    csv_path = os.path.join(WORKDIR, 'catalog.csv')
+    jsonl_path = os.path.join(WORKDIR, 'catalog.jsonl')
+    update_path = os.path.join(WORKDIR, 'catalog_update.csv')
+    write_catalog(csv_path, 'csv', args.items, 5)
+    write_catalog(jsonl_path, 'jsonl', args.items, 5)
+    write_catalog(update_path, 'csv', args.items, 7)
+
+    results = {'items': args.items, 'chunk_size': args.chunk_size}
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username='bench', email='bench@example.com', password_hash=generate_password_hash('bench'), role='admin'))
+        db.session.commit()
+
+        results['per_item_api'] = per_item_baseline(min(args.baseline_items, args.items))
+        reset_catalog()
+
+        results['import_csv'] = timed_import(csv_path, 'csv', args.chunk_size)
+        results['reimport_csv_updates'] = timed_import(update_path, 'csv', args.chunk_size)
+        reset_catalog()
+        results['import_jsonl'] = timed_import(jsonl_path, 'jsonl', args.chunk_size)
+
+        started = time.perf_counter()
+        exported = sum(len(chunk) for chunk in export_catalog_rows('csv'))
+        elapsed = time.perf_counter() - started
+        results['export_csv'] = {
+            'rows': args.items,
+            'bytes': exported,
+            'seconds': round(elapsed, 3),
+            'rows_per_s': round(args.items / elapsed, 1)
+        }
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+HTTP caching and compression benchmark
+
+Seeds a catalog and an audit session into a temporary SQLite database, then
+requests the polled JSON endpoints, a large item page and a session CSV export
+four ways: uncompressed, gzip, brotli, and as a revalidation whose ETag still
+matches (304). Reports body bytes and CPU time per request, measured in process
+with the Flask test client, so CPU includes the client's small share.
+
+    python benchmarks/http_caching.py --items 10000 --logs 50000 --repeat 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix='http-caching-bench-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(WORKDIR, 'inventory.db')}"
+os.environ.setdefault('SCAN_JOURNAL_ENABLED', 'false')
+sys.path.insert(0, ROOT)
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+from app import create_app, db, brotli, User, InventoryItem, AuditSession, AuditLog, upgrade_database  # noqa: E402
+
+app = create_app()
+
+SEED_CHUNK = 10000
+ENCODINGS = {'identity': 'identity', 'gzip': 'gzip', 'br': 'br'}
+
+def seed(items, logs):
+    upgrade_database()
+    user = User(username='bench', email='bench@example.com', password_hash=generate_password_hash('bench'), role='admin')
+    db.session.add(user)
+    db.session.commit()
+    for start in range(0, items, SEED_CHUNK):
+        db.session.bulk_insert_mappings(InventoryItem, [
+            dict(name=f'Item {i}', sku=f'SKU-{i}', barcode=f'BC-{i}', expected_quantity=10, actual_quantity=10 - i % 3,
+                 category=f'Category {i % 20}', location=f'Aisle {i % 50}', last_updated=datetime.utcnow())
+            for i in range(start, min(start + SEED_CHUNK, items))
+        ])
+        db.session.commit()
+
+    started = datetime.utcnow() - timedelta(hours=2)
+    session = AuditSession(user_id=user.id, status='active', start_time=started, items_scanned=logs)
+    db.session.add(session)
+    db.session.commit()
+    for start in range(0, logs, SEED_CHUNK):
+        db.session.bulk_insert_mappings(AuditLog, [
+            dict(session_id=session.id, user_id=user.id, item_id=n % items + 1, action='scan', old_quantity=10,
+                 new_quantity=10 - n % 3, discrepancy=-(n % 3), timestamp=started + timedelta(milliseconds=n), notes='')
+            for n in range(start, min(start + SEED_CHUNK, logs))
+        ])
+        db.session.commit()
+    return session.session_id
+
+def measure(client, url, repeat, headers):
+    """Mean body bytes and CPU milliseconds per request"""
+    client.get(url, headers=headers)
+    size = 0
+    status = None
+    started = time.process_time()
+    for _ in range(repeat):
+        response = client.get(url, headers=headers)
+        body = response.get_data()
+        size = len(body)
+        status = response.status_code
+    cpu = time.process_time() - started
+    return {'status': status, 'bytes': size, 'cpu_ms': round(cpu / repeat * 1000, 3)}
+
+def bench_url(client, url, repeat):
+    results = {}
+    etag = None
+    for name, encoding in ENCODINGS.items():
+        if name == 'br' and brotli is None:
+            continue
+        results[name] = measure(client, url, repeat, {'Accept-Encoding': encoding})
+        etag = etag or client.get(url).headers.get('ETag')
+    if etag:
+        results['not_modified'] = measure(client, url, repeat, {'If-None-Match': etag, 'Accept-Encoding': 'gzip, br'})
+
+    baseline = results['identity']
+    for name, result in results.items():
+        if name != 'identity':
+            result['bytes_saved_pct'] = round(100 * (1 - result['bytes'] / baseline['bytes']), 1) if baseline['bytes'] else None
+            result['cpu_change_pct'] = round(100 * (result['cpu_ms'] / baseline['cpu_ms'] - 1), 1)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--logs', type=int, default=50000, help='AuditLog rows in the exported session')
+    parser.add_argument('--repeat', type=int, default=200, help='requests per measurement (exports use a tenth)')
+    args = parser.parse_args()
+
+    results = {'items': args.items, 'logs': args.logs, 'brotli': brotli is not None}
+    with app.app_context():
+        session_id = seed(args.items, args.logs)
+        client = app.test_client()
+        client.post('/login', data={'username': 'bench', 'password': 'bench'})
+
+        urls = {
+            'item': '/api/item/1',
+            'session': f'/api/session/{session_id}',
+            'active_session': '/api/active_session',
+            'settings': '/api/settings',
+            'items_page_500': '/api/items?limit=500'
+        }
+        for name, url in urls.items():
+            results[name] = bench_url(client, url, args.repeat)
+        results['session_csv_export'] = bench_url(client, f'/api/session/{session_id}/export?format=csv', max(1, args.repeat // 10))
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
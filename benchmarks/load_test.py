@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Load test comparing Socket.IO server async modes
+
+Starts wsgi.py in each requested mode against a freshly seeded temporary database,
+connects simulated dashboard clients, then replays scans from concurrent auditors.
+Reports connected-client capacity and scan latency percentiles as JSON.
+
+    python benchmarks/load_test.py --modes threading eventlet --clients 500
+
+Requires aiohttp and the asyncio Socket.IO client (python-socketio[asyncio_client]).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+import socketio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = 'loadtest'
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def seed_database(database_url, items, auditors):
+    """Create the schema, auditor accounts and a synthetic catalog in a subprocess"""
+    script = f'''
+import os
+os.environ['DATABASE_URL'] = {database_url!r}
+from werkzeug.security import generate_password_hash
+from app import create_app, db, User, InventoryItem
+with create_app().app_context():
+    db.create_all()
+    password_hash = generate_password_hash({PASSWORD!r})
+    for n in range({auditors}):
+        db.session.add(User(username=f'auditor{{n}}', email=f'auditor{{n}}@example.com', password_hash=password_hash, role='admin'))
+    db.session.bulk_insert_mappings(InventoryItem, [
+        dict(name=f'Item {{i}}', sku=f'SKU-{{i}}', barcode=f'BC-{{i}}', expected_quantity=10, actual_quantity=10,
+             category=f'Category {{i % 20}}', location=f'Aisle {{i % 50}}')
+        for i in range({items})
+    ])
+    db.session.commit()
+'''
+    subprocess.run([sys.executable, '-c', script], cwd=ROOT, check=True)
+
+def start_server(mode, port, database_url):
+    env = dict(os.environ, SOCKETIO_ASYNC_MODE=mode, PORT=str(port), HOST='127.0.0.1', DATABASE_URL=database_url)
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'wsgi.py')],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'Server in {mode} mode did not start')
+
+async def login(base_url, username):
+    http = aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True))
+    async with http.post(f'{base_url}/login', data={'username': username, 'password': PASSWORD}, allow_redirects=False) as response:
+        if response.status != 302:
+            raise RuntimeError(f'Login failed for {username}')
+    return http
+
+def cookie_header(http):
+    return '; '.join(f'{cookie.key}={cookie.value}' for cookie in http.cookie_jar)
+
+async def connect_dashboards(base_url, cookie, count, rooms, batch_size, timeout):
+    """Connect dashboard clients in waves; returns clients, failures and a received-event counter"""
+    clients = []
+    failures = 0
+    received = {'events': 0}
+
+    async def connect_one():
+        client = socketio.AsyncClient(reconnection=False)
+
+        @client.on('items_scanned')
+        async def on_items_scanned(data):
+            received['events'] += 1
+
+        await asyncio.wait_for(client.connect(base_url, headers={'Cookie': cookie}, transports=['websocket']), timeout)
+        for room in rooms:
+            await client.emit('join_room', room)
+        return client
+
+    for start in range(0, count, batch_size):
+        results = await asyncio.gather(
+            *(connect_one() for _ in range(min(batch_size, count - start))),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                failures += 1
+            else:
+                clients.append(result)
+    return clients, failures, received
+
+async def run_auditor(http, base_url, session_id, scans, items, offset, latencies, errors):
+    for n in range(scans):
+        code = f'BC-{(offset + n) % items}'
+        started = time.perf_counter()
+        try:
+            async with http.post(f'{base_url}/api/scan', json={
+                'session_id': session_id, 'barcode': code, 'actual_quantity': n % 12
+            }) as response:
+                await response.read()
+                if response.status != 200:
+                    errors.append(response.status)
+                    continue
+        except aiohttp.ClientError as e:
+            errors.append(str(e))
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+
+async def run_mode(mode, args):
+    workdir = tempfile.mkdtemp(prefix=f'loadtest-{mode}-')
+    database_url = f"sqlite:///{os.path.join(workdir, 'inventory.db')}"
+    seed_database(database_url, args.items, args.auditors)
+
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    server = start_server(mode, port, database_url)
+    clients = []
+    auditors = []
+    try:
+        for n in range(args.auditors):
+            auditors.append(await login(base_url, f'auditor{n}'))
+        session_ids = []
+        for http in auditors:
+            async with http.post(f'{base_url}/start_audit') as response:
+                session_ids.append((await response.json())['session_id'])
+
+        started = time.perf_counter()
+        rooms = [f'session:{session_id}' for session_id in session_ids]
+        clients, failures, received = await connect_dashboards(
+            base_url, cookie_header(auditors[0]), args.clients, rooms, args.connect_batch, args.connect_timeout
+        )
+        connect_seconds = time.perf_counter() - started
+
+        latencies = []
+        errors = []
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            run_auditor(http, base_url, session_id, args.scans, args.items, n * args.scans, latencies, errors)
+            for n, (http, session_id) in enumerate(zip(auditors, session_ids))
+        ))
+        scan_seconds = time.perf_counter() - started
+
+        # Give coalesced broadcasts time to drain
+        await asyncio.sleep(1)
+
+        return {
+            'mode': mode,
+            'clients_requested': args.clients,
+            'clients_connected': len(clients),
+            'client_failures': failures,
+            'connect_seconds': round(connect_seconds, 3),
+            'scans': len(latencies),
+            'scan_errors': len(errors),
+            'scan_throughput_per_s': round(len(latencies) / scan_seconds, 1) if scan_seconds else None,
+            'scan_p50_ms': round(percentile(latencies, 0.50), 2) if latencies else None,
+            'scan_p99_ms': round(percentile(latencies, 0.99), 2) if latencies else None,
+            'broadcasts_received': received['events']
+        }
+    finally:
+        await asyncio.gather(*(client.disconnect() for client in clients), return_exceptions=True)
+        for http in auditors:
+            await http.close()
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', nargs='+', default=['threading', 'eventlet'], choices=['threading', 'eventlet', 'gevent'])
+    parser.add_argument('--clients', type=int, default=200, help='dashboard clients to connect')
+    parser.add_argument('--auditors', type=int, default=5, help='concurrent scanning auditors')
+    parser.add_argument('--scans', type=int, default=200, help='scans per auditor')
+    parser.add_argument('--items', type=int, default=10000, help='catalog size')
+    parser.add_argument('--connect-batch', type=int, default=50, help='clients connected per wave')
+    parser.add_argument('--connect-timeout', type=float, default=10.0)
+    args = parser.parse_args()
+
+    results = [await run_mode(mode, args) for mode in args.modes]
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    asyncio.run(main())
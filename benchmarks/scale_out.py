@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Multi-worker scale-out check
+
+Starts several wsgi.py worker processes on their own ports, sharing one SQLite
+database and a Socket.IO message queue, connects a dashboard client to every
+worker, and scans from an auditor on each worker in turn. Every dashboard must
+receive every scan no matter which worker handled it. It also checks that a PDF
+report job submitted on one worker can be polled on another.
+
+By default the queue is kombu's filesystem transport in a temporary directory,
+so no broker is needed; pass --message-queue redis://localhost:6379/0 (or any
+kombu URL) to exercise a real one. Prints JSON and exits non-zero on a miss.
+
+    python benchmarks/scale_out.py --workers 3 --scans 50
+
+Requires kombu (or redis), aiohttp and the asyncio Socket.IO client.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+import socketio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = 'scaleout'
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def seed_database(env, items):
+    """Create the schema, an auditor and a small catalog in a subprocess"""
+    script = f'''
+from werkzeug.security import generate_password_hash
+from app import create_app, db, User, InventoryItem, upgrade_database
+with create_app().app_context():
+    upgrade_database()
+    db.session.add(User(username='auditor', email='auditor@example.com', password_hash=generate_password_hash({PASSWORD!r}), role='admin'))
+    db.session.bulk_insert_mappings(InventoryItem, [
+        dict(name=f'Item {{i}}', sku=f'SKU-{{i}}', barcode=f'BC-{{i}}', expected_quantity=10, actual_quantity=10,
+             category=f'Category {{i % 5}}', location=f'Aisle {{i % 10}}')
+        for i in range({items})
+    ])
+    db.session.commit()
+'''
+    subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=env, check=True)
+
+def queue_environment(workdir, url):
+    if url:
+        return {'SOCKETIO_MESSAGE_QUEUE': url}
+    folder = os.path.join(workdir, 'queue')
+    os.makedirs(os.path.join(folder, 'control'))
+    options = {'transport_options': {
+        'data_folder_in': folder, 'data_folder_out': folder,
+        'control_folder': os.path.join(folder, 'control'), 'polling_interval': 0.05
+    }}
+    return {'SOCKETIO_MESSAGE_QUEUE': 'filesystem://', 'SOCKETIO_MESSAGE_QUEUE_OPTIONS': json.dumps(options)}
+
+def start_worker(env, port, log_path):
+    log = open(log_path, 'wb')
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'wsgi.py')],
+        cwd=ROOT, env=dict(env, PORT=str(port), HOST='127.0.0.1'), stdout=log, stderr=subprocess.STDOUT
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return process
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'Worker on port {port} did not start; see {log_path}')
+
+async def connect_dashboard(base_url, cookie, room, received):
+    client = socketio.AsyncClient(reconnection=False)
+    joined = asyncio.Event()
+
+    @client.on('items_scanned')
+    async def on_items_scanned(data):
+        now = time.perf_counter()
+        for item in data['items']:
+            received.setdefault(item['item_name'], now)
+
+    @client.on('joined_room')
+    async def on_joined_room(data):
+        joined.set()
+
+    await client.connect(base_url, headers={'Cookie': cookie}, transports=['websocket'])
+    await client.emit('join_room', room)
+    await asyncio.wait_for(joined.wait(), 10)
+    return client
+
+async def run(args, urls):
+    http = aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True))
+    clients = []
+    try:
+        async with http.post(f'{urls[0]}/login', data={'username': 'auditor', 'password': PASSWORD}, allow_redirects=False) as response:
+            assert response.status == 302, 'login failed'
+        cookie = '; '.join(f'{cookie.key}={cookie.value}' for cookie in http.cookie_jar)
+        async with http.post(f'{urls[0]}/start_audit') as response:
+            session_id = (await response.json())['session_id']
+
+        # One dashboard per worker, all following the same session
+        received = [{} for _ in urls]
+        for url, seen in zip(urls, received):
+            clients.append(await connect_dashboard(url, cookie, f'session:{session_id}', seen))
+
+        # Scans round-robin across workers; the same auditor cookie is valid on all of them
+        sent = {}
+        for n in range(args.scans):
+            name = f'Item {n % args.items}'
+            if name in sent:
+                continue
+            url = urls[n % len(urls)]
+            sent[name] = (url, time.perf_counter())
+            async with http.post(f'{url}/api/scan', json={
+                'session_id': session_id, 'barcode': f'BC-{n % args.items}', 'actual_quantity': n % 12
+            }) as response:
+                assert response.status == 200, await response.text()
+
+        deadline = time.monotonic() + args.wait
+        while time.monotonic() < deadline and not all(len(seen) >= len(sent) for seen in received):
+            await asyncio.sleep(0.05)
+
+        dashboards = []
+        for url, seen in zip(urls, received):
+            latencies = sorted((seen[name] - started) * 1000 for name, (_, started) in sent.items() if name in seen)
+            dashboards.append({
+                'worker': url,
+                'received': len(seen),
+                'from_other_workers': sum(1 for name in seen if sent[name][0] != url),
+                'p50_delivery_ms': round(latencies[len(latencies) // 2], 1) if latencies else None,
+                'max_delivery_ms': round(latencies[-1], 1) if latencies else None
+            })
+
+        # Report jobs are shared state: submit on the last worker, poll on the first
+        async with http.post(f'{urls[0]}/api/session/{session_id}/end', json={}) as response:
+            assert response.status == 200, await response.text()
+        async with http.post(f'{urls[-1]}/api/session/{session_id}/report') as response:
+            job_id = (await response.json())['job_id']
+        job_status = None
+        deadline = time.monotonic() + args.wait
+        while time.monotonic() < deadline:
+            async with http.get(f'{urls[0]}/api/report_jobs/{job_id}') as response:
+                job_status = (await response.json()).get('status') if response.status == 200 else f'HTTP {response.status}'
+            if job_status in ('done', 'failed'):
+                break
+            await asyncio.sleep(0.1)
+
+        return {
+            'workers': len(urls),
+            'scans': len(sent),
+            'dashboards': dashboards,
+            'report_job_polled_on_other_worker': job_status,
+            'ok': all(d['received'] == len(sent) for d in dashboards) and job_status == 'done'
+        }
+    finally:
+        await asyncio.gather(*(client.disconnect() for client in clients), return_exceptions=True)
+        await http.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--scans', type=int, default=50)
+    parser.add_argument('--items', type=int, default=200)
+    parser.add_argument('--mode', default='threading', choices=['threading', 'eventlet', 'gevent'])
+    parser.add_argument('--message-queue', help='redis:// or kombu URL; defaults to a filesystem transport')
+    parser.add_argument('--wait', type=float, default=10.0, help='seconds to wait for deliveries and the report')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='scale-out-')
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'inventory.db')}",
+        REPORT_CACHE_DIR=os.path.join(workdir, 'reports'),
+        SCAN_JOURNAL_PATH=os.path.join(workdir, 'journal', 'scan_journal-{worker}.log'),
+        SOCKETIO_ASYNC_MODE=args.mode,
+        **queue_environment(workdir, args.message_queue)
+    )
+    seed_database(env, args.items)
+
+    workers = []
+    try:
+        urls = []
+        for n in range(args.workers):
+            port = free_port()
+            workers.append(start_worker(env, port, os.path.join(workdir, f'worker-{n}.log')))
+            urls.append(f'http://127.0.0.1:{port}')
+        result = asyncio.run(run(args, urls))
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            try:
+                worker.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                worker.kill()
+
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result['ok'] else 1)
+
+if __name__ == '__main__':
+    main()
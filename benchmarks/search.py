@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Catalog search latency benchmark
+
+Seeds a synthetic catalog into a temporary SQLite database (the FTS5 index is
+filled by its triggers) and measures /api/search for exact codes, partial
+barcodes, name prefixes, typos and very broad prefixes, next to the LIKE scan
+/api/items used before the index existed.
+
+    python benchmarks/search.py --items 1000000 --repeat 50
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix='search-bench-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(WORKDIR, 'inventory.db')}"
+sys.path.insert(0, ROOT)
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+from app import create_app, db, User, InventoryItem, upgrade_database  # noqa: E402
+
+app = create_app()
+
+SEED_CHUNK = 10000
+ADJECTIVES = ['Blue', 'Red', 'Heavy', 'Compact', 'Steel', 'Plastic', 'Cordless', 'Industrial', 'Mini', 'Premium']
+NOUNS = ['Widget', 'Bracket', 'Hammer', 'Drill', 'Cable', 'Valve', 'Sensor', 'Gasket', 'Bearing', 'Switch']
+
+def item_row(i):
+    return dict(
+        name=f'{ADJECTIVES[i % 10]} {NOUNS[i // 10 % 10]} {i}',
+        sku=f'SKU-{i:07d}',
+        barcode=f'40{i:011d}',
+        category=f'Category {i % 20}',
+        location=f'Aisle {i % 50}',
+        expected_quantity=10,
+        actual_quantity=10
+    )
+
+def seed(items):
+    upgrade_database()
+    db.session.add(User(username='bench', email='bench@example.com', password_hash=generate_password_hash('bench'), role='admin'))
+    db.session.commit()
+    for start in range(0, items, SEED_CHUNK):
+        db.session.bulk_insert_mappings(InventoryItem, [item_row(i) for i in range(start, min(start + SEED_CHUNK, items))])
+        db.session.commit()
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def timed(client, url, queries, repeat):
+    latencies = []
+    hits = 0
+    for n in range(repeat):
+        query = queries[n % len(queries)]
+        started = time.perf_counter()
+        response = client.get(url, query_string={'q': query, 'limit': 20})
+        latencies.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        hits += bool(response.get_json()['items'])
+    return {
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'max_ms': round(max(latencies) * 1000, 2),
+        'queries_with_hits': f'{hits}/{repeat}'
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=50, help='requests per query type')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    picks = [rng.randrange(args.items) for _ in range(args.repeat)]
+    cases = {
+        'exact_sku': [f'SKU-{i:07d}' for i in picks],
+        'barcode_prefix': [f'40{i:011d}'[:10] for i in picks],
+        'name_words': [f'{ADJECTIVES[i % 10].lower()} {NOUNS[i // 10 % 10][:4].lower()}' for i in picks],
+        'typo': [f'{NOUNS[i % 10][:2]}{NOUNS[i % 10][3]}{NOUNS[i % 10][2]}{NOUNS[i % 10][4:]}'.lower() for i in picks],
+        'broad_prefix': ['sk', 'wid', 'cat', 'ais']
+    }
+
+    results = {'items': args.items}
+    with app.app_context():
+        started = time.perf_counter()
+        seed(args.items)
+        results['seed_seconds'] = round(time.perf_counter() - started, 1)
+
+        client = app.test_client()
+        client.post('/login', data={'username': 'bench', 'password': 'bench'})
+        results['search'] = {name: timed(client, '/api/search', queries, args.repeat) for name, queries in cases.items()}
+
+        # The substring LIKE filter /api/items applied before the FTS index
+        like_latencies = []
+        for query in cases['barcode_prefix'][:5]:
+            pattern = f'%{query}%'
+            started = time.perf_counter()
+            InventoryItem.query.filter(
+                InventoryItem.name.ilike(pattern) | InventoryItem.sku.ilike(pattern) | InventoryItem.barcode.ilike(pattern)
+            ).order_by(InventoryItem.id).limit(20).all()
+            like_latencies.append(time.perf_counter() - started)
+        results['like_scan_baseline_ms'] = round(sum(like_latencies) / len(like_latencies) * 1000, 2)
+        results['items_endpoint_fts'] = timed(client, '/api/items', cases['barcode_prefix'], args.repeat)
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
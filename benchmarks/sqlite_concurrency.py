@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+SQLite write-concurrency benchmark
+
+Starts wsgi.py in threading mode once per SQLITE_PROFILE (or with the production
+profile plus the scan journal) against a freshly seeded temporary database, then
+has N auditors scan in parallel. Reports scan throughput, latency percentiles and
+failed scans (typically "database is locked") as JSON.
+
+    python benchmarks/sqlite_concurrency.py --writers 1 4 16 --scans 200 --profiles default production journal
+
+Requires aiohttp; server helpers are shared with load_test.py.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+from load_test import free_port, login, percentile, run_auditor, seed_database, start_server
+
+async def run_profile(profile, writers, args):
+    workdir = tempfile.mkdtemp(prefix=f'sqlite-{profile}-')
+    database_url = f"sqlite:///{os.path.join(workdir, 'inventory.db')}"
+    seed_database(database_url, args.items, writers)
+
+    # The journal profile acknowledges scans from the fsynced scan journal
+    os.environ['SQLITE_PROFILE'] = 'default' if profile == 'default' else 'production'
+    os.environ['SCAN_JOURNAL_ENABLED'] = 'true' if profile == 'journal' else 'false'
+    os.environ['SCAN_JOURNAL_PATH'] = os.path.join(workdir, 'scan_journal.log')
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    server = start_server('threading', port, database_url)
+    auditors = []
+    try:
+        for n in range(writers):
+            auditors.append(await login(base_url, f'auditor{n}'))
+        session_ids = []
+        for http in auditors:
+            async with http.post(f'{base_url}/start_audit') as response:
+                session_ids.append((await response.json())['session_id'])
+
+        latencies = []
+        errors = []
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            run_auditor(http, base_url, session_id, args.scans, args.items, n * args.scans, latencies, errors)
+            for n, (http, session_id) in enumerate(zip(auditors, session_ids))
+        ))
+        elapsed = time.perf_counter() - started
+
+        return {
+            'profile': profile,
+            'writers': writers,
+            'scans': len(latencies),
+            'scan_errors': len(errors),
+            'scan_throughput_per_s': round(len(latencies) / elapsed, 1) if elapsed else None,
+            'scan_p50_ms': round(percentile(latencies, 0.50), 2) if latencies else None,
+            'scan_p99_ms': round(percentile(latencies, 0.99), 2) if latencies else None
+        }
+    finally:
+        for http in auditors:
+            await http.close()
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', default=['default', 'production'], choices=['default', 'production', 'journal'])
+    parser.add_argument('--writers', nargs='+', type=int, default=[1, 4, 16], help='parallel scanning auditors')
+    parser.add_argument('--scans', type=int, default=200, help='scans per auditor')
+    parser.add_argument('--items', type=int, default=10000, help='catalog size')
+    args = parser.parse_args()
+
+    results = [
+        await run_profile(profile, writers, args)
+        for writers in args.writers
+        for profile in args.profiles
+    ]
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark
+
+Starts a fresh interpreter per run and times importing app, building the
+application (create_app, or the module-level app of older trees), the first
+request (the login page), logging in (mostly password hashing) and the first
+database-backed request (listing items), plus the whole process from spawn to
+exit. Also runs `python -X importtime -c "import app"` once and reports the
+heaviest modules app imports directly.
+
+    python benchmarks/startup.py --runs 10
+    python benchmarks/startup.py --tree /path/to/other/checkout
+
+--tree points at another checkout (for example a `git worktree` of an older
+commit) to compare against; the database is seeded with that tree's code.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = 'startup'
+
+SEED = f'''
+from werkzeug.security import generate_password_hash
+import app as module
+application = module.create_app() if hasattr(module, 'create_app') else module.app
+with application.app_context():
+    module.upgrade_database()
+    module.db.session.add(module.User(username='bench', email='bench@example.com',
+                                      password_hash=generate_password_hash({PASSWORD!r}), role='admin'))
+    module.db.session.commit()
+'''
+
+PROBE = f'''
+import json, time
+started = time.perf_counter()
+import app as module
+imported = time.perf_counter()
+application = module.create_app() if hasattr(module, 'create_app') else module.app
+created = time.perf_counter()
+client = application.test_client()
+assert client.get('/login').status_code == 200
+first = time.perf_counter()
+client.post('/login', data={{'username': 'bench', 'password': {PASSWORD!r}}})
+logged_in = time.perf_counter()
+assert client.get('/api/items?limit=50').status_code == 200
+first_db = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (first - created) * 1000,
+    'login_ms': (logged_in - first) * 1000,
+    'first_db_request_ms': (first_db - logged_in) * 1000
+}}))
+'''
+
+def run_python(tree, env, *args):
+    return subprocess.run([sys.executable, *args], cwd=tree, env=env, check=True, capture_output=True, text=True)
+
+def import_profile(tree, env, top):
+    """Cumulative import time of app and of the modules it imports directly"""
+    output = run_python(tree, env, '-X', 'importtime', '-c', 'import app').stderr
+    modules = []
+    total = None
+    for line in output.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if name.strip() == 'app' and depth == 0:
+            total = int(cumulative) / 1000
+        elif depth == 1:
+            modules.append((name.strip(), int(cumulative) / 1000))
+    modules.sort(key=lambda module: module[1], reverse=True)
+    return {
+        'app_import_ms': total,
+        'heaviest_direct_imports_ms': {name: round(ms, 1) for name, ms in modules[:top]}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters to time')
+    parser.add_argument('--tree', default=ROOT, help='checkout to measure')
+    parser.add_argument('--top', type=int, default=10, help='direct imports to list')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='startup-bench-')
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'inventory.db')}",
+        SCAN_JOURNAL_ENABLED='false'
+    )
+    run_python(args.tree, env, '-c', SEED)
+
+    samples = []
+    wall = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        result = run_python(args.tree, env, '-c', PROBE)
+        wall.append((time.perf_counter() - started) * 1000)
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    results = {'tree': os.path.abspath(args.tree), 'runs': args.runs}
+    for key in samples[0]:
+        results[f'median_{key}'] = round(statistics.median(sample[key] for sample in samples), 1)
+    results['median_process_wall_ms'] = round(statistics.median(wall), 1)
+    results.update(import_profile(args.tree, env, args.top))
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Hot-path benchmark suite
+
+Seeds a synthetic catalog and audit history into a temporary SQLite database and
+measures, in process with the Flask and Socket.IO test clients:
+
+  scan       /api/scan throughput and latency percentiles
+  listing    /inventory render time and /api/items first, filtered and deep pages
+  export     session CSV (streamed) and PDF generation time and peak memory
+  broadcast  Socket.IO fan-out of scan events to simulated dashboard clients
+
+Results are printed as JSON together with the commit and sizes used, so runs can
+be compared between commits:
+
+    python benchmarks/suite.py --items 100000 --logs 1000000 > before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix='bench-suite-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(WORKDIR, 'inventory.db')}"
+os.environ['REPORT_CACHE_DIR'] = os.path.join(WORKDIR, 'reports')
+os.environ.setdefault('SCAN_JOURNAL_ENABLED', 'false')
+sys.path.insert(0, ROOT)
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+from app import (  # noqa: E402
+    create_app, db, socketio, event_bus, User, InventoryItem, AuditSession, AuditLog,
+    generate_pdf_report, rebuild_aggregates, upgrade_database
+)
+
+app = create_app()
+
+PASSWORD = 'bench'
+SEED_CHUNK = 10000
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def summarize(latencies):
+    """Latency percentiles in milliseconds"""
+    return {
+        'count': len(latencies),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'max_ms': round(max(latencies) * 1000, 3)
+    }
+
+def commit_id():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def seed(items, logs):
+    """Create the schema, one auditor, a synthetic catalog and a completed session with `logs` entries"""
+    upgrade_database()
+    user = User(username='bench', email='bench@example.com', password_hash=generate_password_hash(PASSWORD), role='admin')
+    db.session.add(user)
+    db.session.commit()
+
+    for start in range(0, items, SEED_CHUNK):
+        db.session.bulk_insert_mappings(InventoryItem, [
+            dict(name=f'Item {i}', sku=f'SKU-{i}', barcode=f'BC-{i}', expected_quantity=10, actual_quantity=10 - i % 3,
+                 category=f'Category {i % 20}', location=f'Aisle {i % 50}')
+            for i in range(start, min(start + SEED_CHUNK, items))
+        ])
+        db.session.commit()
+
+    started = datetime.utcnow() - timedelta(hours=8)
+    history = AuditSession(user_id=user.id, status='completed', start_time=started, end_time=datetime.utcnow(),
+                           items_scanned=logs, discrepancies_found=logs // 3)
+    db.session.add(history)
+    db.session.commit()
+
+    for start in range(0, logs, SEED_CHUNK):
+        db.session.bulk_insert_mappings(AuditLog, [
+            dict(session_id=history.id, user_id=user.id, item_id=n % items + 1, action='scan',
+                 old_quantity=10, new_quantity=10 - n % 3, discrepancy=-(n % 3),
+                 timestamp=started + timedelta(milliseconds=n), notes='')
+            for n in range(start, min(start + SEED_CHUNK, logs))
+        ])
+        db.session.commit()
+
+    rebuild_aggregates()
+    return history.session_id
+
+def logged_in_client():
+    client = app.test_client()
+    response = client.post('/login', data={'username': 'bench', 'password': PASSWORD})
+    assert response.status_code == 302, 'login failed'
+    return client
+
+def bench_scan(client, scans, items):
+    session_id = client.post('/start_audit').get_json()['session_id']
+    latencies = []
+    started = time.perf_counter()
+    for n in range(scans):
+        t = time.perf_counter()
+        response = client.post('/api/scan', json={
+            'session_id': session_id, 'barcode': f'BC-{(n * 7919) % items}', 'actual_quantity': n % 12
+        })
+        latencies.append(time.perf_counter() - t)
+        assert response.status_code == 200, response.get_data(as_text=True)
+    elapsed = time.perf_counter() - started
+    client.post(f'/api/session/{session_id}/end', json={})
+    return dict(summarize(latencies), throughput_per_s=round(scans / elapsed, 1))
+
+def timed_get(client, url, repeat):
+    latencies = []
+    body = None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        response = client.get(url)
+        body = response.get_data()
+        latencies.append(time.perf_counter() - t)
+        assert response.status_code == 200, f'{url}: {response.status_code}'
+    return latencies, body
+
+def bench_listing(client, repeat):
+    results = {}
+    latencies, _ = timed_get(client, '/inventory', repeat)
+    results['inventory_page'] = summarize(latencies)
+
+    latencies, body = timed_get(client, '/api/items?limit=50', repeat)
+    results['items_first_page'] = summarize(latencies)
+
+    latencies, _ = timed_get(client, '/api/items?limit=50&category=Category%207&discrepancy=under', repeat)
+    results['items_filtered_page'] = summarize(latencies)
+
+    # Walk a few pages in to show keyset pages cost the same as the first one
+    cursor = json.loads(body)['next_cursor']
+    for _ in range(20):
+        page = client.get(f'/api/items?limit=50&cursor={cursor}').get_json()
+        cursor = page['next_cursor'] or cursor
+    latencies, _ = timed_get(client, f'/api/items?limit=50&cursor={cursor}', repeat)
+    results['items_deep_page'] = summarize(latencies)
+    return results
+
+def measure(func):
+    """Run func twice: once for wall time, once under tracemalloc for peak Python memory"""
+    started = time.perf_counter()
+    size = func()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': round(elapsed, 3), 'peak_memory_mb': round(peak / 1024 / 1024, 2), 'bytes': size}
+
+def bench_export(client, session_id):
+    def export_csv():
+        response = client.get(f'/api/session/{session_id}/export?format=csv')
+        return sum(len(chunk) for chunk in response.response)
+
+    def export_pdf():
+        path = os.path.join(WORKDIR, f'report-{time.perf_counter_ns()}.pdf')
+        session = AuditSession.query.filter_by(session_id=session_id).one()
+        generate_pdf_report(session, path)
+        size = os.path.getsize(path)
+        os.remove(path)
+        return size
+
+    return {'csv': measure(export_csv), 'pdf': measure(export_pdf)}
+
+def bench_broadcast(client, clients, scans, items):
+    session_id = client.post('/start_audit').get_json()['session_id']
+    dashboards = [socketio.test_client(app, flask_test_client=client) for _ in range(clients)]
+    for dashboard in dashboards:
+        dashboard.emit('join_room', f'session:{session_id}')
+        dashboard.get_received()
+
+    started = time.perf_counter()
+    for n in range(scans):
+        client.post('/api/scan', json={'session_id': session_id, 'barcode': f'BC-{n % items}', 'actual_quantity': n % 12})
+    event_bus.flush()
+    elapsed = time.perf_counter() - started
+
+    received = [len(dashboard.get_received()) for dashboard in dashboards]
+    for dashboard in dashboards:
+        dashboard.disconnect()
+    client.post(f'/api/session/{session_id}/end', json={})
+    return {
+        'clients': clients,
+        'scans': scans,
+        'seconds': round(elapsed, 3),
+        'scans_per_s': round(scans / elapsed, 1),
+        'messages_per_client_avg': round(sum(received) / len(received), 1) if received else 0,
+        'messages_total': sum(received)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=10000, help='InventoryItem rows to seed')
+    parser.add_argument('--logs', type=int, default=10000, help='AuditLog rows to seed in the exported session')
+    parser.add_argument('--scans', type=int, default=500, help='scans for the scan benchmark')
+    parser.add_argument('--repeat', type=int, default=20, help='requests per listing measurement')
+    parser.add_argument('--clients', type=int, default=100, help='Socket.IO clients for the broadcast benchmark')
+    parser.add_argument('--broadcast-scans', type=int, default=100)
+    parser.add_argument('--only', nargs='+', choices=['scan', 'listing', 'export', 'broadcast'])
+    args = parser.parse_args()
+    sections = set(args.only or ['scan', 'listing', 'export', 'broadcast'])
+
+    results = {
+        'commit': commit_id(),
+        'python': platform.python_version(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'items': args.items,
+        'logs': args.logs
+    }
+    with app.app_context():
+        started = time.perf_counter()
+        history_id = seed(args.items, args.logs)
+        results['seed_seconds'] = round(time.perf_counter() - started, 3)
+
+        client = logged_in_client()
+        if 'scan' in sections:
+            results['scan'] = bench_scan(client, args.scans, args.items)
+        if 'listing' in sections:
+            results['listing'] = bench_listing(client, args.repeat)
+        if 'export' in sections:
+            results['export'] = bench_export(client, history_id)
+        if 'broadcast' in sections:
+            results['broadcast'] = bench_broadcast(client, args.clients, args.broadcast_scans, args.items)
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Gunicorn settings for wsgi:app
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import os
+
+# gthread by default: with SQLite every query blocks the calling thread, which under
+# eventlet or gevent is the whole worker. Use a cooperative worker with a server database.
+ASYNC_MODE = os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'threading')
+
+WORKER_CLASSES = {
+    'eventlet': 'eventlet',
+    'gevent': 'geventwebsocket.gunicorn.workers.GeventWebSocketWorker',
+    'threading': 'gthread',
+}
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', 5000)}"
+worker_class = WORKER_CLASSES[ASYNC_MODE]
+
+# More than one worker needs SOCKETIO_MESSAGE_QUEUE (e.g. redis://localhost:6379/0)
+# so a scan handled by one worker reaches dashboards connected to the others, and
+# SCAN_JOURNAL_PATH with a {worker} slot if the scan journal is enabled.
+#
+# Socket.IO long-polling requests must also reach the worker that accepted the
+# handshake. gunicorn cannot route them, so either set
+# SOCKETIO_CLIENT_TRANSPORTS=websocket, or run one single-worker gunicorn per port
+# behind a proxy with sticky sessions (nginx: `ip_hash` or `hash $cookie_io` in the
+# upstream block, plus the Upgrade/Connection headers for /socket.io/).
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+if workers > 1 and not os.environ.get('SOCKETIO_MESSAGE_QUEUE'):
+    raise RuntimeError('WEB_CONCURRENCY > 1 requires SOCKETIO_MESSAGE_QUEUE')
+
+# Concurrent connections per cooperative worker, or threads per gthread worker
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', 1000))
+threads = int(os.environ.get('GUNICORN_THREADS', 100))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG')
@@ -6,25 +6,45 @@
 class InventoryApp {
     constructor() {
         this.socket = null;
+        this.syncingChanges = false;
         this.currentUser = null;
         this.activeSession = null;
+        this.rooms = new Set();
+        this.seenEvents = new Set();
+        this.changeCursor = null;
+        this.catchUpTimer = null;
+        this.connectedBefore = false;
         this.init();
     }
 
     init() {
+        this.loadChangeCursor();
         this.initWebSocket();
         this.setupEventListeners();
         this.checkActiveSession();
     }
 
     initWebSocket() {
-        // Initialize Socket.IO connection
-        this.socket = io();
+        // Initialize Socket.IO connection; websocket-only skips the polling handshake
+        // that would need sticky sessions across several server workers
+        const transports = document.querySelector('meta[name="socketio-transports"]');
+        this.socket = io(transports ? { transports: transports.content.split(',') } : {});
         
         // Connection events
         this.socket.on('connect', () => {
             console.log('Connected to server');
-            this.socket.emit('join_room', 'all_users');
+            // Role and user rooms are joined server-side; restore explicit subscriptions
+            this.rooms.forEach(room => this.socket.emit('join_room', room));
+            // Events sent while we were away are lost; fetch what changed instead of reloading
+            if (this.connectedBefore) {
+                this.syncChanges();
+            }
+            this.connectedBefore = true;
+        });
+
+        this.socket.on('join_room_error', (data) => {
+            console.warn(`Could not join room ${data.room}: ${data.message}`);
+            this.rooms.delete(data.room);
         });
 
         this.socket.on('disconnect', () => {
@@ -33,6 +53,8 @@ class InventoryApp {
 
         // Audit session events
         this.socket.on('audit_started', (data) => {
+            // Only the owner and the watch roles receive this; follow the new session's scans
+            this.joinRoom(`session:${data.session_id}`);
             this.showAuditBanner(data);
             this.showNotification(`${data.user} started an inventory check`, 'info');
         });
@@ -42,19 +64,36 @@ class InventoryApp {
         });
 
         this.socket.on('audit_completed', (data) => {
+            this.leaveRoom(`session:${data.session_id}`);
             this.hideAuditBanner();
             this.showNotification(`Inventory check completed by ${data.user}`, 'success');
         });
 
-        this.socket.on('item_scanned', (data) => {
-            this.handleItemScanned(data);
+        // Scans and discrepancies arrive batched per server coalescing window
+        this.socket.on('items_scanned', (data) => {
+            this.handleItemsScanned(data);
         });
 
-        this.socket.on('discrepancy_found', (data) => {
-            this.showNotification(`Discrepancy found: ${data.item_name} (${data.discrepancy})`, 'warning');
+        this.socket.on('discrepancies_found', (data) => {
+            this.handleDiscrepanciesFound(data);
         });
     }
 
+    joinRoom(room) {
+        // Subscribe to a session or location room; remembered across reconnects
+        if (this.rooms.has(room)) return;
+        this.rooms.add(room);
+        if (this.socket.connected) {
+            this.socket.emit('join_room', room);
+        }
+    }
+
+    leaveRoom(room) {
+        if (this.rooms.delete(room) && this.socket.connected) {
+            this.socket.emit('leave_room', room);
+        }
+    }
+
     setupEventListeners() {
         // Page visibility change - reconnect if needed
         document.addEventListener('visibilitychange', () => {
@@ -71,6 +110,66 @@ class InventoryApp {
         });
     }
 
+    loadChangeCursor() {
+        // Baseline cursor for delta sync; the page itself was rendered from current data
+        fetch('/api/changes')
+            .then(response => response.json())
+            .then(data => {
+                if (this.changeCursor === null) {
+                    this.changeCursor = data.cursor;
+                }
+            })
+            .catch(error => console.error('Error loading change cursor:', error));
+    }
+
+    async syncChanges() {
+        if (this.changeCursor === null || this.syncingChanges) return;
+        this.syncingChanges = true;
+        try {
+            const data = await this.apiCall(`/api/changes?since=${this.changeCursor}`);
+            this.changeCursor = data.cursor;
+            if (data.reset) {
+                // Too much changed while disconnected; pages reload their data
+                document.dispatchEvent(new CustomEvent('inventory:resync'));
+            } else {
+                this.applyChanges(data);
+            }
+        } catch (error) {
+            console.error('Error syncing changes:', error);
+        } finally {
+            this.syncingChanges = false;
+        }
+    }
+
+    catchUpChanges(changeSeq) {
+        // A live change past the cursor means the cursor is falling behind. Events are not a
+        // safe cursor themselves (earlier writes may still be committing, and this page only
+        // hears its own rooms), so move it with a throttled /api/changes sync instead
+        if (changeSeq == null || this.changeCursor === null || changeSeq <= this.changeCursor || this.catchUpTimer) return;
+        this.catchUpTimer = setTimeout(() => {
+            this.catchUpTimer = null;
+            this.syncChanges();
+        }, 30000);
+    }
+
+    applyChanges(data) {
+        // Pages that list items apply data.items and data.deleted_items themselves
+        data.sessions.forEach(session => {
+            if (session.status === 'active') {
+                if (this.activeSession && this.activeSession.session_id === session.session_id) {
+                    this.updateAuditBanner(session);
+                } else if (!this.activeSession) {
+                    this.showAuditBanner(session);
+                }
+            } else if (this.activeSession && this.activeSession.session_id === session.session_id) {
+                this.leaveRoom(`session:${session.session_id}`);
+                this.hideAuditBanner();
+            }
+        });
+
+        document.dispatchEvent(new CustomEvent('inventory:changes', { detail: data }));
+    }
+
     checkActiveSession() {
         // Check if there's an active audit session
         fetch('/api/active_session')
@@ -98,6 +197,7 @@ class InventoryApp {
         banner.classList.add('active');
         
         this.activeSession = sessionData;
+        this.joinRoom(`session:${sessionData.session_id}`);
     }
 
     updateAuditBanner(sessionData) {
@@ -129,15 +229,47 @@ class InventoryApp {
         this.activeSession = null;
     }
 
-    handleItemScanned(data) {
+    // Pages subscribed to both a session and a location room receive each entry once per room
+    unseenEvents(entries) {
+        const fresh = entries.filter(entry => !this.seenEvents.has(entry.event_id));
+        fresh.forEach(entry => this.seenEvents.add(entry.event_id));
+        while (this.seenEvents.size > 1000) {
+            this.seenEvents.delete(this.seenEvents.values().next().value);
+        }
+        return fresh;
+    }
+
+    handleItemsScanned(data) {
+        const items = this.unseenEvents(data.items);
+        if (!items.length && data.items.length) return;
+        this.catchUpChanges(Math.max(...items.map(item => item.change_seq || 0)));
+
         // Update inventory table if visible
         const table = document.getElementById('inventoryTable');
         if (table) {
-            this.updateInventoryRow(data.item_id, data);
+            items.forEach(item => this.updateInventoryRow(item.item_id, item));
+        }
+
+        // Show one scan notification per batch
+        const count = items.length + (items.length === data.items.length ? data.dropped || 0 : 0);
+        if (count === 1) {
+            this.showNotification(`Item scanned: ${escapeHtml(items[0].item_name)}`, 'info');
+        } else if (count > 1) {
+            this.showNotification(`${count} items scanned`, 'info');
         }
+    }
 
-        // Show scan notification
-        this.showNotification(`Item scanned: ${data.item_name}`, 'info');
+    handleDiscrepanciesFound(data) {
+        const discrepancies = this.unseenEvents(data.discrepancies);
+        if (!discrepancies.length && data.discrepancies.length) return;
+
+        const count = discrepancies.length + (discrepancies.length === data.discrepancies.length ? data.dropped || 0 : 0);
+        if (count === 1) {
+            const discrepancy = discrepancies[0];
+            this.showNotification(`Discrepancy found: ${escapeHtml(discrepancy.item_name)} (${discrepancy.discrepancy})`, 'warning');
+        } else if (count > 1) {
+            this.showNotification(`${count} discrepancies found`, 'warning');
+        }
     }
 
     updateInventoryRow(itemId, data) {
@@ -274,6 +406,212 @@ class InventoryApp {
     }
 }
 
+/**
+ * Offline-first scan queue for an audit session.
+ * Scans are stored in IndexedDB with a client-generated idempotency key and
+ * acknowledged immediately; a background loop sends them to /api/scan/batch in
+ * order. The server ignores keys it has already recorded, so a batch whose
+ * response was lost can be replayed safely. Scans the server refuses outright
+ * are moved to a separate "failed" store rather than retried.
+ */
+class ScanQueue {
+    constructor(sessionId, { batchSize = 50, interval = 2000, onResult = () => {}, onStatus = () => {} } = {}) {
+        this.sessionId = sessionId;
+        this.batchSize = batchSize;
+        this.interval = interval;
+        this.onResult = onResult;
+        this.onStatus = onStatus;
+        this.db = null;
+        this.memory = [];  // Used when IndexedDB is unavailable (e.g. some private windows)
+        this.failedMemory = [];
+        this.sequence = Date.now() * 1000;
+        this.flushing = null;
+        this.retryDelay = interval;
+        this.timer = null;
+    }
+
+    async open() {
+        try {
+            this.db = await new Promise((resolve, reject) => {
+                const request = indexedDB.open('inventory-scan-queue', 2);
+                request.onupgradeneeded = (event) => {
+                    if (event.oldVersion < 1) {
+                        const store = request.result.createObjectStore('scans', { keyPath: 'idempotency_key' });
+                        store.createIndex('session_seq', ['session_id', 'seq']);
+                    }
+                    if (event.oldVersion < 2) {
+                        const failed = request.result.createObjectStore('failed', { keyPath: 'idempotency_key' });
+                        failed.createIndex('session_seq', ['session_id', 'seq']);
+                    }
+                };
+                request.onsuccess = () => resolve(request.result);
+                request.onerror = () => reject(request.error);
+            });
+        } catch (error) {
+            console.warn('IndexedDB unavailable, queued scans will not survive a reload:', error);
+        }
+
+        window.addEventListener('online', () => this.flush());
+        this.schedule(0);
+        this.reportStatus();
+        return this;
+    }
+
+    static newKey() {
+        if (window.crypto && crypto.randomUUID) {
+            return crypto.randomUUID();
+        }
+        return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`;
+    }
+
+    store(mode, action, name = 'scans') {
+        return new Promise((resolve, reject) => {
+            const transaction = this.db.transaction(name, mode);
+            const request = action(transaction.objectStore(name));
+            transaction.oncomplete = () => resolve(request && request.result);
+            transaction.onerror = () => reject(transaction.error);
+        });
+    }
+
+    async enqueue(barcode, actualQuantity, notes = '') {
+        const scan = {
+            idempotency_key: ScanQueue.newKey(),
+            session_id: this.sessionId,
+            seq: ++this.sequence,
+            barcode: barcode,
+            actual_quantity: actualQuantity,
+            notes: notes,
+            queued_at: new Date().toISOString()
+        };
+        if (this.db) {
+            await this.store('readwrite', store => store.put(scan));
+        } else {
+            this.memory.push(scan);
+        }
+        this.reportStatus();
+        this.schedule(0);
+        return scan;
+    }
+
+    async peek(limit) {
+        if (!this.db) {
+            return this.memory.slice(0, limit);
+        }
+        const range = IDBKeyRange.bound([this.sessionId, -Infinity], [this.sessionId, Infinity]);
+        return this.store('readonly', store => store.index('session_seq').getAll(range, limit));
+    }
+
+    async remove(keys) {
+        if (!this.db) {
+            this.memory = this.memory.filter(scan => !keys.includes(scan.idempotency_key));
+            return;
+        }
+        await this.store('readwrite', store => keys.forEach(key => store.delete(key)));
+    }
+
+    async fail(scans, message) {
+        // Keep refused scans for the user to review instead of retrying them forever
+        const failed = scans.map(scan => ({ ...scan, error: message, failed_at: new Date().toISOString() }));
+        if (this.db) {
+            await this.store('readwrite', store => failed.forEach(scan => store.put(scan)), 'failed');
+        } else {
+            this.failedMemory.push(...failed);
+        }
+        await this.remove(scans.map(scan => scan.idempotency_key));
+    }
+
+    async failed() {
+        if (!this.db) {
+            return this.failedMemory.filter(scan => scan.session_id === this.sessionId);
+        }
+        const range = IDBKeyRange.bound([this.sessionId, -Infinity], [this.sessionId, Infinity]);
+        return this.store('readonly', store => store.index('session_seq').getAll(range), 'failed');
+    }
+
+    async pending() {
+        if (!this.db) {
+            return this.memory.length;
+        }
+        const range = IDBKeyRange.bound([this.sessionId, -Infinity], [this.sessionId, Infinity]);
+        return this.store('readonly', store => store.index('session_seq').count(range));
+    }
+
+    async reportStatus(error = null) {
+        const failed = await this.failed();
+        this.onStatus({ pending: await this.pending(), failed: failed.length, online: navigator.onLine, error: error });
+    }
+
+    schedule(delay = this.interval) {
+        clearTimeout(this.timer);
+        this.timer = setTimeout(() => this.flush(), delay);
+    }
+
+    flush() {
+        // Share one in-flight flush between the timer, reconnects and explicit calls
+        if (!this.flushing) {
+            this.flushing = this.sendBatches().finally(() => {
+                this.flushing = null;
+            });
+        }
+        return this.flushing;
+    }
+
+    async sendBatches() {
+        try {
+            let batch = await this.peek(this.batchSize);
+            while (batch.length) {
+                const response = await fetch('/api/scan/batch', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({
+                        session_id: this.sessionId,
+                        scans: batch.map(scan => ({
+                            barcode: scan.barcode,
+                            actual_quantity: scan.actual_quantity,
+                            notes: scan.notes,
+                            idempotency_key: scan.idempotency_key
+                        }))
+                    })
+                });
+                if (response.status === 413 && batch.length > 1) {
+                    // The server takes smaller batches than we send; split and try again
+                    this.batchSize = Math.max(1, Math.floor(batch.length / 2));
+                    batch = await this.peek(this.batchSize);
+                    continue;
+                }
+                if (response.status >= 400 && response.status < 500 && ![408, 409, 429].includes(response.status)) {
+                    // The session was closed or the scans are malformed; retrying cannot help
+                    const data = await response.json().catch(() => ({}));
+                    const message = data.message || `Rejected with status ${response.status}`;
+                    await this.fail(batch, message);
+                    batch.forEach(scan => this.onResult(scan, { success: false, message: message }, null));
+                    await this.reportStatus(message);
+                    batch = await this.peek(this.batchSize);
+                    continue;
+                }
+                if (!response.ok) {
+                    throw new Error(`HTTP error! status: ${response.status}`);
+                }
+
+                const data = await response.json();
+                // Every result is final: applied, already applied, or permanently rejected
+                data.results.forEach(result => this.onResult(batch[result.index], result, data));
+                await this.remove(batch.map(scan => scan.idempotency_key));
+                await this.reportStatus();
+                batch = await this.peek(this.batchSize);
+            }
+            this.retryDelay = this.interval;
+            this.schedule();
+        } catch (error) {
+            // Offline or server error: keep everything queued and back off
+            console.warn('Scan sync failed, will retry:', error);
+            this.retryDelay = Math.min(this.retryDelay * 2, 60000);
+            this.schedule(this.retryDelay);
+            await this.reportStatus(error.message);
+        }
+    }
+}
+
 // Initialize the app when DOM is loaded
 document.addEventListener('DOMContentLoaded', () => {
     window.inventoryApp = new InventoryApp();
@@ -305,12 +643,52 @@ function formatNumber(number) {
     return new Intl.NumberFormat().format(number);
 }
 
-function downloadReport(sessionId, format = 'pdf') {
-    const url = `/api/session/${sessionId}/export?format=${format}`;
+function escapeHtml(value) {
+    const div = document.createElement('div');
+    div.textContent = value == null ? '' : String(value);
+    return div.innerHTML;
+}
+
+function formatDateTimeShort(isoString) {
+    // Matches the server-rendered '%Y-%m-%d %H:%M' format
+    return isoString ? isoString.slice(0, 16).replace('T', ' ') : '-';
+}
+
+function triggerDownload(url, filename) {
     const link = document.createElement('a');
     link.href = url;
-    link.download = `audit_report_${sessionId}.${format}`;
+    link.download = filename;
     document.body.appendChild(link);
     link.click();
     document.body.removeChild(link);
-}
\ No newline at end of file
+}
+
+function downloadReport(sessionId, format = 'pdf') {
+    const filename = `audit_report_${sessionId}.${format}`;
+    if (format !== 'pdf') {
+        triggerDownload(`/api/session/${sessionId}/export?format=${format}`, filename);
+        return;
+    }
+
+    // PDFs are rendered in the background; poll the job until it is ready
+    const poll = (job) => {
+        if (job.status === 'done') {
+            triggerDownload(job.download_url, filename);
+        } else if (job.status === 'failed') {
+            window.inventoryApp?.showNotification(`Report generation failed: ${job.error}`, 'danger');
+        } else {
+            setTimeout(() => {
+                fetch(`/api/report_jobs/${job.job_id}`)
+                    .then(response => response.json())
+                    .then(poll)
+                    .catch(error => console.error('Error polling report job:', error));
+            }, 1000);
+        }
+    };
+
+    window.inventoryApp?.showNotification('Preparing PDF report...', 'info');
+    fetch(`/api/session/${sessionId}/report`, { method: 'POST' })
+        .then(response => response.json())
+        .then(poll)
+        .catch(error => console.error('Error requesting report:', error));
+}
@@ -0,0 +1,37 @@
+"""Shared fixtures: applications on a fresh SQLite database per test"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as inventory  # noqa: E402
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Build applications sharing the test's database, as several workers would"""
+    apps = []
+    
+    def build(**overrides):
+        config = {
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'inventory.db'}",
+            'AUDIT_ARCHIVE_DIR': str(tmp_path / 'audit_archive'),
+            'REPORT_CACHE_DIR': str(tmp_path / 'reports'),
+            'SCAN_JOURNAL_PATH': str(tmp_path / 'journal' / 'scan_journal-{worker}.log'),
+        }
+        application = inventory.create_app(dict(config, **overrides))
+        with application.app_context():
+            inventory.upgrade_database()
+        apps.append(application)
+        return application
+    
+    yield build
+    for application in apps:
+        with application.app_context():
+            inventory.db.engine.dispose()
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
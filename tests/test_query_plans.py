@@ -0,0 +1,28 @@
+"""The hot queries must keep using indexes on a freshly created schema"""
+import app as inventory
+
+def query_plan(query):
+    statement = query.statement.compile(dialect=inventory.db.engine.dialect, compile_kwargs={'literal_binds': True})
+    return [row[-1] for row in inventory.db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}')]
+
+def test_hot_queries_use_indexes(app):
+    with app.app_context():
+        plans = {name: query_plan(query) for name, query in inventory.hot_queries().items()}
+    assert plans
+    
+    for name, plan in plans.items():
+        # Every table access goes through an index or the rowid, and at least one through an index
+        accesses = [step for step in plan if step.startswith(('SCAN ', 'SEARCH '))]
+        assert accesses, f'{name}: {plan}'
+        assert all(' USING ' in step for step in accesses), f'{name}: {plan}'
+        assert any('USING INDEX' in step or 'USING COVERING INDEX' in step for step in accesses), f'{name}: {plan}'
+
+def test_hot_queries_pass_the_cli_check(app):
+    with app.app_context():
+        scans = {name: inventory.full_table_scans(query) for name, query in inventory.hot_queries().items()}
+    assert not any(scans.values()), scans
+
+def test_full_table_scan_is_reported(app):
+    with app.app_context():
+        query = inventory.InventoryItem.query.filter(inventory.InventoryItem.expected_quantity == 1)
+        assert inventory.full_table_scans(query) == ['inventory_item']
@@ -0,0 +1,87 @@
+"""Ending a session with journaled scans still pending on another worker"""
+import threading
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+import app as inventory
+
+SCANS_PER_WORKER = 3
+
+@pytest.fixture
+def workers(make_app):
+    """Two workers on one database, each with its own journal file"""
+    config = {'SCAN_JOURNAL_ENABLED': True, 'SCAN_JOURNAL_APPLY_INTERVAL': 0.02, 'SCAN_JOURNAL_END_WAIT': 5.0}
+    first, second = make_app(**config), make_app(**config)
+    with first.app_context():
+        inventory.db.session.add(inventory.User(
+            username='auditor', email='auditor@example.com', password_hash=generate_password_hash('pw'), role='admin'
+        ))
+        for n in range(SCANS_PER_WORKER * 2):
+            inventory.db.session.add(inventory.InventoryItem(
+                name=f'Item {n}', sku=f'SKU-{n}', barcode=f'BC-{n}', expected_quantity=10, actual_quantity=10
+            ))
+        inventory.db.session.commit()
+    
+    clients = []
+    for application in (first, second):
+        client = application.test_client()
+        assert client.post('/login', data={'username': 'auditor', 'password': 'pw'}).status_code == 302
+        clients.append(client)
+    return (first, second), clients
+
+def journal(application):
+    return application.extensions['scan_journal']
+
+def scan(client, session_id, barcodes):
+    for barcode in barcodes:
+        response = client.post('/api/scan', json={'session_id': session_id, 'barcode': barcode, 'actual_quantity': 7})
+        assert response.get_json()['journaled']
+
+def counters(application, session_id):
+    with application.app_context():
+        session = inventory.AuditSession.query.filter_by(session_id=session_id).one()
+        logs = inventory.AuditLog.query.filter_by(session_id=session.id).count()
+        return session.status, session.items_scanned, logs
+
+def test_end_waits_for_another_workers_journal(workers):
+    (first, second), (first_client, second_client) = workers
+    session_id = first_client.post('/start_audit').get_json()['session_id']
+    
+    # Hold the second worker's applier so its scans are still unapplied when the session ends
+    blocked = journal(second)._apply_lock
+    blocked.acquire()
+    scan(first_client, session_id, [f'BC-{n}' for n in range(SCANS_PER_WORKER)])
+    scan(second_client, session_id, [f'BC-{n}' for n in range(SCANS_PER_WORKER, SCANS_PER_WORKER * 2)])
+    
+    assert journal(first).path != journal(second).path
+    with first.app_context():
+        pk = inventory.AuditSession.query.filter_by(session_id=session_id).one().id
+        assert len(inventory.journal_paths(journal(first).template)) == 2
+        # The first worker's own applier may already have caught up
+        assert journal(first).unapplied(pk) >= SCANS_PER_WORKER
+    
+    release = threading.Timer(0.3, blocked.release)
+    release.start()
+    response = first_client.post(f'/api/session/{session_id}/end', json={})
+    release.join()
+    
+    assert response.status_code == 200, response.get_json()
+    assert counters(first, session_id) == ('completed', SCANS_PER_WORKER * 2, SCANS_PER_WORKER * 2)
+
+def test_end_refuses_while_scans_cannot_be_applied(workers):
+    (first, second), (first_client, second_client) = workers
+    first.config['SCAN_JOURNAL_END_WAIT'] = 0.2
+    session_id = first_client.post('/start_audit').get_json()['session_id']
+    
+    with journal(second)._apply_lock:
+        scan(second_client, session_id, ['BC-0', 'BC-1'])
+        response = first_client.post(f'/api/session/{session_id}/end', json={})
+        assert response.status_code == 409
+        assert counters(first, session_id) == ('active', 0, 0)
+    
+    # Once the other worker catches up nothing was lost and the session can end
+    with second.app_context():
+        journal(second).drain()
+    assert first_client.post(f'/api/session/{session_id}/end', json={}).status_code == 200
+    assert counters(first, session_id) == ('completed', 2, 2)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Production entry point for the Inventory Management System
+
+Runs Flask-SocketIO on a production server instead of the Werkzeug development
+server. SOCKETIO_ASYNC_MODE selects threading (default), eventlet or gevent.
+
+threading suits the SQLite deployment: sqlite3 calls block whichever thread makes
+them, and on a cooperative hub that is every request and Socket.IO heartbeat at
+once. Choose eventlet or gevent with a server database; PDF rendering and scan
+journal fsync are moved onto real OS threads there (app.run_blocking).
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+    python wsgi.py
+
+Create or upgrade the database beforehand with `flask --app app init-db`.
+"""
+
+import os
+
+ASYNC_MODE = os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'threading')
+
+# Patch the standard library before anything imports socket or threading
+if ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+elif ASYNC_MODE == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+from app import create_app, socketio  # noqa: E402
+
+app = create_app()
+
+def main():
+    """Run a single server process on HOST:PORT"""
+    socketio.run(
+        app,
+        host=os.environ.get('HOST', '0.0.0.0'),
+        port=int(os.environ.get('PORT', 5000)),
+        allow_unsafe_werkzeug=ASYNC_MODE == 'threading'
+    )
+
+if __name__ == '__main__':
+    main()